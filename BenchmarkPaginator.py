@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
+
+"""
+    The following script measures the CPU time spent building the paginator view on each click
+"""
+
+import time
+
+from GlobalModules.Paginator import PaginatorView, make_paginator_components, make_paginator_view
+
+CLICKS = 2000
+C_ID = "paginator"
+
+
+def click_pages(page_count: int) -> list:
+    """
+    :param page_count: The number of pages of the paginator
+    :return: The page shown after each click, the user goes back and forth through every page
+    """
+
+    pages = list(range(page_count)) + list(range(page_count - 2, 0, -1))
+    return [pages[i % len(pages)] for i in range(CLICKS)]
+
+
+def bench(page_count: int, mode: str) -> float:
+    """
+    Time the view built on each click, as Paginator does it, including sending its components
+    :param page_count: The number of pages of the paginator
+    :param mode: "rebuilt" to build every view from scratch, "cold" to use make_paginator_view from an empty cache
+    (pages shown for the first time are cache misses), "warm" to use it once every page was already shown
+    :return: The mean CPU time per click in microseconds
+    """
+
+    page_names = tuple(None if i % 2 else f"Section {i}" for i in range(page_count))
+
+    def rebuild(current_page: int, names: tuple, c_id: str) -> PaginatorView:
+        return PaginatorView(make_paginator_components.__wrapped__(current_page, names, c_id))
+
+    build = rebuild if mode == "rebuilt" else make_paginator_view
+
+    make_paginator_components.cache_clear()
+
+    if mode == "warm":
+        for i in range(page_count):
+            make_paginator_view(i, page_names, C_ID)
+
+    start = time.process_time()
+    for i in click_pages(page_count):
+        build(i, page_names, C_ID).to_components()
+
+    return (time.process_time() - start) / CLICKS * 1e6
+
+
+if __name__ == "__main__":
+    modes = ("rebuilt", "cold", "warm")
+    print(f"{'Pages':>6} | " + " | ".join(f"{i.capitalize() + ' (us/click)':>18}" for i in modes))
+
+    for count in (10, 100, 1000):
+        print(f"{count:>6} | " + " | ".join(f"{bench(count, i):>18.1f}" for i in modes))
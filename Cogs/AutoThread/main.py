@@ -2,43 +2,46 @@
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import asyncio
-import sqlite3
 
 import discord
 from discord import app_commands, Interaction, InteractionResponse, TextChannel, Embed, Member
 from discord.ext import commands, tasks
 
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.HasPerm import has_perm
 
+MIGRATIONS = [
+    (
+        "CREATE TABLE IF NOT EXISTS AUTOTHREAD_CONFIG (GUILD_ID UNSIGNED INT, CHANNEL_ID UNSIGNED INT);",
+        "CREATE TABLE IF NOT EXISTS AUTOTHREAD_REACT_WLIST (GUILD_ID UNSIGNED INT, USER_ID UNSIGNED INT);"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS AUTOTHREAD_CONFIG_CHANNEL ON AUTOTHREAD_CONFIG (CHANNEL_ID);",
+        "CREATE INDEX IF NOT EXISTS AUTOTHREAD_REACT_WLIST_GUILD_USER ON AUTOTHREAD_REACT_WLIST (GUILD_ID, USER_ID);"
+    )
+]
+
 
 class AutoThread(commands.GroupCog):
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase):
         self.bot: bot = bot
         self.database = database
 
         self.__config = []
 
-        database.execute(
-            "CREATE TABLE IF NOT EXISTS AUTOTHREAD_CONFIG (GUILD_ID UNSIGNED INT, CHANNEL_ID UNSIGNED INT);"
-        )
-
-        database.execute(
-            "CREATE TABLE IF NOT EXISTS AUTOTHREAD_REACT_WLIST (GUILD_ID UNSIGNED INT, USER_ID UNSIGNED INT);"
-        )
-
-        self.__update_config_from_db()
-
+    async def cog_load(self) -> None:
+        await self.__update_config_from_db()
 
-    def __update_config_from_db(self):
+    async def __update_config_from_db(self):
         self.__config = []
 
-        for i in self.database.execute("SELECT CHANNEL_ID FROM AUTOTHREAD_CONFIG;").fetchall():
+        for i in await self.database.fetchall("SELECT CHANNEL_ID FROM AUTOTHREAD_CONFIG;"):
             self.__config.append(i[0])
 
     @tasks.loop(minutes=get_config("AutoThread.UpdateConfigFromSQL"))
     async def __update_config_task(self):
-        self.__update_config_from_db()
+        await self.__update_config_from_db()
 
     @app_commands.command(name="add_channel", description="Add a channel where we want threads under all messages")
     @app_commands.default_permissions(administrator=True)
@@ -53,20 +56,20 @@ class AutoThread(commands.GroupCog):
             )
             return
 
-        elif len(self.database.execute(
+        elif len(await self.database.fetchall(
                 "SELECT 1 FROM AUTOTHREAD_CONFIG WHERE CHANNEL_ID=?;",
-                (channel.id,)).fetchall()
+                (channel.id,))
                  ) >= 1:
 
             await resp.send_message("This channel is already auto threaded.", ephemeral=True)
             return
 
-        self.database.execute(
+        await self.database.execute(
             "INSERT INTO AUTOTHREAD_CONFIG (GUILD_ID, CHANNEL_ID) VALUES (?, ?);",
             (channel.guild.id, channel.id)
         )
 
-        self.__update_config_from_db()
+        await self.__update_config_from_db()
 
         await resp.send_message(f"Channel <#{channel.id}> is now auto threaded.", ephemeral=True)
 
@@ -86,20 +89,20 @@ class AutoThread(commands.GroupCog):
             )
             return
 
-        elif len(self.database.execute(
+        elif len(await self.database.fetchall(
                 "SELECT 1 FROM AUTOTHREAD_CONFIG WHERE CHANNEL_ID=?;",
-                (channel.id,)).fetchall()
+                (channel.id,))
                  ) == 0:
 
             await resp.send_message("This channel isn't already auto threaded.", ephemeral=True)
             return
 
-        self.database.execute(
+        await self.database.execute(
             "DELETE FROM AUTOTHREAD_CONFIG WHERE GUILD_ID=? AND CHANNEL_ID=?;",
             (channel.guild.id, channel.id)
         )
 
-        self.__update_config_from_db()
+        await self.__update_config_from_db()
 
         await resp.send_message(f"Channel <#{channel.id}> removed from auto threaded channels", ephemeral=True)
 
@@ -113,10 +116,10 @@ class AutoThread(commands.GroupCog):
         resp: InteractionResponse = interaction.response
 
         channels = []
-        for i in self.database.execute(
+        for i in await self.database.fetchall(
                 "SELECT CHANNEL_ID FROM AUTOTHREAD_CONFIG WHERE GUILD_ID=?;",
                 (interaction.guild.id,)
-        ).fetchall():
+        ):
             channels.append(f"<#{i[0]}> | {i[0]}")
 
         if len(channels) == 0:
@@ -142,15 +145,15 @@ class AutoThread(commands.GroupCog):
     async def add_whitelist_thread(self, interaction: Interaction, user: Member):
         resp: InteractionResponse = interaction.response
 
-        if len(self.database.execute(
+        if len(await self.database.fetchall(
                 "SELECT 1 FROM AUTOTHREAD_REACT_WLIST WHERE GUILD_ID=? AND USER_ID=?;",
-                (interaction.guild.id, user.id)).fetchall()
+                (interaction.guild.id, user.id))
                  ) >= 1:
 
             await resp.send_message("This user is already whitelisted.", ephemeral=True)
             return
 
-        self.database.execute(
+        await self.database.execute(
             "INSERT INTO AUTOTHREAD_REACT_WLIST (GUILD_ID, USER_ID) VALUES (?, ?);",
             (interaction.guild.id, user.id)
         )
@@ -166,15 +169,15 @@ class AutoThread(commands.GroupCog):
     async def remove_whitelist_thread(self, interaction: Interaction, user: Member):
         resp: InteractionResponse = interaction.response
 
-        if len(self.database.execute(
+        if len(await self.database.fetchall(
                 "SELECT 1 FROM AUTOTHREAD_REACT_WLIST WHERE GUILD_ID=? AND USER_ID=?;",
-                (interaction.guild.id,user.id)).fetchall()
+                (interaction.guild.id,user.id))
                  ) == 0:
 
             await resp.send_message("This user isn't already whitelisted.", ephemeral=True)
             return
 
-        self.database.execute(
+        await self.database.execute(
             "DELETE FROM AUTOTHREAD_REACT_WLIST WHERE GUILD_ID=? AND USER_ID=?;",
             (interaction.guild.id, user.id)
         )
@@ -191,10 +194,10 @@ class AutoThread(commands.GroupCog):
         resp: InteractionResponse = interaction.response
 
         channels = []
-        for i in self.database.execute(
+        for i in await self.database.fetchall(
                 "SELECT USER_ID FROM AUTOTHREAD_REACT_WLIST WHERE GUILD_ID=?;",
                 (interaction.guild.id,)
-        ).fetchall():
+        ):
             channels.append(f"<@{i[0]}> | {i[0]}")
 
         if len(channels) == 0:
@@ -238,9 +241,9 @@ class AutoThread(commands.GroupCog):
                 await self.__make_thread(message)
 
             elif len(
-                    self.database.execute(
+                    await self.database.fetchall(
                         "SELECT 1 FROM AUTOTHREAD_REACT_WLIST WHERE GUILD_ID=? AND USER_ID=?;",
-                        (message.guild.id, message.author.id)).fetchall()
+                        (message.guild.id, message.author.id))
             ):
                 await self.thread_react(message)
 
@@ -251,5 +254,5 @@ class AutoThread(commands.GroupCog):
 
 # === DO NOT REMOVE THE FOLLOWING OR CHANGE PARAMETERS === #
 
-async def setup(bot: commands.AutoShardedBot, database: sqlite3.Connection):
+async def setup(bot: commands.AutoShardedBot, database: AsyncDatabase):
     await bot.add_cog(AutoThread(bot, database))
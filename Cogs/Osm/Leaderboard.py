@@ -1,12 +1,12 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
-import sqlite3
 from dataclasses import dataclass
 from typing import List
 
 import discord
 
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 
 
@@ -25,23 +25,23 @@ class LeaderboardEntry:
     Blocks_nb: int
 
 
-def make_leaderboard(db: sqlite3.Connection, guild_id: int, since: int) -> List[LeaderboardEntry]:
+async def make_leaderboard(db: AsyncDatabase, guild_id: int, since: int) -> List[LeaderboardEntry]:
     leaderboard = []
 
-    for i in db.execute(
+    for i in await db.fetchall(
             "SELECT DISC_UID, OSM_UID, OSM_NAME FROM OSM_LEADERBOARD_USERS WHERE INSTR(DISC_GUILDS, ?) >0;",
             (str(guild_id),)
-    ).fetchall():
+    ):
 
         d_id = i[0]  # discord id
         o_uid = i[1]  # osm uid
         o_name = i[2]  # osm name
 
-        values = db.execute(
+        values = await db.fetchall(
             "WITH D AS (SELECT CHANGES_NB, NOTES_NB, TRACES_NB, BLOCKS_NB, TIMESTAMP FROM OSM_LEADERBOARD_DATA "
             "WHERE OSM_UID=? AND TIMESTAMP >= ?) SELECT * FROM (SELECT * FROM D ORDER BY TIMESTAMP DESC "
             "LIMIT 1) UNION SELECT * FROM (SELECT * FROM D ORDER BY TIMESTAMP ASC LIMIT 1);",
-            (o_uid, since)).fetchall()
+            (o_uid, since))
 
         if len(values) == 0:
             continue
@@ -72,8 +72,8 @@ def make_leaderboard(db: sqlite3.Connection, guild_id: int, since: int) -> List[
     return leaderboard
 
 
-def make_leaderboard_embed(db: sqlite3.Connection, guild: discord.Guild, since: int) -> discord.Embed:
-    leaderboard = make_leaderboard(db, guild.id, since)
+async def make_leaderboard_embed(db: AsyncDatabase, guild: discord.Guild, since: int) -> discord.Embed:
+    leaderboard = await make_leaderboard(db, guild.id, since)
 
     if since == 0:
         desc = f"This is the leaderboard for `{guild.name}` for all time"
@@ -1,7 +1,6 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
-import sqlite3
 from typing import Any
 
 import discord
@@ -10,11 +9,12 @@ from discord import Interaction
 from Cogs.Osm.Py_OSM_API import OSMUser
 from Cogs.Osm.Py_OSM_API import PyOSM
 from Cogs.Osm.RegisterUserInDB import register_user_in_db
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 
 
 class RegisterSelectSelector(discord.ui.Select):
-    def __init__(self, py_osm: PyOSM, user_id: int, database: sqlite3.Connection):
+    def __init__(self, py_osm: PyOSM, user_id: int, database: AsyncDatabase):
         self.py_osm = py_osm
         self.user_id = user_id
         self.db = database
@@ -63,7 +63,7 @@ class RegisterUID(discord.ui.Modal):
         max_length=10
     )
 
-    def __init__(self, py_osm: PyOSM, database: sqlite3.Connection):
+    def __init__(self, py_osm: PyOSM, database: AsyncDatabase):
         super().__init__(title="Register OSM user")
         self.py_osm = py_osm
         self.db = database
@@ -102,7 +102,7 @@ class RegisterUName(discord.ui.Modal):
         max_length=100
     )
 
-    def __init__(self, py_osm: PyOSM, database: sqlite3.Connection):
+    def __init__(self, py_osm: PyOSM, database: AsyncDatabase):
         super().__init__(title="Register OSM user")
         self.py_osm = py_osm
         self.db = database
@@ -153,7 +153,7 @@ class ConfirmationSelector(discord.ui.Select):
 
         return e
 
-    def __init__(self, user_id: int, database: sqlite3.Connection, osm_user: OSMUser, py_osm: PyOSM):
+    def __init__(self, user_id: int, database: AsyncDatabase, osm_user: OSMUser, py_osm: PyOSM):
         self.user_id = user_id
         self.db = database
         self.osm_user = osm_user
@@ -2,30 +2,33 @@
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import datetime
-import sqlite3
 from typing import Any
 
 import discord
 from discord import Interaction
 
 from Cogs.Osm.TimeUtils import compact_str_to_human
+from GlobalModules.AsyncDatabase import AsyncDatabase
 
 
 class RemoveLeaderboardSelector(discord.ui.Select):
-    def __init__(self, author: discord.Member, guild: discord.Guild, database: sqlite3.Connection):
+    def __init__(self, author: discord.Member, guild: discord.Guild, database: AsyncDatabase):
         self.author = author
         self.guild = guild
         self.db = database
 
         placeholder = "Select the automatic message you want to remove"
 
-        super().__init__(placeholder=placeholder, options=self.__make_options())
+        super().__init__(placeholder=placeholder, options=[])
 
-    def __make_options(self):
+    async def update_options(self) -> None:
+        self.options = await self.__make_options()
+
+    async def __make_options(self):
         ret = []
-        for channel_id, last_update, update_every in self.db.execute(
+        for channel_id, last_update, update_every in await self.db.fetchall(
                 "SELECT CHANNEL_ID,LAST_UPDATE,UPDATE_EVERY FROM OSM_LEADERBOARD_AUTO_MSG WHERE GUILD_ID=?;",
-                (self.guild.id,)).fetchall():
+                (self.guild.id,)):
 
             channel_name = self.guild.get_channel(channel_id)
 
@@ -48,12 +51,11 @@ class RemoveLeaderboardSelector(discord.ui.Select):
         last_update = int(inte.data['values'][0].split(",")[1])
         update_every = inte.data['values'][0].split(",")[2]
 
-        self.db.execute(
+        await self.db.execute(
             "DELETE FROM OSM_LEADERBOARD_AUTO_MSG WHERE GUILD_ID=? AND CHANNEL_ID=? AND LAST_UPDATE=? AND "
             "UPDATE_EVERY=?;",
             (self.guild.id, channel_id, last_update, update_every)
         )
-        self.db.commit()
 
         self.disabled = True
         view = discord.ui.View()
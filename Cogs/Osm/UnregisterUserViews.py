@@ -2,17 +2,17 @@
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import json
-import sqlite3
 from typing import Any, Tuple
 
 import discord.ui
 from discord import Interaction
 
 from Cogs.Osm.Py_OSM_API import OSMUser
+from GlobalModules.AsyncDatabase import AsyncDatabase
 
 
 class UnregisterView(discord.ui.View):
-    def __init__(self, db: sqlite3.Connection, osm_user: OSMUser, on_guild: bool, guild_nb: int, user_id: int):
+    def __init__(self, db: AsyncDatabase, osm_user: OSMUser, on_guild: bool, guild_nb: int, user_id: int):
         self.db = db
         self.osm_user = osm_user
         self.user_id = user_id
@@ -23,7 +23,7 @@ class UnregisterView(discord.ui.View):
 
 
 class UnregisterSelect(discord.ui.Select):
-    def __init__(self, user_id: int, database: sqlite3.Connection, osm_user: OSMUser, on_guild: bool, guild_nb: int):
+    def __init__(self, user_id: int, database: AsyncDatabase, osm_user: OSMUser, on_guild: bool, guild_nb: int):
         self.user_id = user_id
         self.db = database
         self.osm_user = osm_user
@@ -62,10 +62,10 @@ class UnregisterSelect(discord.ui.Select):
 
         match inte.data['values'][0]:
             case "G":  # Guild only
-                cursor = self.db.execute(
+                cursor = await self.db.fetchone(
                     "SELECT DISC_GUILDS FROM OSM_LEADERBOARD_USERS WHERE DISC_UID=? LIMIT 1;",
                     (self.user_id,)
-                ).fetchone()
+                )
 
                 if cursor is None:
                     await inte.response.send_message("An error appened", ephemeral=True)
@@ -115,7 +115,7 @@ class ConfirmationSelector(discord.ui.Select):
     def __init__(
             self,
             user_id: int,
-            database: sqlite3.Connection,
+            database: AsyncDatabase,
             sql_statement: str,
             sql_param: Tuple[str | int, ...],
             success_message: str
@@ -154,8 +154,7 @@ class ConfirmationSelector(discord.ui.Select):
 
         if inte.data['values'][0] == "Y":
             try:
-                self.db.execute(self.sql_statement, self.sql_param),
-                self.db.commit()
+                await self.db.execute(self.sql_statement, self.sql_param)
                 msg = self.success_message
 
             except Exception as err:
@@ -3,7 +3,6 @@
 
 import datetime
 import json
-import sqlite3
 import time
 
 import discord
@@ -19,20 +18,53 @@ from Cogs.Osm.TimeUtils import transform_str_to_datetime_args, date_to_timestamp
     wait_specific_time
 from Cogs.Osm.UnregisterUserViews import UnregisterView
 from Core.IsTestVersion import is_test_version
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.HasPerm import has_perm
 
+MIGRATIONS = [
+    (
+        "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_USERS ("
+        "DISC_UID INTEGER UNIQUE,"
+        "DISC_GUILDS JSON,"
+        "OSM_UID INTEGER UNIQUE,"
+        "OSM_NAME TEXT);",
+
+        "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_DATA ("
+        "TIMESTAMP UNSIGNED INT(10),"
+        "OSM_UID INTEGER,"
+        "CHANGESET_NB INTEGER,"
+        "CHANGES_NB INTEGER,"
+        "NOTES_NB INTEGER,"
+        "TRACES_NB INTEGER,"
+        "BLOCKS_NB INTEGER,"
+        "BLOCKS_ACTIVE INTEGER);",
+
+        "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_AUTO_MSG ("
+        "GUILD_ID INTEGER,"
+        "CHANNEL_ID INTEGER,"
+        "LAST_UPDATE INTEGER,"
+        "NEXT_UPDATE INTEGER,"
+        "UPDATE_EVERY TEXT);"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS OSM_LEADERBOARD_DATA_UID ON OSM_LEADERBOARD_DATA (OSM_UID, TIMESTAMP);",
+        "CREATE INDEX IF NOT EXISTS OSM_LEADERBOARD_DATA_TIMESTAMP ON OSM_LEADERBOARD_DATA (TIMESTAMP);",
+        "CREATE INDEX IF NOT EXISTS OSM_LEADERBOARD_AUTO_MSG_GUILD ON OSM_LEADERBOARD_AUTO_MSG (GUILD_ID);",
+        "CREATE INDEX IF NOT EXISTS OSM_LEADERBOARD_AUTO_MSG_NEXT ON OSM_LEADERBOARD_AUTO_MSG (NEXT_UPDATE);"
+    )
+]
+
 
 # === DO NOT CHANGE CLASS NAME OR __init__ PARAMETERS === #
 class Osm(commands.GroupCog):
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection, py_osm: PyOSM):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase, py_osm: PyOSM):
         self.bot: bot = bot
         self.database = database
 
         self.py_osm: PyOSM = py_osm
 
-        self.check_db()
-
+    async def cog_load(self) -> None:
         self.update_data_task.start()
         self.send_leaderboards_task.start()
 
@@ -40,45 +72,13 @@ class Osm(commands.GroupCog):
         self.update_data_task.stop()
         self.send_leaderboards_task.stop()
 
-    def check_db(self):
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_USERS ("
-            "DISC_UID INTEGER UNIQUE,"
-            "DISC_GUILDS JSON,"
-            "OSM_UID INTEGER UNIQUE,"
-            "OSM_NAME TEXT);"
-        )
-
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_DATA ("
-            "TIMESTAMP UNSIGNED INT(10),"
-            "OSM_UID INTEGER,"
-            "CHANGESET_NB INTEGER,"
-            "CHANGES_NB INTEGER,"
-            "NOTES_NB INTEGER,"
-            "TRACES_NB INTEGER,"
-            "BLOCKS_NB INTEGER,"
-            "BLOCKS_ACTIVE INTEGER);"
-        )
-
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS OSM_LEADERBOARD_AUTO_MSG ("
-            "GUILD_ID INTEGER,"
-            "CHANNEL_ID INTEGER,"
-            "LAST_UPDATE INTEGER,"
-            "NEXT_UPDATE INTEGER,"
-            "UPDATE_EVERY TEXT);"
-        )
-
-        self.database.commit()
-
     @app_commands.command(name="register_user", description="Match your OSM account to your discord account")
     @has_perm()
     async def register_user(self, interaction: Interaction):
-        data = self.database.execute(
+        data = await self.database.fetchone(
             "SELECT DISC_GUILDS FROM OSM_LEADERBOARD_USERS WHERE DISC_UID=? LIMIT 1;",
             (interaction.user.id,)
-        ).fetchone()
+        )
 
         if data is None:
             e = discord.Embed(
@@ -120,11 +120,10 @@ class Osm(commands.GroupCog):
             else:
                 guilds.append(interaction.guild_id)
 
-                self.database.execute(
+                await self.database.execute(
                     "UPDATE OSM_LEADERBOARD_USERS SET DISC_GUILDS=? WHERE DISC_UID=?;",
                     (json.dumps(guilds), interaction.user.id)
                 )
-                self.database.commit()
 
                 await interaction.response.send_message(
                     "Your linked OSM account was syccessfully added to this guild", ephemeral=True
@@ -133,10 +132,10 @@ class Osm(commands.GroupCog):
     @app_commands.command(name="unregister_user", description="Unmatch your OSM account to your discord account")
     @has_perm()
     async def unregister_user(self, interaction: Interaction):
-        data = self.database.execute(
+        data = await self.database.fetchone(
             "SELECT DISC_GUILDS, OSM_UID FROM OSM_LEADERBOARD_USERS WHERE DISC_UID=? LIMIT 1;",
             (interaction.user.id,)
-        ).fetchone()
+        )
 
         if data is None:
             await interaction.response.send_message("No OSM account are linked to you", ephemeral=True)
@@ -204,7 +203,7 @@ class Osm(commands.GroupCog):
         if channel is None:
             channel = interaction.channel
 
-        self.database.execute(
+        await self.database.execute(
             "INSERT INTO OSM_LEADERBOARD_AUTO_MSG (GUILD_ID,CHANNEL_ID,LAST_UPDATE,NEXT_UPDATE,UPDATE_EVERY) VALUES "
             "(?,?,?,?,?);",
             (
@@ -218,8 +217,6 @@ class Osm(commands.GroupCog):
             )
         )
 
-        self.database.commit()
-
         await interaction.response.send_message(
             f"Successfully added an automatic message which will be sent {duration.name.lower()} in <#{channel.id}>",
             ephemeral=True
@@ -230,6 +227,7 @@ class Osm(commands.GroupCog):
     @has_perm()
     async def rm_leaderboard_msg(self, interaction: Interaction):
         selector = RemoveLeaderboardSelector(interaction.user, interaction.guild, self.database)
+        await selector.update_options()
 
         if len(selector.options):
             view = discord.ui.View()
@@ -245,9 +243,9 @@ class Osm(commands.GroupCog):
     @has_perm()
     async def list_leaderboard_msg(self, interaction: Interaction):
         entries = []
-        for channel_id, last_update, update_every in self.database.execute(
+        for channel_id, last_update, update_every in await self.database.fetchall(
                 "SELECT CHANNEL_ID,LAST_UPDATE,UPDATE_EVERY FROM OSM_LEADERBOARD_AUTO_MSG WHERE GUILD_ID=?;",
-                (interaction.guild_id,)).fetchall():
+                (interaction.guild_id,)):
             entries.append(
                 f"- In <#{channel_id}> (`{channel_id}`)\n  - Last updated was on <t:{last_update}:F>\n  - Updates every"
                 f" `{compact_str_to_human(update_every)}`"
@@ -296,7 +294,7 @@ class Osm(commands.GroupCog):
                 datetime.date.today() - datetime.timedelta(**transform_str_to_datetime_args(period.value))
             )
 
-        e = make_leaderboard_embed(
+        e = await make_leaderboard_embed(
             self.database,
             interaction.guild,
             since
@@ -312,7 +310,7 @@ class Osm(commands.GroupCog):
 
 
     async def update_data(self):
-        uids = [i[0] for i in self.database.execute("SELECT OSM_UID FROM OSM_LEADERBOARD_USERS;").fetchall()]
+        uids = [i[0] for i in await self.database.fetchall("SELECT OSM_UID FROM OSM_LEADERBOARD_USERS;")]
 
         if not uids:
             return
@@ -323,13 +321,14 @@ class Osm(commands.GroupCog):
             return
 
         ts = int(time.time())
+        rows = []
 
         for i in users:
-            cursor = self.database.execute(
+            cursor = await self.database.fetchone(
                 "SELECT TIMESTAMP, CHANGESET_NB, CHANGES_NB, NOTES_NB FROM OSM_LEADERBOARD_DATA "
                 "WHERE OSM_UID=? ORDER BY TIMESTAMP DESC LIMIT 1;",
                 (i.uid,)
-            ).fetchone()
+            )
 
             last_timestamps = datetime.datetime.fromtimestamp(cursor[0] + 1 if cursor is not None else 0)
             last_changeset_nb = cursor[1] if cursor is not None else 0
@@ -344,27 +343,28 @@ class Osm(commands.GroupCog):
 
             notes_nb = await get_notes_nb(self.py_osm, i.uid, last_timestamps) + last_notes_nb
 
-            self.database.execute(
+            rows.append((
+                ts,
+                i.uid,
+                i.changesets_count,
+                changes_nb,
+                notes_nb,
+                i.traces_count,
+                i.blocks_count,
+                i.blocks_active
+            ))
+
+        async with self.database.transaction() as transaction:
+            transaction.executemany(
                 "INSERT INTO OSM_LEADERBOARD_DATA (TIMESTAMP, OSM_UID, CHANGESET_NB, CHANGES_NB, NOTES_NB, "
                 "TRACES_NB, BLOCKS_NB, BLOCKS_ACTIVE) VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
-                (
-                    ts,
-                    i.uid,
-                    i.changesets_count,
-                    changes_nb,
-                    notes_nb,
-                    i.traces_count,
-                    i.blocks_count,
-                    i.blocks_active
-                )
+                rows
             )
 
-        self.database.execute(
-            "DELETE FROM OSM_LEADERBOARD_DATA WHERE TIMESTAMP < ?;",
-            (ts - get_config("Osm.Leaderboard.DeleteAfter"),)
-        )
-
-        self.database.commit()
+            transaction.execute(
+                "DELETE FROM OSM_LEADERBOARD_DATA WHERE TIMESTAMP < ?;",
+                (ts - get_config("Osm.Leaderboard.DeleteAfter"),)
+            )
 
     @tasks.loop(hours=23, minutes=50)
     async def send_leaderboards_task(self):
@@ -373,10 +373,10 @@ class Osm(commands.GroupCog):
 
         await self.update_data()
 
-        for i in self.database.execute(
+        for i in await self.database.fetchall(
                 "SELECT CHANNEL_ID, LAST_UPDATE, UPDATE_EVERY FROM OSM_LEADERBOARD_AUTO_MSG WHERE NEXT_UPDATE <= ?;",
                 (int(time.time()) - 500,)  # 500 seconds to be sure to catch everything
-        ).fetchall():
+        ):
 
             channel = await self.bot.fetch_channel(i[0])
             last_update = i[1]
@@ -387,11 +387,11 @@ class Osm(commands.GroupCog):
             if channel is None:
                 continue
 
-            e = make_leaderboard_embed(self.database, channel.guild, last_update)
+            e = await make_leaderboard_embed(self.database, channel.guild, last_update)
 
             await channel.send(embed=e)
 
-            self.database.execute(
+            await self.database.execute(
                 "UPDATE OSM_LEADERBOARD_AUTO_MSG SET LAST_UPDATE=?, NEXT_UPDATE=? WHERE CHANNEL_ID=? AND "
                 "LAST_UPDATE=? AND UPDATE_EVERY=?;",
                 (
@@ -402,13 +402,12 @@ class Osm(commands.GroupCog):
                     i[2]
                 )
             )
-            self.database.commit()
 
 
 
 # === DO NOT REMOVE THE FOLLOWING OR CHANGE PARAMETERS === #
 
-async def setup(bot: commands.AutoShardedBot, database: sqlite3.Connection):
+async def setup(bot: commands.AutoShardedBot, database: AsyncDatabase):
     py_osm = await py_osm_builder()
     await bot.add_cog(Osm(bot, database, py_osm))
 
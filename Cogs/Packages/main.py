@@ -2,18 +2,19 @@
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import json
-import sqlite3
 from typing import Optional, Dict, Any
 
 import aiohttp
 from discord.ext import commands, tasks
 
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
+from GlobalModules.Tracing import get_aiohttp_trace_config
 
 
 # class Packages(commands.GroupCog):
 class Packages(commands.Cog):  # Passed under commands.cog since there is no commands inside this cog
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase):
         self.bot: bot = bot
         self.database = database
 
@@ -31,7 +32,7 @@ class Packages(commands.Cog):  # Passed under commands.cog since there is no com
 
     @staticmethod
     async def get_package_info(package: str) -> Optional[Dict[str, Any]]:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[get_aiohttp_trace_config()]) as session:
             async with session.get(f"https://pypi.org/pypi/{package}/json") as response:
                 if response.status == 200:
                     return json.loads(await response.text())
@@ -56,5 +57,5 @@ class Packages(commands.Cog):  # Passed under commands.cog since there is no com
                     self.version[name] = ver
 
 
-async def setup(bot: commands.AutoShardedBot, database: sqlite3.Connection):
+async def setup(bot: commands.AutoShardedBot, database: AsyncDatabase):
     await bot.add_cog(Packages(bot, database))
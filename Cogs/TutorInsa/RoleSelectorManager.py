@@ -2,7 +2,6 @@
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import json
-import sqlite3
 from typing import List, Dict, Tuple
 
 import discord
@@ -10,13 +9,14 @@ from discord import Interaction, ButtonStyle
 
 from Cogs.TutorInsa.ConfirmSelect import ConfirmSelector
 from Cogs.TutorInsa.Types.ClassEntry import ClassEntry
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Logger import Logger
 
 
 class RoleSelectorManager:
-    def __init__(self, db: sqlite3.Connection, guild: discord.Guild, author: discord.Member):
-        self.db: sqlite3.Connection = db
+    def __init__(self, db: AsyncDatabase, guild: discord.Guild, author: discord.Member):
+        self.db: AsyncDatabase = db
         self.guild: discord.Guild = guild
         self.author: discord.Member = author
 
@@ -33,11 +33,10 @@ class RoleSelectorManager:
     async def add_callback(self, inte: Interaction) -> None:
         msg = await self.send_message(inte.channel)
 
-        self.db.execute(
+        await self.db.execute(
             "INSERT INTO TUTOR_ROLES_SELECTOR (MESSAGE_ID,CHANNEL_ID,GUILD_ID) VALUES (?,?,?);",
             (msg.id, inte.channel_id, inte.guild_id)
         )
-        self.db.commit()
 
         await inte.followup.send("Successfully added this role selector", ephemeral=True)
 
@@ -79,21 +78,20 @@ class RoleSelectorManager:
             return
 
         try:
-            channel_id: int = self.db.execute(
+            channel_id: int = (await self.db.fetchone(
                 "SELECT CHANNEL_ID FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;",
                 (inte.guild_id,)
-            ).fetchone()[0]
+            ))[0]
 
             channel: discord.TextChannel = await inte.guild.fetch_channel(channel_id)
 
             await self.delete_actual_message(inte.guild)
             msg = await self.send_message(channel)
 
-            self.db.execute(
+            await self.db.execute(
                 "INSERT INTO TUTOR_ROLES_SELECTOR (MESSAGE_ID,CHANNEL_ID,GUILD_ID) VALUES (?,?,?);",
                 (msg.id, channel_id, inte.guild_id)
             )
-            self.db.commit()
 
             await inte.response.send_message("Message resent successfully", ephemeral=True)
 
@@ -161,10 +159,10 @@ class RoleSelectorManager:
         return await channel.send(embed=e, view=view)
 
     async def delete_actual_message(self, guild: discord.Guild):
-        tmp: Tuple[int, int] | None = self.db.execute(
+        tmp: Tuple[int, int] | None = await self.db.fetchone(
             "SELECT MESSAGE_ID, CHANNEL_ID FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;",
             (guild.id,)
-        ).fetchone()
+        )
 
         actual_channel: discord.TextChannel = guild.get_channel(tmp[1])
 
@@ -176,12 +174,11 @@ class RoleSelectorManager:
             except (discord.NotFound, discord.Forbidden):
                 pass
 
-        self.db.execute("DELETE FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;", (guild.id,))
-        self.db.commit()
+        await self.db.execute("DELETE FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;", (guild.id,))
 
 
 class SelectorCallbacks:
-    def __init__(self, db: sqlite3.Connection):
+    def __init__(self, db: AsyncDatabase):
         self.db = db
 
     async def selector_year_callback(self, inte: discord.Interaction):
@@ -203,10 +200,10 @@ class SelectorCallbacks:
         args = list(from_json.keys())
         args.append(inte.guild_id)
 
-        from_db: List[Tuple[str]] = self.db.execute(
+        from_db: List[Tuple[str]] = await self.db.fetchall(
             f"SELECT CLASS FROM TUTOR_ROLES WHERE CLASS IN ({','.join(['?'] * len(from_json))}) AND GUILD_ID=?;",
             tuple(args)
-        ).fetchall()
+        )
 
         options = []
 
@@ -262,19 +259,19 @@ class SelectorCallbacks:
 
         class_id: str = inte.data['values'][0]
 
-        to_add_id = self.db.execute(
+        to_add_id = (await self.db.fetchone(
             "SELECT ROLE_ID FROM TUTOR_ROLES WHERE GUILD_ID=? AND CLASS=?;",
             (inte.guild_id, class_id)
-        ).fetchone()[0]
+        ))[0]
 
         args = [inte.guild_id]
         args.extend([i.id for i in inte.user.roles])
 
-        to_del_id = [i[0] for i in self.db.execute(
+        to_del_id = [i[0] for i in await self.db.fetchall(
             f"SELECT ROLE_ID FROM TUTOR_ROLES WHERE GUILD_ID=? AND ROLE_ID IN "
             f"({','.join(['?'] * len(inte.user.roles))});",
             tuple(args)
-        ).fetchall()]
+        )]
 
         if to_add_id in to_del_id:
             to_del_id.remove(to_add_id)
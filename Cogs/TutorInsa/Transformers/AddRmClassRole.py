@@ -2,13 +2,13 @@
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import json
-import sqlite3
 from typing import Dict, List, Any, Tuple
 
 from discord import app_commands, Interaction
 from discord.app_commands import Choice
 
 from Cogs.TutorInsa.Types.ClassEntry import ClassEntry
+from GlobalModules.AsyncDatabase import AsyncDatabase
 
 
 class BaseTransformer(app_commands.Transformer):
@@ -41,19 +41,19 @@ class BaseTransformer(app_commands.Transformer):
 
         return [i[0] for i in priority[:25]]
 
-    def autocomplete_before(self, interaction: Interaction, value: str) -> None:
+    async def autocomplete_before(self, interaction: Interaction, value: str) -> None:
         pass
 
-    def transform_before(self, interaction: Interaction, value: str) -> None:
+    async def transform_before(self, interaction: Interaction, value: str) -> None:
         pass
 
     async def autocomplete(self, interaction: Interaction, value: str) -> List[Choice[str]]:
-        self.autocomplete_before(interaction, value)
+        await self.autocomplete_before(interaction, value)
         return [app_commands.Choice(name=i, value=i) for i in self.prioritize_choices(value)]
 
     async def transform(self, interaction: Interaction, value: Any, /) -> Tuple[str, ClassEntry] | None:
         self.update_cache()
-        self.transform_before(interaction, value)
+        await self.transform_before(interaction, value)
 
         if self.check_validity(value):
             return value, self.cache.get(value)
@@ -68,7 +68,7 @@ class BaseTransformer(app_commands.Transformer):
 
 
 class AddClassRoleTransformer(BaseTransformer):
-    def __init__(self, db: List[sqlite3.Connection]):
+    def __init__(self, db: List[AsyncDatabase]):
         super().__init__()
 
         self.db_list = db
@@ -76,29 +76,29 @@ class AddClassRoleTransformer(BaseTransformer):
         self.valid: List[str] = []
         self.guild_id: int = 0
 
-    def update_valid(self):
+    async def update_valid(self):
         db = self.db_list[0]
-        inside = [i[0] for i in db.execute(
+        inside = [i[0] for i in await db.fetchall(
             "SELECT CLASS FROM TUTOR_ROLES WHERE GUILD_ID=?;",
             (self.guild_id,)
-        ).fetchall()]
+        )]
 
         self.valid = [i for i in self.cache.keys() if i not in inside]
 
-    def autocomplete_before(self, interaction: Interaction, value: str) -> None:
+    async def autocomplete_before(self, interaction: Interaction, value: str) -> None:
         if self.guild_id != interaction.guild_id or not value:
             self.guild_id = interaction.guild_id
-            self.update_valid()
+            await self.update_valid()
 
-    def transform_before(self, interaction: Interaction, value: str) -> None:
-        self.update_valid()
+    async def transform_before(self, interaction: Interaction, value: str) -> None:
+        await self.update_valid()
 
     def check_validity(self, key: str) -> bool:
         return key in self.valid
 
 
 class RemoveClassRoleTransformer(BaseTransformer):
-    def __init__(self, db: List[sqlite3.Connection]):
+    def __init__(self, db: List[AsyncDatabase]):
         super().__init__()
 
         self.db_list = db
@@ -106,21 +106,21 @@ class RemoveClassRoleTransformer(BaseTransformer):
         self.valid: List[str] = []
         self.guild_id: int = 0
 
-    def update_valid(self):
+    async def update_valid(self):
         db = self.db_list[0]
 
-        self.valid = [i[0] for i in db.execute(
+        self.valid = [i[0] for i in await db.fetchall(
             "SELECT CLASS FROM TUTOR_ROLES WHERE GUILD_ID=?;",
             (self.guild_id,)
-        ).fetchall()]
+        )]
 
-    def autocomplete_before(self, interaction: Interaction, value: str) -> None:
+    async def autocomplete_before(self, interaction: Interaction, value: str) -> None:
         if self.guild_id != interaction.guild_id or not value:
             self.guild_id = interaction.guild_id
-            self.update_valid()
+            await self.update_valid()
 
-    def transform_before(self, interaction: Interaction, value: str) -> None:
-        self.update_valid()
+    async def transform_before(self, interaction: Interaction, value: str) -> None:
+        await self.update_valid()
 
     def check_validity(self, key: str) -> bool:
         return key in self.valid
@@ -3,7 +3,6 @@
 import asyncio
 import json
 import random
-import sqlite3
 import time
 from typing import List, Tuple
 
@@ -12,6 +11,7 @@ from discord import NotFound
 
 from Cogs.TutorInsa.ConfirmSelect import ConfirmSelector
 from Cogs.TutorInsa.Types.ClassEntry import ClassEntry
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Logger import Logger
 
@@ -44,11 +44,11 @@ async def send_tutor_request_message(channel: discord.TextChannel) -> discord.Me
     return msg
 
 
-async def delete_tutor_request_message(db: sqlite3.Connection, guild: discord.Guild):
-    msg_id, channel_id = db.execute(
+async def delete_tutor_request_message(db: AsyncDatabase, guild: discord.Guild):
+    msg_id, channel_id = await db.fetchone(
         "SELECT REQ_MSG_ID,REQ_CHANNEL_ID FROM TUTOR_REQUEST WHERE GUILD_ID = ?;",
         (guild.id,)
-    ).fetchone()
+    )
 
     try:
         channel = guild.get_channel(channel_id)
@@ -58,20 +58,20 @@ async def delete_tutor_request_message(db: sqlite3.Connection, guild: discord.Gu
         Logger(db).add_log("TUTORINSA", f"COULDN'T DELETE TUTOR REQUEST MESSAGE: {type(err)}: {err}")
 
 
-async def tutor_request_callback(db: sqlite3.Connection, inte: discord.Interaction):
-    classes = db.execute(
+async def tutor_request_callback(db: AsyncDatabase, inte: discord.Interaction):
+    classes = await db.fetchall(
         "SELECT ROLE_ID,CLASS FROM TUTOR_ROLES WHERE GUILD_ID=?;",
         (inte.guild_id,)
-    ).fetchall()
+    )
 
     roles_id = [i.id for i in inte.user.roles]
     common_classes = [i for i in classes if i[0] in roles_id]
 
     if len(common_classes) != 1:
-        c = db.execute(
+        c = await db.fetchone(
             "SELECT MESSAGE_ID,CHANNEL_ID FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;",
             (inte.guild_id,)
-        ).fetchone()
+        )
 
         if c is None:
             await inte.response.send_message(
@@ -129,16 +129,16 @@ class RequestTutoringModal(discord.ui.Modal):
         max_length=1024
     )
 
-    def __init__(self, database: sqlite3.Connection, class_id: str):
+    def __init__(self, database: AsyncDatabase, class_id: str):
         super().__init__(title="Demande de tutorat / Request tutoring session")
         self.db = database
         self.class_id = class_id
 
     async def on_submit(self, inte: discord.Interaction, /) -> None:
-        tutor_channel_id: None | Tuple[int] = self.db.execute(
+        tutor_channel_id: None | Tuple[int] = await self.db.fetchone(
             "SELECT TUTOR_REQ_CHANNEL_ID FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
             (inte.guild_id,)
-        ).fetchone()
+        )
 
         err: None | str = None
 
@@ -191,7 +191,7 @@ class RequestTutoringModal(discord.ui.Modal):
         with open("Cogs/TutorInsa/Config/classes.json", "r") as f:
             class_entry = ClassEntry(json.loads(f.read())[self.class_id])
 
-        mentions = self.mentions(class_entry, channel.guild)
+        mentions = await self.mentions(class_entry, channel.guild)
 
         e = discord.Embed(
             title="Nouvelle demande de tutorat",
@@ -252,15 +252,15 @@ class RequestTutoringModal(discord.ui.Modal):
             button
         ))
 
-    def mentions(self, class_entry: ClassEntry, guild: discord.Guild) -> str:
+    async def mentions(self, class_entry: ClassEntry, guild: discord.Guild) -> str:
         args: List[str | int] = class_entry.next
         args.append(guild.id)
 
-        from_db: List[Tuple[int]] = self.db.execute(
+        from_db: List[Tuple[int]] = await self.db.fetchall(
             f"SELECT ROLE_ID FROM TUTOR_ROLES WHERE CLASS IN ({','.join(['?'] * (len(class_entry.next) - 1))}) AND "
             f"GUILD_ID=?;",
             tuple(args)
-        ).fetchall()
+        )
 
         if len(from_db) == 0 or len(class_entry.next) == 0:
             return "`Aucun role à mentionner trouvés`"
@@ -269,7 +269,7 @@ class RequestTutoringModal(discord.ui.Modal):
 
 
 class TutorAcceptCallback:
-    def __init__(self, db: sqlite3.Connection):
+    def __init__(self, db: AsyncDatabase):
         self.db = db
         self.original_message: None | discord.Message = None
 
@@ -282,10 +282,10 @@ class TutorAcceptCallback:
         await inte.response.send_message("Voulez-vous accepter ce tutorat?", view=v, ephemeral=True)
 
     async def tutor_forward_message(self, inte: discord.Interaction):
-        accept_chanel_id = self.db.execute(
+        accept_chanel_id = await self.db.fetchone(
             "SELECT TUTOR_ACCEPT_CHANNEL_ID FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
             (inte.guild_id,)
-        ).fetchone()
+        )
 
         err: None | str = None
         accept_channel: None | discord.TextChannel = None
@@ -2,7 +2,6 @@
 # Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import json
-import sqlite3
 from typing import Tuple, List, Dict
 
 import discord
@@ -14,48 +13,47 @@ from Cogs.TutorInsa.Transformers.AddRmClassRole import AddClassRoleTransformer,
 from Cogs.TutorInsa.TutorRequestUtils import send_tutor_request_message, delete_tutor_request_message, \
     tutor_request_callback, TutorAcceptCallback
 from Cogs.TutorInsa.Types.ClassEntry import ClassEntry
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.HasPerm import has_perm
 from GlobalModules.Paginator import Paginator
 
-PTR_DB: List[sqlite3.Connection] = []
+PTR_DB: List[AsyncDatabase] = []
+
+MIGRATIONS = [
+    (
+        "CREATE TABLE IF NOT EXISTS TUTOR_ROLES ("
+        "ROLE_ID UNSIGNED INT,"
+        "GUILD_ID UNSIGNED INT,"
+        "CLASS TEXT);",
+
+        "CREATE TABLE IF NOT EXISTS TUTOR_ROLES_SELECTOR ("
+        "MESSAGE_ID UNSIGNED INT,"
+        "CHANNEL_ID UNSIGNED INT,"
+        "GUILD_ID UNSIGNED INT);",
+
+        "CREATE TABLE IF NOT EXISTS TUTOR_REQUEST ("
+        "REQ_MSG_ID UNSIGNED INT,"
+        "REQ_CHANNEL_ID UNSIGNED INT,"
+        "TUTOR_REQ_CHANNEL_ID UNSIGNED INT,"
+        "TUTOR_ACCEPT_CHANNEL_ID UNSIGNED INT,"
+        "GUILD_ID UNSIGNED INT);"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS TUTOR_ROLES_GUILD_CLASS ON TUTOR_ROLES (GUILD_ID, CLASS);",
+        "CREATE INDEX IF NOT EXISTS TUTOR_ROLES_SELECTOR_GUILD ON TUTOR_ROLES_SELECTOR (GUILD_ID);",
+        "CREATE INDEX IF NOT EXISTS TUTOR_REQUEST_GUILD ON TUTOR_REQUEST (GUILD_ID);"
+    )
+]
 
 # === DO NOT CHANGE CLASS NAME OR __init__ PARAMETERS === #
 class TutorInsa(commands.GroupCog):
     global PTR_DB
 
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase):
         self.bot: bot = bot
         self.database = database
 
-        self.database_check()
-
-    def database_check(self) -> None:
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS TUTOR_ROLES ("
-            "ROLE_ID UNSIGNED INT,"
-            "GUILD_ID UNSIGNED INT,"
-            "CLASS TEXT);"
-        )
-
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS TUTOR_ROLES_SELECTOR ("
-            "MESSAGE_ID UNSIGNED INT,"
-            "CHANNEL_ID UNSIGNED INT,"
-            "GUILD_ID UNSIGNED INT);"
-        )
-
-        self.database.execute(
-            "CREATE TABLE IF NOT EXISTS TUTOR_REQUEST ("
-            "REQ_MSG_ID UNSIGNED INT,"
-            "REQ_CHANNEL_ID UNSIGNED INT,"
-            "TUTOR_REQ_CHANNEL_ID UNSIGNED INT,"
-            "TUTOR_ACCEPT_CHANNEL_ID UNSIGNED INT,"
-            "GUILD_ID UNSIGNED INT);"
-        )
-
-        self.database.commit()
-
     @app_commands.command(name="add_class_role", description="Add a class role association in database")
     @app_commands.default_permissions(administrator=True)
     @has_perm()
@@ -72,10 +70,10 @@ class TutorInsa(commands.GroupCog):
         class_id: str = class_name[0]
         class_entry: ClassEntry = class_name[1]
 
-        count = self.database.execute(
+        count = (await self.database.fetchone(
             "SELECT COUNT(*) FROM TUTOR_ROLES WHERE CLASS=? AND GUILD_ID=?;",
             (class_id, interaction.guild_id)
-        ).fetchone()[0]
+        ))[0]
 
         if count != 0:
             await interaction.response.send_message(
@@ -84,10 +82,10 @@ class TutorInsa(commands.GroupCog):
             )
             return
 
-        count = self.database.execute(
+        count = (await self.database.fetchone(
             "SELECT COUNT(*) FROM TUTOR_ROLES WHERE ROLE_ID=? AND GUILD_ID=?;",
             (role.id, interaction.guild_id)
-        ).fetchone()[0]
+        ))[0]
 
         if count != 0:
             await interaction.response.send_message(
@@ -96,11 +94,10 @@ class TutorInsa(commands.GroupCog):
             )
             return
 
-        self.database.execute(
+        await self.database.execute(
             "INSERT INTO TUTOR_ROLES (ROLE_ID,GUILD_ID,CLASS) VALUES (?,?,?);",
             (role.id, interaction.guild_id, class_id)
         )
-        self.database.commit()
 
         await interaction.response.send_message(
             f"Successfully associated class `{class_entry.name}` with role `{role.name}` in database",
@@ -122,10 +119,10 @@ class TutorInsa(commands.GroupCog):
         class_id: str = class_name[0]
         class_entry: ClassEntry = class_name[1]
 
-        count = self.database.execute(
+        count = (await self.database.fetchone(
             "SELECT COUNT(*) FROM TUTOR_ROLES WHERE CLASS=? AND GUILD_ID=?;",
             (class_id, interaction.guild_id)
-        ).fetchone()[0]
+        ))[0]
 
         if count == 0:
             await interaction.response.send_message(
@@ -134,11 +131,10 @@ class TutorInsa(commands.GroupCog):
             )
             return
 
-        self.database.execute(
+        await self.database.execute(
             "DELETE FROM TUTOR_ROLES WHERE CLASS=? AND GUILD_ID=?;",
             (class_id, interaction.guild_id)
         )
-        self.database.commit()
 
         await interaction.response.send_message(
             f"Class `{class_entry.name}` successfully removed from database for this guild.",
@@ -155,10 +151,10 @@ class TutorInsa(commands.GroupCog):
         by_years: Dict[int, List[Tuple[ClassEntry, int]]] = dict()
         unassigned: List[str] = list(classes_json.keys())
 
-        for i in self.database.execute(
+        for i in await self.database.fetchall(
                 "SELECT CLASS, ROLE_ID FROM TUTOR_ROLES WHERE GUILD_ID=?;",
                 (interaction.guild_id,)
-        ).fetchall():
+        ):
             if i[0] in classes_json.keys():
                 entry = ClassEntry(classes_json[i[0]])
                 unassigned.remove(i[0])
@@ -242,10 +238,10 @@ class TutorInsa(commands.GroupCog):
     async def role_selector_manager(self, inte: Interaction):
         manager = RoleSelectorManager(self.database, inte.guild, inte.user)
 
-        if self.database.execute(
+        if (await self.database.fetchone(
                 "SELECT COUNT(*) FROM TUTOR_ROLES_SELECTOR WHERE GUILD_ID=?;",
                 (inte.guild_id,)
-        ).fetchone()[0] >= 1:
+        ))[0] >= 1:
             await manager.resend_delete(inte)
 
         else:
@@ -261,10 +257,10 @@ class TutorInsa(commands.GroupCog):
             tutor_request_channel: discord.TextChannel,
             tutor_accepted_channel: discord.TextChannel
     ):
-        if self.database.execute(
+        if (await self.database.fetchone(
                 "SELECT COUNT(*) FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
                 (inte.guild_id,)
-        ).fetchone()[0] >= 1:
+        ))[0] >= 1:
             await inte.response.send_message(
                 "A tutor request message is already set\nIn order to modify it, please remove it before",
                 ephemeral=True
@@ -273,12 +269,11 @@ class TutorInsa(commands.GroupCog):
 
         msg = await send_tutor_request_message(message_channel)
 
-        self.database.execute(
+        await self.database.execute(
             "INSERT INTO TUTOR_REQUEST (REQ_MSG_ID,REQ_CHANNEL_ID,TUTOR_REQ_CHANNEL_ID,TUTOR_ACCEPT_CHANNEL_ID,"
             "GUILD_ID) VALUES (?,?,?,?,?);",
             (msg.id, message_channel.id, tutor_request_channel.id, tutor_accepted_channel.id, inte.guild_id)
         )
-        self.database.commit()
 
         await inte.response.send_message(
             f"Successfully added a tutoring message in {message_channel.mention} which redirect requests into "
@@ -290,10 +285,10 @@ class TutorInsa(commands.GroupCog):
     @app_commands.default_permissions(administrator=True)
     @has_perm()
     async def remove_tutor_request(self, inte: Interaction):
-        if self.database.execute(
+        if (await self.database.fetchone(
                 "SELECT COUNT(*) FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
                 (inte.guild_id,)
-        ).fetchone()[0] == 0:
+        ))[0] == 0:
             await inte.response.send_message(
                 "There is no tutor request messages on this guild",
                 ephemeral=True
@@ -302,11 +297,10 @@ class TutorInsa(commands.GroupCog):
 
         await delete_tutor_request_message(self.database, inte.guild)
 
-        self.database.execute(
+        await self.database.execute(
             "DELETE FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
             (inte.guild_id,)
         )
-        self.database.commit()
 
         await inte.response.send_message(
             f"Successfully deleted this guild tutor request message",
@@ -317,10 +311,10 @@ class TutorInsa(commands.GroupCog):
     @app_commands.default_permissions(administrator=True)
     @has_perm()
     async def resend_tutor_request(self, inte: Interaction):
-        if self.database.execute(
+        if (await self.database.fetchone(
                 "SELECT COUNT(*) FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
                 (inte.guild_id,)
-        ).fetchone()[0] == 0:
+        ))[0] == 0:
             await inte.response.send_message(
                 "There is no tutor request messages on this guild",
                 ephemeral=True
@@ -329,18 +323,17 @@ class TutorInsa(commands.GroupCog):
 
         await delete_tutor_request_message(self.database, inte.guild)
 
-        channel_id = self.database.execute(
+        channel_id = (await self.database.fetchone(
             "SELECT REQ_CHANNEL_ID FROM TUTOR_REQUEST WHERE GUILD_ID=?;",
             (inte.guild_id,)
-        ).fetchone()[0]
+        ))[0]
 
         msg = await send_tutor_request_message(inte.guild.get_channel(channel_id))
 
-        self.database.execute(
+        await self.database.execute(
             "UPDATE TUTOR_REQUEST SET REQ_MSG_ID=? WHERE GUILD_ID=?;",
             (msg.id, inte.guild_id)
         )
-        self.database.commit()
 
         await inte.response.send_message(
             f"Successfully resent this guild tutor request message",
@@ -378,7 +371,7 @@ class TutorInsa(commands.GroupCog):
 
 # === DO NOT REMOVE THE FOLLOWING OR CHANGE PARAMETERS === #
 
-async def setup(bot: commands.AutoShardedBot, database: sqlite3.Connection):
+async def setup(bot: commands.AutoShardedBot, database: AsyncDatabase):
     global PTR_DB
 
     PTR_DB.append(database)
@@ -1,26 +1,79 @@
-import importlib
-import inspect
+import asyncio
 import os
-import sqlite3
-from typing import Dict
+import time
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from discord import AppCommandType
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+from Core.CommandTree import loading_cog
+from Core.Commands.Help import invalidate_help_cache
+from Core.DatabaseChecker import migrate
+from Core.ModuleReloader import reload_package, topological_sort
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Logger import Logger
+from GlobalModules.Metrics import timed_listener
+
+
+@dataclass
+class CogTimings:
+    import_time: float = 0.0  # Seconds
+    database_time: float = 0.0
+    setup_time: float = 0.0
+    reloaded_modules: List[str] = field(default_factory=list)  # Changed modules reloaded along the main one
+
+    def __str__(self) -> str:
+        return (
+            f"import {self.import_time * 1000:.0f} ms, database {self.database_time * 1000:.0f} ms, "
+            f"setup {self.setup_time * 1000:.0f} ms"
+        ) + (f", reloaded {', '.join(self.reloaded_modules)}" if self.reloaded_modules else "")
+
+
+@dataclass
+class CogResources:
+    listeners: List[Tuple[str, Callable[..., Any]]]  # (event name, timed listener registered in the bot)
+
+
+def get_cog_tasks(cog: commands.Cog) -> List[tasks.Loop]:
+    """
+    :param cog: A cog instance
+    :return: The loops bound to this cog which were used, a loop which was never accessed can't be running
+    """
+
+    cog_tasks = []
+
+    for i in dir(type(cog)):
+        loop = getattr(type(cog), i, None)
+
+        if isinstance(loop, tasks.Loop):
+            # Loop.__get__ stores the bound copy under the coroutine name, not under the (maybe mangled) attribute
+            # name, getattr(cog, i) would create a new copy instead of returning the started one
+            bound = cog.__dict__.get(loop.coro.__name__)
+
+            if isinstance(bound, tasks.Loop):
+                cog_tasks.append(bound)
+
+    return cog_tasks
 
 
 class CogManager:
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection) -> None:
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase) -> None:
         """
-        :param bot: The bot instance
+        Load and unload cogs, a cog main module can declare:
+        - MIGRATIONS: its schema migration steps, applied before its setup
+        - DEPENDENCIES: the names of the cogs which must be loaded before it
+        The app commands added by each cog are recorded by the bot IndexedCommandTree
+        :param bot: The bot instance, its tree must be an IndexedCommandTree
         """
 
         self.bot = bot
         self.database = database
 
         self.logger = Logger(self.database)
+        self.timings: Dict[str, CogTimings] = {}  # Load timings of the loaded cogs
+        self.resources: Dict[str, CogResources] = {}  # Listeners of the loaded cogs
 
     def list_cog(self) -> Dict[str, bool]:
         """
@@ -43,27 +96,127 @@ class CogManager:
 
         return dict(sorted(ret.items()))
 
-    async def load_cog(self, cog_name: str) -> bool:
-        """
-        Load a cog by its name
-        :param cog_name: The cog to load
-        :return: Boolean indicating if it was loaded successfully or not
-        """
+    def __get_resources(self, cog_name: str) -> CogResources:
+        cog = self.bot.get_cog(cog_name)
+
+        if cog is None:
+            return CogResources([])
+
+        listeners = []
+
+        for event, method in cog.get_listeners():  # Replace the listeners added by add_cog with timed ones
+            registered = self.bot.extra_events.get(event, [])
+
+            if method in registered:
+                listener = timed_listener(method, cog_name, event)
+                registered[registered.index(method)] = listener
+                listeners.append((event, listener))
 
+        return CogResources(listeners)
+
+    async def __setup_cog(
+            self,
+            cog_name: str,
+            module: ModuleType,
+            timings: CogTimings,
+            dependencies: Dict[str, asyncio.Task]
+    ) -> bool:
         try:
-            cog = importlib.import_module(f"Cogs.{cog_name}.main")
-            importlib.reload(cog)
-            await eval("cog.setup")(self.bot, self.database)
+            for i in getattr(module, "DEPENDENCIES", ()):
+                loaded = await dependencies[i] if i in dependencies else i in self.bot.cogs
+
+                if not loaded:
+                    raise RuntimeError(f"Dependency {i} isn't loaded")
+
+            start = time.perf_counter()
+            if hasattr(module, "MIGRATIONS"):
+                await self.database.run(migrate, cog_name, module.MIGRATIONS)
+
+            timings.database_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            token = loading_cog.set(cog_name)  # Only visible from this task
+
+            try:
+                await module.setup(self.bot, self.database)
+
+            finally:
+                loading_cog.reset(token)
 
-            self.logger.add_log("CogManager", f"Successfully loaded cog {cog_name}")
+            timings.setup_time = time.perf_counter() - start
+
+            invalidate_help_cache()
+            self.timings[cog_name] = timings
+            self.resources[cog_name] = self.__get_resources(cog_name)
+
+            self.logger.add_log("CogManager", f"Successfully loaded cog {cog_name} ({timings})")
 
             return True
 
         except Exception as err:
+            self.bot.tree.remove_cog_commands(cog_name)
             self.logger.add_log("CogManager", f"Couldn't load cog {cog_name}: {type(err)} : {err}")
 
             return False
 
+    async def load_cogs(self, cog_names: Iterable[str]) -> Dict[str, bool]:
+        """
+        Load cogs concurrently: every module is imported in a worker thread, then each cog is set up as soon as its
+        dependencies are loaded
+        :param cog_names: The cogs to load
+        :return: A dict indicating for each cog if it was loaded successfully or not
+        """
+
+        cog_names = list(dict.fromkeys(cog_names))
+        loop = asyncio.get_running_loop()
+
+        async def import_cog(cog_name: str) -> Optional[ModuleType]:
+            start = time.perf_counter()
+
+            try:  # In a worker thread, the import system serializes concurrent imports of the same module
+                module, reloaded = await loop.run_in_executor(
+                    None,
+                    reload_package,
+                    f"Cogs.{cog_name}",
+                    f"Cogs.{cog_name}.main"
+                )
+
+            except Exception as err:
+                self.logger.add_log("CogManager", f"Couldn't import cog {cog_name}: {type(err)} : {err}")
+                return None
+
+            timings[cog_name] = CogTimings(import_time=time.perf_counter() - start, reloaded_modules=reloaded)
+
+            return module
+
+        timings: Dict[str, CogTimings] = {}
+        modules = dict(zip(cog_names, await asyncio.gather(*(import_cog(i) for i in cog_names))))
+        modules = {key: value for key, value in modules.items() if value is not None}
+
+        _, cycles = topological_sort({key: getattr(value, "DEPENDENCIES", ()) for key, value in modules.items()})
+
+        for i in cycles:
+            self.logger.add_log("CogManager", f"Couldn't load cog {i}: circular dependency")
+
+        setup_tasks: Dict[str, asyncio.Task] = {}
+
+        for key, value in modules.items():
+            if key not in cycles:
+                setup_tasks[key] = asyncio.create_task(self.__setup_cog(key, value, timings[key], setup_tasks))
+
+        await asyncio.gather(*setup_tasks.values())
+
+        return {i: i in setup_tasks and setup_tasks[i].result() for i in cog_names}
+
+    async def load_cog(self, cog_name: str) -> bool:
+        """
+        Load a cog by its name
+        :param cog_name: The cog to load
+        :return: Boolean indicating if it was loaded successfully or not
+        """
+
+        return (await self.load_cogs([cog_name]))[cog_name]
+
     async def unload_cog(self, cog_name: str) -> bool:
         """
         Unload a cog by its name
@@ -75,27 +228,27 @@ class CogManager:
             if cog_name not in self.bot.cogs.keys():
                 raise ValueError(f"Cog {cog_name} is not loaded")
 
-            if isinstance(self.bot.cogs[cog_name], commands.GroupCog):
-                guilds_none = list(self.bot.guilds)
-                guilds_none.append(None)
+            removed = self.bot.tree.remove_cog_commands(cog_name)
+            resources = self.resources.pop(cog_name, CogResources([]))
+            cog_tasks = get_cog_tasks(self.bot.get_cog(cog_name))  # Also finds the loops started after the load
 
-                for guild in guilds_none:
-                    # === Remove message and user context based commands === #
+            for event, listener in resources.listeners:  # remove_cog only knows the listeners it added
+                self.bot.remove_listener(listener, event)
 
-                    for cmd_type in (AppCommandType.message, AppCommandType.user):
-                        for i in self.bot.tree.get_commands(type=cmd_type, guild=guild):
-                            if inspect.getfile(i.callback) == inspect.getfile(self.bot.cogs[cog_name].__class__):
-                                self.bot.tree.remove_command(i.name, type=i.type)
-
-                    # === Remove cog group === #
+            await self.bot.remove_cog(cog_name)
 
-                    for i in self.bot.tree.get_commands(guild=guild):
-                        if i.name.lower().replace("-", "") == cog_name.lower():
-                            self.bot.tree.remove_command(i.name, guild=guild)
+            for i in cog_tasks:  # Cogs should stop them in cog_unload, make sure none keeps running
+                if i.is_running():
+                    i.cancel()  # stop() would let a sleeping loop run one more iteration of the unloaded cog
 
-            await self.bot.remove_cog(cog_name)
+            invalidate_help_cache()
+            self.timings.pop(cog_name, None)
 
-            self.logger.add_log("CogManager", f"Successfully unloaded cog {cog_name}")
+            self.logger.add_log(
+                "CogManager",
+                f"Successfully unloaded cog {cog_name} ({removed} app commands, {len(resources.listeners)} listeners, "
+                f"{len(cog_tasks)} tasks)"
+            )
 
             return True
 
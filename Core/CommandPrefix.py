@@ -1,42 +1,39 @@
-import json
 import time
+from typing import FrozenSet
 
 import discord.ext.commands
 
-from Core.IsTestVersion import is_test_version
 from GlobalModules.GetConfig import get_config
+from GlobalModules.HasPerm import get_bot_admins
 
 
 class CommandPrefix:
     def __init__(self):
-        self.__config = {'bot_admin': [], 'prefix': "", 'next_update': 0}
+        self.__bot_admins: FrozenSet[int] = frozenset()
+        self.__prefix = ""
+        self.__next_update = 0
         self.__update_config()
 
     def __update_config(self):
-        if is_test_version():
-            filename_startswith = "test_"
+        self.__bot_admins = get_bot_admins()
+        self.__prefix = get_config("core.bot_admin_prefix")
+        self.__next_update = time.monotonic() + get_config("core.update_config_prefix_delay")
 
-        else:
-            filename_startswith = ""
-
-        with open(f"CoreConfig/Groups/{filename_startswith}bots_admin.json", "r") as f:
-            self.__config['bot_admin'] = [i['id'] for i in json.loads(f.read())]
-
-        self.__config['prefix'] = get_config("core.bot_admin_prefix")
-        self.__config['next_update'] = int(time.time() + get_config("core.update_config_prefix_delay"))
+    def __refresh_config(self):
+        if time.monotonic() > self.__next_update:
+            self.__update_config()
 
     async def prefix_callback(self, _, message: discord.Message) -> str:
-        if time.time() > self.__config['next_update']:
-            self.__update_config()
+        self.__refresh_config()
 
-        if message.author.id in self.__config['bot_admin']:
-            return self.__config['prefix']
+        if message.author.id in self.__bot_admins:
+            return self.__prefix
 
         return message.content.split(" ")[0] + "NO"
 
-    def get_allowed_users(self):
-        self.__update_config()
-        return self.__config['bot_admin']
+    def get_allowed_users(self) -> FrozenSet[int]:
+        self.__refresh_config()
+        return self.__bot_admins
 
-    def get_prefix(self):
-        return self.__config['prefix']
+    def get_prefix(self) -> str:
+        return self.__prefix
@@ -0,0 +1,74 @@
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import discord
+from discord import AppCommandType, app_commands
+from discord.abc import Snowflake
+from discord.utils import MISSING
+
+# Name of the cog being set up by the current task, set by CogManager
+loading_cog: ContextVar[Optional[str]] = ContextVar("loading_cog", default=None)
+
+# (command name, command type, guild ID or None for a global command)
+CommandKey = Tuple[str, AppCommandType, Optional[int]]
+
+
+class IndexedCommandTree(app_commands.CommandTree):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Command tree which records the app commands added while a cog is set up, so the cog can be unloaded without
+        searching the whole tree
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self.cog_commands: Dict[str, List[CommandKey]] = {}
+
+    def add_command(
+            self,
+            command: Union[app_commands.Command, app_commands.ContextMenu, app_commands.Group],
+            /,
+            *,
+            guild: Optional[Snowflake] = MISSING,
+            guilds: Sequence[Snowflake] = MISSING,
+            override: bool = False
+    ) -> None:
+        super().add_command(command, guild=guild, guilds=guilds, override=override)
+
+        cog_name = loading_cog.get()
+        if cog_name is None:
+            return
+
+        if guild is not MISSING:
+            guild_ids = [None if guild is None else guild.id]
+
+        elif guilds is not MISSING:
+            guild_ids = [i.id for i in guilds]
+
+        else:
+            guild_ids = list(getattr(command, "_guild_ids", None) or [None])
+
+        if isinstance(command, app_commands.ContextMenu):
+            command_type = command.type
+
+        else:
+            command_type = AppCommandType.chat_input
+
+        self.cog_commands.setdefault(cog_name, []).extend((command.name, command_type, i) for i in guild_ids)
+
+    def remove_cog_commands(self, cog_name: str) -> int:
+        """
+        Remove every app command recorded for a cog
+        :param cog_name: The cog name
+        :return: The number of removed commands
+        """
+
+        removed = 0
+
+        for name, command_type, guild_id in self.cog_commands.pop(cog_name, []):
+            guild = None if guild_id is None else discord.Object(id=guild_id)
+
+            if self.remove_command(name, guild=guild, type=command_type) is not None:
+                removed += 1
+
+        return removed
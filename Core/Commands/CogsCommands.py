@@ -1,18 +1,19 @@
-import sqlite3
-
 import discord
 from discord.ext import commands
 
 from Core.CogManager import CogManager
+from Core.GcPolicy import gc_policy
+from Core.TreeSync import sync_tree
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Paginator import Paginator
 
 
 class CogsCommands:
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase, cog_manager: CogManager):
         self.bot = bot
         self.db = database
-        self.cogManager = CogManager(bot, database)
+        self.cogManager = cog_manager
 
     async def list(self, ctx: commands.Context):
         loaded = []
@@ -21,7 +22,7 @@ class CogsCommands:
 
         for name, state in self.cogManager.list_cog().items():
             if state is True:
-                loaded.append(name)
+                loaded.append(f"{name} ({self.cogManager.timings[name]})" if name in self.cogManager.timings else name)
 
             elif state is False:
                 unloaded.append(name)
@@ -108,7 +109,9 @@ class CogsCommands:
                 paginator.add_page(e, i[0])
 
         await paginator.send_paginator(ctx)
-        await self.bot.tree.sync()
+        await sync_tree(self.bot, self.db, [None, *self.bot.guilds])
+
+        gc_policy.freeze()  # Collect the unloaded modules and freeze the new ones
 
     async def reload(self, ctx: commands.Context, *args):
         if len(args) == 0:
@@ -126,39 +129,36 @@ class CogsCommands:
                 if len(cog_list) == 0:
                     return await ctx.send("You can't load any cogs")
 
+        status_unload = {}
+
         for i in cog_list:
             if i in self.bot.cogs.keys():
-                status_unload = await self.cogManager.unload_cog(i)
+                status_unload[i] = await self.cogManager.unload_cog(i)
 
             else:
-                status_unload = None
-
-            if status_unload is True or status_unload is None:
-                status_load = await self.cogManager.load_cog(i)
+                status_unload[i] = None
 
-            else:
-                status_load = False
+        status_load = await self.cogManager.load_cogs([i for i in cog_list if status_unload[i] is not False])
 
-            if status_unload is True and status_load:
-                success.update({f"- {i} [Reloaded]": True})
+        for i in cog_list:
+            if status_unload[i] is True and status_load.get(i, False):
+                success.update({f"- {i} [Reloaded] ({self.cogManager.timings[i]})": True})
 
-            elif status_unload is None and status_load:
-                success.update({f"- {i} [Loaded]": True})
+            elif status_unload[i] is None and status_load.get(i, False):
+                success.update({f"- {i} [Loaded] ({self.cogManager.timings[i]})": True})
 
-            elif status_unload is False:
+            elif status_unload[i] is False:
                 success.update({f"- {i} [Couldn't unload this cog, check logs]": False})
 
-            elif status_unload is True and status_load is False:
+            elif status_unload[i] is True and status_load.get(i, False) is False:
                 success.update({f"- {i} [Cog unloaded but couldn't be reloaded, check logs]": False})
 
-            elif status_unload is None and status_load is False:
+            elif status_unload[i] is None and status_load.get(i, False) is False:
                 success.update({f"- {i} [Couldn't load this cog, check logs]": False})
 
         for i in disabled_cogs:
             if i in self.bot.cogs.keys():
-                status_unload = await self.cogManager.unload_cog(i)
-
-                if status_unload:
+                if await self.cogManager.unload_cog(i):
                     success.update({f"- {i} [Cog unloaded, load disabled by config, load it manually if needed]": True})
 
                 else:
@@ -186,4 +186,6 @@ class CogsCommands:
                 paginator.add_page(e, i[0])
 
         await paginator.send_paginator(ctx)
-        await self.bot.tree.sync()
+        await sync_tree(self.bot, self.db, [None, *self.bot.guilds])
+
+        gc_policy.freeze()  # Collect the unloaded modules and freeze the new ones
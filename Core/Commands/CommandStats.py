@@ -0,0 +1,45 @@
+import discord
+from discord.ext import commands
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.Metrics import registry
+from GlobalModules.Paginator import Paginator
+
+LINES_PER_PAGE = 30
+
+
+def format_duration(seconds: float) -> str:
+    """
+    :param seconds: A duration in seconds
+    :return: The duration in milliseconds, 6 characters wide
+    """
+
+    return f"{seconds * 1000:>6.0f}" if seconds >= 0.01 else f"{seconds * 1000:>6.1f}"
+
+
+async def command_stats_command(database: AsyncDatabase, ctx: commands.Context):
+    series = [(labels, metric) for labels, metric in registry.series("bot_command_duration_seconds") if metric.count]
+
+    if not series:
+        return await ctx.send("No command was invoked since this instance started")
+
+    lines = [f"{'Command':<32} {'Count':>7} {'p50 ms':>6} {'p95 ms':>6} {'p99 ms':>6}"]
+
+    for labels, metric in sorted(series, key=lambda i: i[1].quantile(0.95), reverse=True):
+        name = labels["command"] if labels["module"] == "core" else f"{labels['module']}.{labels['command']}"
+        lines.append(
+            f"{name[:32]:<32} {metric.count:>7} {format_duration(metric.quantile(0.5))} "
+            f"{format_duration(metric.quantile(0.95))} {format_duration(metric.quantile(0.99))}"
+        )
+
+    paginator = Paginator(database)
+
+    for i in range(0, len(lines), LINES_PER_PAGE):
+        paginator.add_page(
+            discord.Embed(
+                title="Commands latency",
+                description="```\n" + "\n".join(lines[i:i + LINES_PER_PAGE]) + "\n```"
+            )
+        )
+
+    await paginator.send_paginator(ctx, ephemeral=False)
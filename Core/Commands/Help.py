@@ -1,20 +1,36 @@
-import json
-import sqlite3
-from typing import Union, List, Dict
+from collections import OrderedDict
+from typing import Union, List, Dict, Optional, Tuple
 
 import discord
 from discord import AppCommandType
 from discord.ext import commands
 from discord.ext.commands import Command
 
-from Core.IsTestVersion import is_test_version
-from GlobalModules.GetConfig import get_config
-from GlobalModules.HasPerm import user_have_perm
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.GetConfig import config_store, get_config, get_config_path
+from GlobalModules.HasPerm import get_command_policy
 from GlobalModules.Paginator import Paginator
 
+AnyCommand = Union[Command, discord.app_commands.Command, discord.app_commands.ContextMenu]
+
+# guild ID => (module, command) of every command visible in this guild
+_commands: Dict[Optional[int], List[Tuple[str, AnyCommand]]] = {}
+# (guild ID, allowed commands) => help pages (embed, module name), least recently used first
+_pages: "OrderedDict[Tuple[Optional[int], Tuple[bool, ...]], List[Tuple[discord.Embed, str]]]" = OrderedDict()
+
+
+def invalidate_help_cache() -> None:
+    """
+    Forget every cached help document, must be called each time the commands tree or the guilds of the bot change
+    :return: None
+    """
+
+    _commands.clear()
+    _pages.clear()
+
 
 class Help:
-    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):
+    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase):
         self.bot = bot
         self.db = database
 
@@ -24,12 +40,20 @@ class Help:
     async def ctx_command(self, ctx: commands.Context):
         await self.__generate_paginator(ctx).send_paginator(ctx, ephemeral=False)
 
-    def __get_commands(self, inte_ctx: Union[discord.Interaction, commands.Context]) \
-            -> Dict[str, List[Union[Command, discord.app_commands.Command, discord.app_commands.ContextMenu]]]:
+    def __get_guild_commands(self, guild: Optional[discord.Guild]) -> List[Tuple[str, AnyCommand]]:
+        """
+        :param guild: The guild where help is invoked
+        :return: The (module, command) of every command visible in this guild, cached until the tree changes
+        """
+
+        guild_id = guild.id if guild is not None else None
 
-        command_list = {}
+        if guild_id in _commands:
+            return _commands[guild_id]
 
-        lists = [self.bot.commands, self.bot.tree.get_commands(), self.bot.tree.get_commands(guild=inte_ctx.guild)]
+        command_list = []
+
+        lists = [self.bot.commands, self.bot.tree.get_commands(), self.bot.tree.get_commands(guild=guild)]
         while lists:
             for cmd_group in lists.pop():
                 if isinstance(cmd_group, discord.app_commands.Group):
@@ -40,42 +64,56 @@ class Help:
                         (commands.Command, discord.app_commands.Command, discord.app_commands.ContextMenu)
                 ):
 
-                    module = self.__get_command_module(cmd_group)
-
-                    if self.__has_perm(inte_ctx, cmd_group.callback.__name__, module):
-                        if module not in command_list.keys():
-                            command_list.update({module: [cmd_group]})
+                    command_list.append((self.__get_command_module(cmd_group), cmd_group))
 
-                        else:
-                            command_list[module].append(cmd_group)
+        _commands[guild_id] = command_list
 
         return command_list
 
     @staticmethod
-    def __has_perm(inte_ctx: Union[discord.Interaction, commands.Context], command_name: str, module: str):
-        if module == "__main__":
-            perm_fp = f"CoreConfig/{'test_' if is_test_version() else ''}permissions.json"
+    def __has_perm(user: discord.Member, guild: discord.Guild, command_name: str, module: str) -> bool:
+        module = "core" if module == "__main__" else module
 
-        else:
-            perm_fp = f"Cogs/{module}/Config/{'test_' if is_test_version() else ''}permissions.json"
+        if command_name not in config_store.get_json(get_config_path(module, "permissions.json")):
+            return True  # Commands without permission entry are allowed
 
-        with open(perm_fp, 'r') as f:
-            perms = json.loads(f.read())
+        return get_command_policy(module, command_name).allows(user, guild)
 
-        if command_name in perms.keys():
-            if isinstance(inte_ctx, discord.Interaction):
-                return user_have_perm(inte_ctx.user, inte_ctx.guild, perms[command_name])
+    def __generate_paginator(self, inte_ctx: Union[discord.Interaction, commands.Context]) -> Paginator:
+        user = inte_ctx.user if isinstance(inte_ctx, discord.Interaction) else inte_ctx.author
+        guild_commands = self.__get_guild_commands(inte_ctx.guild)
 
-            elif isinstance(inte_ctx, commands.Context):
-                return user_have_perm(inte_ctx.author, inte_ctx.guild, perms[command_name])
+        signature = tuple(
+            self.__has_perm(user, inte_ctx.guild, cmd.callback.__name__, module) for module, cmd in guild_commands
+        )
+        key = (inte_ctx.guild.id if inte_ctx.guild is not None else None, signature)
 
-        else:
-            return True
+        if key not in _pages:
+            command_list = {}
+
+            for (module, cmd), allowed in zip(guild_commands, signature):
+                if allowed:
+                    command_list.setdefault(module, []).append(cmd)
+
+            _pages[key] = self.__generate_pages(command_list)
+
+            while len(_pages) > get_config("core.help_cache_size"):
+                _pages.popitem(last=False)
+
+        _pages.move_to_end(key)
 
-    def __generate_paginator(self, inte_ctx: Union[discord.Interaction, commands.Context]) -> Paginator:
         paginator = Paginator(self.db)
 
-        for module, i in self.__get_commands(inte_ctx).items():
+        for e, module in _pages[key]:
+            paginator.add_page(e, module)
+
+        return paginator
+
+    @staticmethod
+    def __generate_pages(command_list: Dict[str, List[AnyCommand]]) -> List[Tuple[discord.Embed, str]]:
+        pages = []
+
+        for module, i in command_list.items():
             if module == "__main__":
                 module = "Main"
 
@@ -168,9 +206,9 @@ class Help:
                         inline=False
                     )
 
-            paginator.add_page(e, module)
+            pages.append((e, module))
 
-        return paginator
+        return pages
 
     @staticmethod
     def __get_command_module(command: Union[commands.Command, discord.app_commands.commands.Command]) -> str:
@@ -0,0 +1,41 @@
+import discord
+from discord.ext import commands
+
+from Core.LoopWatchdog import LoopWatchdog
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.Metrics import registry
+from GlobalModules.Paginator import Paginator
+
+
+async def loop_lag_command(database: AsyncDatabase, watchdog: LoopWatchdog, ctx: commands.Context):
+    paginator = Paginator(database)
+
+    summary = discord.Embed(title="Event loop lag")
+
+    for _, histogram in registry.series("bot_loop_lag_seconds"):
+        if histogram.count:
+            summary.add_field(
+                name="Lag since startup",
+                value="\n".join(
+                    f"p{int(i * 100)}: `{histogram.quantile(i) * 1000:.1f} ms`" for i in (0.5, 0.95, 0.99)
+                ) + f"\nHeartbeats: `{histogram.count}`"
+            )
+
+    summary.add_field(name="Incidents kept", value=f"`{len(watchdog.incidents)}`")
+    paginator.add_page(summary, "Summary")
+
+    for i, incident in enumerate(watchdog.incidents):
+        e = discord.Embed(
+            title=f"Loop blocked for {incident.lag * 1000:.0f} ms",
+            description="```\n" + "".join(incident.stack)[-3900:] + "\n```",
+            colour=0xFF0000
+        )
+
+        e.add_field(name="When", value=f"<t:{int(incident.timestamp)}:F>")
+        e.add_field(name="CPU", value=f"`{incident.cpu_percent:.0f}%`")
+        e.add_field(name="RSS", value=f"`{incident.rss / 2 ** 20:.0f} MiB`")
+        e.add_field(name="Location", value=f"`{incident.location[:1000]}`", inline=False)
+
+        paginator.add_page(e, f"Incident {i + 1}")
+
+    await paginator.send_paginator(ctx, ephemeral=False)
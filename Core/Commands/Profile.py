@@ -0,0 +1,36 @@
+import discord
+from discord.ext import commands
+
+from Core.SamplingProfiler import SamplingProfiler
+from GlobalModules.GetConfig import get_config
+from GlobalModules.TempManager import TempManager
+
+
+async def profile_command(profiler: SamplingProfiler, ctx: commands.Context, seconds: float = 30):
+    max_seconds = get_config("core.profiler.max_seconds")
+
+    if not 0 < seconds <= max_seconds:
+        return await ctx.send(f"The duration must be between 0 and {max_seconds} seconds")
+
+    if profiler.running:
+        return await ctx.send("A profile is already running")
+
+    await ctx.send(f"Profiling for {seconds:g} seconds...")
+    profile = await profiler.profile(seconds)
+
+    collapsed_path = TempManager(after_id="profile.collapsed").make_temp_file()
+    with open(collapsed_path, "w") as f:
+        f.write(profile.collapsed())
+
+    summary_path = TempManager(after_id="profile_summary.txt").make_temp_file()
+    with open(summary_path, "w") as f:
+        f.write(profile.summary(get_config("core.profiler.top_functions")))
+
+    await ctx.send(
+        f"Profile of {profile.duration:.1f} seconds ({profile.samples} samples), "
+        "the collapsed stacks can be opened with flamegraph.pl or https://www.speedscope.app",
+        files=[
+            discord.File(collapsed_path, filename="profile.collapsed"),
+            discord.File(summary_path, filename="profile_summary.txt")
+        ]
+    )
@@ -0,0 +1,51 @@
+import collections
+import time
+
+import discord
+from discord.ext import commands
+
+from Core.SocketEvents import socket_events
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.Paginator import Paginator
+
+LINES_PER_PAGE = 30
+
+
+async def socket_stats_command(database: AsyncDatabase, ctx: commands.Context, minutes: int = 60):
+    if minutes <= 0:
+        return await ctx.send("The period must be at least 1 minute")
+
+    now = time.time()
+    start = now - minutes * 60
+
+    rows = await database.fetchall(
+        "SELECT EVENT_TYPE, SUM(COUNT), MIN(TIMESTAMP - DURATION) FROM SOCKET_EVENTS WHERE TIMESTAMP>=? "
+        "GROUP BY EVENT_TYPE;",
+        (int(start),)
+    )
+
+    counts = collections.Counter({event_type: count for event_type, count, _ in rows})
+    counts.update(socket_events.pending())
+
+    if not counts:
+        return await ctx.send(f"No gateway event received during the last {minutes} minutes")
+
+    # Rates are computed over the part of the period for which events were counted
+    oldest = min([i[2] for i in rows] + [socket_events.pending_since()])
+    covered = max(now - max(oldest, start), 1)
+
+    lines = [f"{'Event':<32} {'Count':>9} {'Rate':>10}"]
+    lines += [f"{key:<32} {value:>9} {value / covered:>8.2f}/s" for key, value in counts.most_common()]
+    lines.append(f"{'Total':<32} {sum(counts.values()):>9} {sum(counts.values()) / covered:>8.2f}/s")
+
+    paginator = Paginator(database)
+
+    for i in range(0, len(lines), LINES_PER_PAGE):
+        paginator.add_page(
+            discord.Embed(
+                title=f"Gateway events (last {covered / 60:.0f} minutes)",
+                description="```\n" + "\n".join(lines[i:i + LINES_PER_PAGE]) + "\n```"
+            )
+        )
+
+    await paginator.send_paginator(ctx, ephemeral=False)
@@ -0,0 +1,64 @@
+import discord
+from discord.ext import commands
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.Paginator import Paginator
+
+MAX_STATEMENTS = 25
+SORT_KEYS = {"total": "total_time", "count": "count", "max": "max_time", "rows": "rows"}
+
+
+async def sql_stats_command(database: AsyncDatabase, ctx: commands.Context, sort: str = "total", reset: bool = False):
+    if database.profiler is None:
+        return await ctx.send("The SQL profiler is disabled, enable it with core.data.sql_profiler.enabled")
+
+    if reset:
+        database.profiler.reset()
+        return await ctx.send("SQL statistics cleared")
+
+    if sort not in SORT_KEYS:
+        return await ctx.send(f"Unknown sort, use one of: {', '.join(SORT_KEYS)}")
+
+    statements = database.profiler.top(MAX_STATEMENTS, SORT_KEYS[sort])
+
+    if not statements:
+        return await ctx.send("No SQL statement recorded since this instance started")
+
+    lines = [f"{'#':>2} {'Count':>8} {'Total':>10} {'Max':>9} {'Rows':>9} Scan"]
+    lines += [
+        f"{i + 1:>2} {stats.count:>8} {stats.total_time * 1000:>7.0f} ms {stats.max_time * 1000:>6.1f} ms "
+        f"{stats.rows:>9} {'yes' if stats.full_scan else '-'}"
+        for i, (_, stats) in enumerate(statements)
+    ]
+
+    paginator = Paginator(database)
+    paginator.add_page(
+        discord.Embed(
+            title=f"SQL statements by {sort}",
+            description="```\n" + "\n".join(lines) + "\n```"
+        ),
+        "Summary"
+    )
+
+    for i, (sql, stats) in enumerate(statements):
+        e = discord.Embed(
+            title=f"Statement {i + 1}",
+            description="```sql\n" + sql[:3800] + "\n```",
+            colour=0xFF0000 if stats.full_scan else None
+        )
+
+        e.add_field(name="Count", value=f"`{stats.count}`")
+        e.add_field(name="Total", value=f"`{stats.total_time * 1000:.1f} ms`")
+        e.add_field(name="Mean", value=f"`{stats.total_time / max(stats.count, 1) * 1000:.2f} ms`")
+        e.add_field(name="Max", value=f"`{stats.max_time * 1000:.1f} ms`")
+        e.add_field(name="Rows", value=f"`{stats.rows}`")
+        e.add_field(
+            name="Query plan",
+            value="```\n" + "\n".join(stats.plan)[:1000] + "\n```" if stats.plan is not None
+            else "Never slower than the threshold",
+            inline=False
+        )
+
+        paginator.add_page(e, f"Statement {i + 1}")
+
+    await paginator.send_paginator(ctx, ephemeral=False)
@@ -5,6 +5,8 @@ import psutil
 from discord import ui, ButtonStyle
 from discord.ext import commands
 
+from GlobalModules.Logger import Logger
+
 
 class Stop:
     def __init__(self, ctx: commands.Context):
@@ -21,6 +23,7 @@ class Stop:
             except (discord.Forbidden, discord.NotFound, discord.HTTPException, AttributeError):
                 pass
 
+            await Logger.flush_all()
             exit(-1)
 
         else:
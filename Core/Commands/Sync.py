@@ -1,16 +1,27 @@
 from discord.ext import commands
 
+from Core.Commands.Help import invalidate_help_cache
+from Core.TreeSync import sync_tree
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.Logger import Logger
 
 
-async def sync_command(bot: commands.AutoShardedBot, logger: Logger, ctx: commands.Context, guild_only: bool = False):
+async def sync_command(
+        bot: commands.AutoShardedBot,
+        database: AsyncDatabase,
+        logger: Logger,
+        ctx: commands.Context,
+        guild_only: bool = False,
+        force: bool = False
+):
+    invalidate_help_cache()
+
     async with ctx.typing():
         if guild_only:
             if ctx.guild is None:
                 await ctx.send("Couldn't retrieve the guild information")
 
-            else:
-                await bot.tree.sync(guild=ctx.guild)
+            elif await sync_tree(bot, database, [ctx.guild], force):
                 logger.add_log(
                     "Sync",
                     f"Successfully synced commands tree for {ctx.guild.name} (id: {ctx.guild.id})"
@@ -18,8 +29,18 @@ async def sync_command(bot: commands.AutoShardedBot, logger: Logger, ctx: comman
 
                 await ctx.send("Successfully synced this guild commands tree")
 
+            else:
+                await ctx.send(
+                    "This guild commands tree is unchanged or couldn't be synced (use force = True to sync it anyway)"
+                )
+
         else:
-            await bot.tree.sync()
-            logger.add_log("Sync", "Successfully synced global commands tree")
+            if await sync_tree(bot, database, [None], force):
+                logger.add_log("Sync", "Successfully synced global commands tree")
+
+                await ctx.send("Successfully synced global commands tree")
 
-            await ctx.send("Successfully synced global commands tree")
+            else:
+                await ctx.send(
+                    "Global commands tree is unchanged or couldn't be synced (use force = True to sync it anyway)"
+                )
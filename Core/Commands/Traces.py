@@ -0,0 +1,65 @@
+import collections
+
+import discord
+from discord.ext import commands
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.Paginator import Paginator
+from GlobalModules.Tracing import Trace, slowest_traces
+
+MAX_SPAN_LINES = 40  # Spans shown per trace, the longest ones are kept
+
+
+def make_trace_page(trace: Trace) -> discord.Embed:
+    """
+    :param trace: A finished trace
+    :return: Its time per span category and its spans in start order
+    """
+
+    e = discord.Embed(title=f"{trace.name} - {trace.duration * 1000:.0f} ms")
+
+    e.add_field(name="When", value=f"<t:{int(trace.timestamp)}:F>")
+    e.add_field(name="User", value=trace.user or "-")
+
+    by_category = collections.Counter()
+    for i in trace.spans:
+        by_category[i.name.partition(".")[0]] += i.duration
+
+    if by_category:
+        e.add_field(
+            name="Time by category",
+            value="\n".join(f"{key}: `{value * 1000:.1f} ms`" for key, value in by_category.most_common()),
+            inline=False
+        )
+
+    spans = sorted(trace.spans, key=lambda i: i.duration, reverse=True)[:MAX_SPAN_LINES]
+    lines = [
+        f"+{i.start * 1000:>7.1f} {i.duration * 1000:>7.1f} ms {i.name} {i.detail}"[:110]
+        for i in sorted(spans, key=lambda i: i.start)
+    ]
+
+    hidden = len(trace.spans) - len(spans) + trace.dropped
+    if hidden:
+        lines.append(f"... {hidden} shorter spans hidden")
+
+    e.description = "```\n" + ("\n".join(lines) or "No span recorded")[:3900] + "\n```"
+
+    return e
+
+
+async def traces_command(database: AsyncDatabase, ctx: commands.Context, clear: bool = False):
+    if clear:
+        slowest_traces.clear()
+        return await ctx.send("Traces cleared")
+
+    traces = slowest_traces.get()
+
+    if not traces:
+        return await ctx.send("No trace recorded since this instance started")
+
+    paginator = Paginator(database)
+
+    for i in traces:
+        paginator.add_page(make_trace_page(i))
+
+    await paginator.send_paginator(ctx, ephemeral=False)
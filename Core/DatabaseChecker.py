@@ -1,28 +1,111 @@
+import hashlib
+import json
 import sqlite3
+import zlib
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
 
+from GlobalModules.GetConfig import get_config
 
-def check_database(database: sqlite3.Connection) -> None:
+
+def apply_pragmas(connection: sqlite3.Connection) -> None:
     """
-    Check the database and add necessary fields
-    :param database: The database to check
+    Apply the pragma profile of core.data.pragmas to a new connection
+    :param connection: The connection to tune
+    :return: None
+    """
+
+    for key, value in get_config("core.data.pragmas").items():
+        if not key.isidentifier():
+            raise ValueError(f"Invalid pragma name: {key}")
+
+        try:
+            connection.execute(f"PRAGMA {key}={value};").close()
+
+        except sqlite3.OperationalError:
+            # journal_mode is persistent and can't be changed from a read only connection, it is set by the writer
+            if key != "journal_mode":
+                raise
+
+
+def get_pragmas(connection: sqlite3.Connection) -> Dict[str, Any]:
+    """
+    :param connection: The connection to inspect
+    :return: The effective value of every pragma of the profile on this connection
+    """
+
+    return {i: connection.execute(f"PRAGMA {i};").fetchone()[0] for i in get_config("core.data.pragmas")}
+
+
+def maintain_database(connection: sqlite3.Connection) -> Tuple[int, int, int]:
+    """
+    Move the WAL content into the database file, truncate the WAL and let SQLite refresh its statistics
+    :param connection: The writer connection
+    :return: The wal_checkpoint result (busy, WAL frames, checkpointed frames)
+    """
+
+    result = connection.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+    connection.execute("PRAGMA optimize;")
+
+    return result
+
+
+def _encode_page_v1(page: dict) -> Tuple[str, bytes]:
+    """
+    Frozen copy of the PAGINATOR_PAGES encoding as released with _store_paginator_pages, this migration must keep
+    writing the same data whatever later changes are made to GlobalModules.Paginator.encode_page
+    :param page: The embed dict of a page (without name nor footer)
+    :return: The content hash of the page and its compressed data
+    """
+
+    data = json.dumps(page, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest(), zlib.compress(data)
+
+
+def _store_paginator_pages(database: sqlite3.Connection) -> None:
+    """
+    Move paginator pages from the PAGINATOR.PAGES documents to the content addressed PAGINATOR_PAGES table, footers
+    are removed as they are now rendered when a page is displayed
+    :param database: The writer connection
     :return: None
     """
 
-    database.execute(
+    database.execute("CREATE TABLE IF NOT EXISTS PAGINATOR_PAGES (HASH TEXT PRIMARY KEY, DATA BLOB);")
+    database.execute("ALTER TABLE PAGINATOR ADD COLUMN PAGE_REFS JSON;")
+
+    rows = database.execute("SELECT MESSAGE_ID, PAGES FROM PAGINATOR WHERE PAGES IS NOT NULL;").fetchall()
+
+    for message_id, pages in rows:
+        page_refs = []
+
+        for page in json.loads(pages):
+            name = page.pop("PaginatorPageName", None)
+            page.pop("footer", None)
+
+            page_hash, data = _encode_page_v1(page)
+            database.execute("INSERT OR IGNORE INTO PAGINATOR_PAGES (HASH, DATA) VALUES (?, ?);", (page_hash, data))
+            page_refs.append((page_hash, name))
+
+        database.execute(
+            "UPDATE PAGINATOR SET PAGE_REFS = ?, PAGES = NULL WHERE MESSAGE_ID = ?;",
+            (json.dumps(page_refs), message_id)
+        )
+
+
+# A migration step is either a sequence of SQL statements or a function called with the connection
+MigrationStep = Union[Sequence[str], Callable[[sqlite3.Connection], None]]
+
+CORE_MIGRATIONS: List[MigrationStep] = [
+    (
         "CREATE TABLE IF NOT EXISTS LOGS ("
         "ID INTEGER PRIMARY KEY,"
         "TIMESTAMP UNSIGNED INT(10),"
         "CATEGORY TEXT,"
-        "LOG TEXT);"
-    )
+        "LOG TEXT);",
 
-    database.execute(
         "CREATE TABLE IF NOT EXISTS LAST_USED_COMMANDS ("
         "TIMESTAMP UNSIGNED INT(10),"
-        "USER_ID INT);"
-    )
+        "USER_ID INT);",
 
-    database.execute(
         "CREATE TABLE IF NOT EXISTS PAGINATOR ("
         "MESSAGE_ID INTEGER INT,"
         "CHANNEL_ID INTEGER INT,"
@@ -30,10 +113,8 @@ def check_database(database: sqlite3.Connection) -> None:
         "USER_ID INTEGER INT,"
         "DELETE_TS UNSIGNED INT(10),"
         "PAGES JSON,"
-        "CURRENT_PAGE INT);"
-    )
+        "CURRENT_PAGE INT);",
 
-    database.execute(
         "CREATE TABLE IF NOT EXISTS ERROR_REPORT ("
         "ID INTEGER PRIMARY KEY,"
         "USER_ID INTEGER INT,"
@@ -44,6 +125,85 @@ def check_database(database: sqlite3.Connection) -> None:
         "ARGS_KWARGS JSON,"
         "EXTRA_DATA JSON,"
         "DELETE_TS UNSIGNED INT(10));"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS LOGS_TIMESTAMP ON LOGS (TIMESTAMP);",
+        "CREATE INDEX IF NOT EXISTS LAST_USED_COMMANDS_USER ON LAST_USED_COMMANDS (USER_ID, TIMESTAMP);",
+        "CREATE INDEX IF NOT EXISTS LAST_USED_COMMANDS_TIMESTAMP ON LAST_USED_COMMANDS (TIMESTAMP);",
+        "CREATE INDEX IF NOT EXISTS PAGINATOR_MESSAGE ON PAGINATOR (MESSAGE_ID);",
+        "CREATE INDEX IF NOT EXISTS PAGINATOR_DELETE_TS ON PAGINATOR (DELETE_TS);",
+        "CREATE INDEX IF NOT EXISTS ERROR_REPORT_DELETE_TS ON ERROR_REPORT (DELETE_TS);"
+    ),
+    _store_paginator_pages,
+    (
+        "ALTER TABLE PAGINATOR ADD COLUMN PROVIDER JSON;",
+    ),
+    (
+        "CREATE TABLE IF NOT EXISTS COMMAND_TREE_HASH ("
+        "SCOPE INTEGER PRIMARY KEY,"
+        "HASH TEXT);",
+    ),
+    (
+        "CREATE TABLE IF NOT EXISTS SOCKET_EVENTS ("
+        "TIMESTAMP UNSIGNED INT(10),"
+        "DURATION INT,"
+        "EVENT_TYPE TEXT,"
+        "COUNT INT);",
+
+        "CREATE INDEX IF NOT EXISTS SOCKET_EVENTS_TIMESTAMP ON SOCKET_EVENTS (TIMESTAMP);",
     )
+]
 
+
+def migrate(database: sqlite3.Connection, module: str, steps: List[MigrationStep]) -> int:
+    """
+    Bring the schema of a module up to date, the version reached by each module is stored in SCHEMA_VERSION and
+    every step is applied in its own transaction, steps must never be modified or reordered once released
+    :param database: The writer connection
+    :param module: "core" or the cog name
+    :param steps: The ordered migration steps of this module
+    :return: The schema version of the module
+    """
+
+    database.execute("CREATE TABLE IF NOT EXISTS SCHEMA_VERSION (MODULE TEXT PRIMARY KEY, VERSION INT);")
     database.commit()
+
+    row = database.execute("SELECT VERSION FROM SCHEMA_VERSION WHERE MODULE=?;", (module,)).fetchone()
+    version = 0 if row is None else row[0]
+
+    if version > len(steps):
+        raise RuntimeError(f"Schema of {module} is at version {version} but only {len(steps)} steps are known")
+
+    for number, step in enumerate(steps[version:], start=version + 1):
+        database.execute("BEGIN;")
+
+        try:
+            if callable(step):
+                step(database)
+
+            else:
+                for sql in step:
+                    database.execute(sql)
+
+            database.execute(
+                "INSERT INTO SCHEMA_VERSION (MODULE, VERSION) VALUES (?, ?) "
+                "ON CONFLICT(MODULE) DO UPDATE SET VERSION=excluded.VERSION;",
+                (module, number)
+            )
+            database.commit()
+
+        except BaseException:
+            database.rollback()
+            raise
+
+    return len(steps)
+
+
+def check_database(database: sqlite3.Connection) -> int:
+    """
+    Check the database and add necessary fields
+    :param database: The database to check
+    :return: The core schema version
+    """
+
+    return migrate(database, "core", CORE_MIGRATIONS)
@@ -1,9 +1,8 @@
 import json
-import sqlite3
 import sys
 import time
 import traceback
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, List
 
 import discord
 from discord import app_commands
@@ -11,26 +10,93 @@ from discord.ext import commands
 
 from Core.IsTestVersion import is_test_version
 from Core.UserOnCooldown import user_on_cooldown
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Logger import Logger
-from GlobalModules.Paginator import Paginator
+from GlobalModules.Paginator import Paginator, page_provider
+
+
+def split_full_error(full_error: str) -> List[str]:
+    """
+    :param full_error: A full traceback
+    :return: The traceback split in chunks small enough to fit in an embed
+    """
+
+    full_error_lines = full_error.split("\n")
+    full_error_parsed = [""]
+
+    while full_error_lines:
+        if not full_error_parsed[-1] or len(full_error_parsed[-1]) + len(full_error_lines[0]) < 3750:  # Limit at 4096
+            full_error_parsed[-1] += f"\n{full_error_lines.pop(0)[:3750]}"
+
+        else:
+            full_error_parsed.append("")
+
+    return full_error_parsed
+
+
+@page_provider("core.error_report")
+async def error_report_page(database: AsyncDatabase, page: int, error_id: int) -> discord.Embed:
+    """
+    Render a page of the get_tb paginator, page 0 is the report summary, others are traceback chunks
+    :param database: The database object
+    :param page: The page index
+    :param error_id: The error report ID
+    :return: The page
+    """
+
+    if page == 0:
+        temp = await database.fetchone(
+            "SELECT COMMAND, USER_ID, USER_NAME, BRIEF_ERROR, ARGS_KWARGS, EXTRA_DATA FROM ERROR_REPORT WHERE ID=?;",
+            (error_id,)
+        )
+
+    else:  # Only the traceback is needed, the JSON columns aren't read
+        temp = await database.fetchone("SELECT COMMAND, FULL_ERROR FROM ERROR_REPORT WHERE ID=?;", (error_id,))
+
+    if not temp:
+        return discord.Embed(title=f"Error report ID {error_id}", description="This error report has expired.")
+
+    e = discord.Embed(
+        title=f"Error report ID {error_id}",
+        description=f"Issued on command `{temp[0]}`"
+    )
+
+    if page == 0:
+        _, user_id, user_name, brief_error, args_kwargs, extra_data = temp
+
+        e.add_field(
+            name="Information",
+            value=f"User: {user_name} ({user_id})\n"
+                  f"Brief error: {brief_error}",
+            inline=False
+        )
+
+        for name, value in (("Arguments", args_kwargs), ("Extra data", extra_data)):
+            e.add_field(name=name, value=f"```json\n{json.dumps(json.loads(value), indent=4)}```", inline=False)
+
+    else:
+        full_error_parsed = split_full_error(temp[1])
+        e.description += f"\n\nFull error ({page} / {len(full_error_parsed)})```python{full_error_parsed[page - 1]}```"
+
+    return e
 
 
 class ErrorHandler:
-    def __init__(self, db: sqlite3.Connection, bot: commands.AutoShardedBot):
+    def __init__(self, db: AsyncDatabase, bot: commands.AutoShardedBot):
         self.db = db
         self.bot = bot
 
         self.logger = Logger(self.db)
 
-    def __generate_user_response(self, error, ctx: commands.Context = None) -> Union[None, str]:
+    async def __generate_user_response(self, error, ctx: commands.Context = None) -> Union[None, str]:
 
         if type(error) == commands.errors.CommandNotFound or type(error) == app_commands.errors.CommandNotFound:
             return None
 
         elif type(error) == commands.errors.CommandOnCooldown or type(error) == app_commands.errors.CommandOnCooldown:
 
-            if not user_on_cooldown(ctx.author.id, self.db):
+            if not user_on_cooldown(ctx.author.id):
                 return "Command is on cooldown."
 
             else:
@@ -83,9 +149,9 @@ class ErrorHandler:
             sys.stderr.write("\n".join(tb) + "\n")
             sys.stderr.flush()
 
-        self.db.execute("DELETE FROM ERROR_REPORT WHERE DELETE_TS < ?;", (int(time.time()),))
+        await self.db.execute("DELETE FROM ERROR_REPORT WHERE DELETE_TS < ?;", (int(time.time()),))
 
-        error_id = self.db.execute(
+        error_id = (await self.db.fetchone(
             "INSERT INTO ERROR_REPORT (USER_ID, USER_NAME, COMMAND, BRIEF_ERROR, FULL_ERROR, ARGS_KWARGS, "
             "EXTRA_DATA, DELETE_TS) VALUES (?, ?, ?, ?, ?, ?, ?, ?) RETURNING ID;",
             (
@@ -98,9 +164,7 @@ class ErrorHandler:
                 json.dumps(extra_data),
                 int(time.time() + get_config("core.error_report.delete_after"))
             )
-        ).fetchone()[0]
-
-        self.db.commit()
+        ))[0]
 
         self.logger.add_log(
             "ERROR",
@@ -138,7 +202,7 @@ class ErrorHandler:
 
     async def app_command_error(self, interaction: discord.Interaction, exception: app_commands.AppCommandError):
         error = getattr(exception, "original", exception)
-        user_message = self.__generate_user_response(error)
+        user_message = await self.__generate_user_response(error)
 
         if user_message:
             if interaction.response.is_done() or interaction.is_expired():
@@ -182,7 +246,7 @@ class ErrorHandler:
 
     async def command_error(self, ctx: commands.Context, exception: commands.CommandError):
         error = getattr(exception, "original", exception)
-        user_message = self.__generate_user_response(error, ctx)
+        user_message = await self.__generate_user_response(error, ctx)
 
         if user_message:
             await ctx.reply(content=user_message, delete_after=30)
@@ -217,63 +281,21 @@ class ErrorHandler:
         await self.__process_error(error, general_data, extra_data)
 
     async def get_tb_command(self, ctx: commands.Context, error_id: int):
-        self.db.execute("DELETE FROM ERROR_REPORT WHERE DELETE_TS < ?;", (int(time.time()),))
-        self.db.commit()
+        await self.db.execute("DELETE FROM ERROR_REPORT WHERE DELETE_TS < ?;", (int(time.time()),))
 
-        temp = self.db.execute(
-            "SELECT USER_ID, USER_NAME, COMMAND, BRIEF_ERROR, FULL_ERROR, ARGS_KWARGS, EXTRA_DATA FROM "
-            "ERROR_REPORT WHERE ID=?;",
-            (error_id,)
-        ).fetchone()
+        temp = await self.db.fetchone("SELECT FULL_ERROR FROM ERROR_REPORT WHERE ID=?;", (error_id,))
 
         if not temp:
             return await ctx.send(f"Error report N#`{error_id}` not found.")
 
-        data = {
-            'USER_ID': temp[0],
-            'USER_NAME': temp[1],
-            'COMMAND': temp[2],
-            'BRIEF_ERROR': temp[3],
-            'FULL_ERROR': temp[4],
-            'ARGS_KWARGS': json.loads(temp[5]),
-            'EXTRA_DATA': json.loads(temp[6])
-        }
+        page_count = len(split_full_error(temp[0]))
 
         paginator = Paginator(self.db)
-
-        base_embed = discord.Embed(
-            title=f"Error report ID {error_id}",
-            description=f"Issued on command `{data['COMMAND']}`"
+        paginator.set_provider(
+            "core.error_report",
+            page_count + 1,
+            error_id,
+            page_names=["Basic data"] + [f"Full error page {i + 1}" for i in range(page_count)]
         )
 
-        e = base_embed.copy()
-
-        e.add_field(
-            name="Information",
-            value=f"User: {data['USER_NAME']} ({data['USER_ID']})\n"
-                  f"Brief error: {data['BRIEF_ERROR']}",
-            inline=False
-        )
-
-        e.add_field(name="Arguments", value=f"```json\n{json.dumps(data['ARGS_KWARGS'], indent=4)}```", inline=False)
-        e.add_field(name="Extra data", value=f"```json\n{json.dumps(data['EXTRA_DATA'], indent=4)}```", inline=False)
-
-        paginator.add_page(e, "Basic data")
-
-        full_error_lines = data['FULL_ERROR'].split("\n")
-        full_error_parsed = [""]
-
-        while full_error_lines:
-            if len(full_error_parsed[-1]) + len(full_error_lines[0]) < 3750:  # Discord limit at 4096
-                full_error_parsed[-1] += f"\n{full_error_lines.pop(0)}"
-
-            else:
-                full_error_parsed.append("")
-
-        for i, value in enumerate(full_error_parsed):
-            e = base_embed.copy()
-            e.description += f"\n\nFull error ({i + 1} / {len(full_error_parsed)})```python{value}```"
-
-            paginator.add_page(e, f"Full error page {i + 1}")
-
         await paginator.send_paginator(ctx, ephemeral=False)
@@ -0,0 +1,118 @@
+import gc
+import time
+from typing import Any, Dict, Optional
+
+from Core.LoopWatchdog import LoopWatchdog
+from GlobalModules.GetConfig import get_config
+from GlobalModules.Metrics import Counter, Histogram, registry
+
+REASONS = ("automatic", "freeze", "idle")  # What triggered a collection
+
+
+class GcPolicy:
+    def __init__(self) -> None:
+        """
+        Garbage collector tuning: larger generation thresholds, long lived objects frozen out of the collections and
+        collections run ahead of time while the event loop is idle, every collection is recorded in the metrics
+        """
+
+        self.__start = 0.0
+        self.__reason = "automatic"
+        self.__installed = False
+
+    def install(self) -> None:
+        """
+        Apply core.gc.thresholds and start recording the collections
+        :return: None
+        """
+
+        gc.set_threshold(*get_config("core.gc.thresholds"))
+
+        if not self.__installed:
+            # Create every series now, the callback can run while the registry is being exported and must not add any
+            for generation in range(3):
+                for reason in REASONS:
+                    self.__get_pause_histogram(generation, reason)
+
+                self.__get_collected_counter(generation)
+
+            gc.callbacks.append(self.__callback)
+            self.__installed = True
+
+    @staticmethod
+    def __get_pause_histogram(generation: int, reason: str) -> Histogram:
+        return registry.histogram(
+            "bot_gc_pause_seconds",
+            "Duration of the garbage collections",
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+            generation=generation,
+            reason=reason
+        )
+
+    @staticmethod
+    def __get_collected_counter(generation: int) -> Counter:
+        return registry.counter(
+            "bot_gc_collected_total",
+            "Objects freed by the garbage collections",
+            generation=generation
+        )
+
+    def __callback(self, phase: str, info: Dict[str, Any]) -> None:
+        # Called by the interpreter around every collection, on the thread which triggered it
+        if phase == "start":
+            self.__start = time.perf_counter()
+            return
+
+        generation = info["generation"]
+
+        self.__get_pause_histogram(generation, self.__reason).observe(time.perf_counter() - self.__start)
+        self.__get_collected_counter(generation).inc(info["collected"])
+
+    def freeze(self) -> None:
+        """
+        Collect every generation then move every remaining object to the permanent generation, so the discord.py
+        caches and the loaded modules are no longer walked by later collections. Objects frozen earlier are unfrozen
+        first so those which became garbage since (for example an unloaded cog) can be collected
+        :return: None
+        """
+
+        gc.unfreeze()
+        self.__reason = "freeze"
+
+        try:
+            gc.collect()
+
+        finally:
+            self.__reason = "automatic"
+
+        gc.freeze()
+        registry.gauge("bot_gc_frozen_objects", "Objects in the permanent generation").set(gc.get_freeze_count())
+
+    def collect_if_idle(self, watchdog: LoopWatchdog) -> Optional[int]:
+        """
+        Run the collection the interpreter would soon run by itself while the event loop is idle, so it doesn't
+        happen in the middle of a command
+        :param watchdog: The loop watchdog, telling if the loop is idle
+        :return: The number of freed objects, None if nothing was run
+        """
+
+        if not watchdog.is_idle(get_config("core.gc.idle_lag_ms") / 1000):
+            return None
+
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+
+        for generation in (2, 1, 0):
+            if thresholds[generation] and counts[generation] >= thresholds[generation] // 2:
+                self.__reason = "idle"
+
+                try:
+                    return gc.collect(generation)
+
+                finally:
+                    self.__reason = "automatic"
+
+        return None
+
+
+gc_policy = GcPolicy()
@@ -0,0 +1,174 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+import psutil
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.GetConfig import get_config
+from GlobalModules.Logger import Logger
+from GlobalModules.Metrics import registry
+
+STACK_DEPTH = 15  # Frames kept for each incident, innermost last
+IDLE_BEATS = 10  # Heartbeats considered to tell if the loop is idle
+
+
+@dataclass
+class LagIncident:
+    timestamp: float
+    lag: float  # Seconds the loop was late, only a lower bound until the loop recovered
+    location: str  # Innermost frame of the bot code running when the loop was blocked
+    stack: List[str] = field(repr=False)
+    cpu_percent: float
+    rss: int  # Bytes
+    beat: float = field(repr=False)  # The heartbeat which was late
+
+
+def get_location(frames: traceback.StackSummary) -> str:
+    """
+    :param frames: A stack, innermost last
+    :return: The innermost frame of the bot code, the innermost frame if there is none
+    """
+
+    root = os.getcwd()
+
+    for i in reversed(frames):
+        if i.filename.startswith(root) and "site-packages" not in i.filename:
+            location = f"{os.path.relpath(i.filename, root)}:{i.lineno} in {i.name}"
+
+            if i is not frames[-1]:
+                innermost = frames[-1]
+                location += f" (calling {os.path.basename(innermost.filename)}:{innermost.lineno} in {innermost.name})"
+
+            return location
+
+    return f"{frames[-1].filename}:{frames[-1].lineno} in {frames[-1].name}" if frames else "unknown"
+
+
+class LoopWatchdog:
+    def __init__(self, database: AsyncDatabase) -> None:
+        """
+        Measure the event loop scheduling lag with a heartbeat task, when a heartbeat is late by more than
+        core.loop_watchdog.threshold_ms a watchdog thread captures the stack of the loop thread to find what blocks it
+        :param database: The database used for logs
+        """
+
+        self.logger = Logger(database)
+        self.incidents: List[LagIncident] = []  # The worst incidents, worst first
+
+        self.__interval = get_config("core.loop_watchdog.interval_ms") / 1000
+        self.__threshold = get_config("core.loop_watchdog.threshold_ms") / 1000
+        self.__process = psutil.Process()
+        self.__histogram = registry.histogram(
+            "bot_loop_lag_seconds",
+            "Event loop scheduling lag",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        )
+
+        self.__beat = time.monotonic()
+        self.__recent_lags: Deque[float] = collections.deque(maxlen=IDLE_BEATS)
+        self.__pending: Optional[LagIncident] = None  # Captured by the watchdog thread, completed by the heartbeat
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__loop_thread: Optional[int] = None
+        self.__task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start the heartbeat task and the watchdog thread, must be called from the event loop thread
+        :return: None
+        """
+
+        self.__loop_thread = threading.get_ident()
+        self.__beat = time.monotonic()
+        self.__process.cpu_percent()  # The first call only starts the measure
+
+        self.__task = asyncio.create_task(self.__heartbeat())
+        threading.Thread(target=self.__watch, name="LoopWatchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        """
+        :return: None
+        """
+
+        self.__stopped.set()
+
+        if self.__task is not None:
+            self.__task.cancel()
+
+    def is_idle(self, max_lag: float) -> bool:
+        """
+        :param max_lag: The maximum lag, in seconds, of an idle loop
+        :return: True if none of the last heartbeats was late by more than max_lag
+        """
+
+        return len(self.__recent_lags) == IDLE_BEATS and max(self.__recent_lags) <= max_lag
+
+    async def __heartbeat(self) -> None:
+        while True:
+            beat = time.monotonic()
+            self.__beat = beat
+
+            await asyncio.sleep(self.__interval)
+
+            lag = max(time.monotonic() - beat - self.__interval, 0.0)
+            self.__histogram.observe(lag)
+            self.__recent_lags.append(lag)
+
+            with self.__lock:
+                incident, self.__pending = self.__pending, None
+
+            if incident is not None:
+                if incident.beat == beat:  # Otherwise it was captured too late, keep its lower bound
+                    incident.lag = lag
+
+                self.__record(incident)
+
+    def __watch(self) -> None:
+        captured = None
+
+        while not self.__stopped.wait(self.__interval / 2):
+            beat = self.__beat
+            late = time.monotonic() - beat - self.__interval
+
+            if late < self.__threshold or beat == captured:
+                continue
+
+            captured = beat
+            frame = sys._current_frames().get(self.__loop_thread)
+
+            if frame is None:
+                continue
+
+            frames = traceback.extract_stack(frame, limit=STACK_DEPTH)
+            del frame
+
+            incident = LagIncident(
+                timestamp=time.time(),
+                lag=late,
+                location=get_location(frames),
+                stack=frames.format(),
+                cpu_percent=self.__process.cpu_percent(),
+                rss=self.__process.memory_info().rss,
+                beat=beat
+            )
+
+            with self.__lock:
+                self.__pending = incident
+
+    def __record(self, incident: LagIncident) -> None:
+        self.incidents.append(incident)
+        self.incidents.sort(key=lambda i: i.lag, reverse=True)
+        del self.incidents[get_config("core.loop_watchdog.max_incidents"):]
+
+        self.logger.add_log(
+            "Watchdog",
+            f"Event loop blocked for {incident.lag * 1000:.0f} ms at {incident.location} "
+            f"(CPU {incident.cpu_percent:.0f}%, RSS {incident.rss / 2 ** 20:.0f} MiB)"
+        )
@@ -0,0 +1,135 @@
+import ast
+import hashlib
+import importlib
+import importlib.util
+import pathlib
+import sys
+from types import ModuleType
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Hash of the source each module of a cog package was last executed from
+_source_hashes: Dict[str, str] = {}
+
+
+def topological_sort(graph: Dict[str, Iterable[str]]) -> Tuple[List[str], List[str]]:
+    """
+    Kahn's algorithm, dependencies which aren't keys of the graph are ignored
+    :param graph: The dependencies of each node
+    :return: (every node placed after its dependencies, the nodes in a cycle or depending on one)
+    """
+
+    remaining = {key: {i for i in value if i in graph and i != key} for key, value in graph.items()}
+    ready = sorted(key for key, value in remaining.items() if not value)
+    order = []
+
+    while ready:
+        done = ready.pop(0)
+        order.append(done)
+        del remaining[done]
+
+        for key, value in sorted(remaining.items()):
+            if done in value:
+                value.remove(done)
+
+                if not value:
+                    ready.append(key)
+
+    return order, sorted(remaining)
+
+
+def get_package_modules(package: str) -> Dict[str, pathlib.Path]:
+    """
+    :param package: The package name, like Cogs.Osm
+    :return: The source file of every module of this package, by module name
+    """
+
+    root = pathlib.Path(*package.split("."))
+    modules = {}
+
+    for path in root.rglob("*.py"):
+        parts = path.with_suffix("").parts
+
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+
+        modules[".".join(parts)] = path
+
+    return modules
+
+
+def get_imports(module_name: str, path: pathlib.Path, modules: Iterable[str]) -> Set[str]:
+    """
+    :param module_name: The module name
+    :param path: The module source file
+    :param modules: The modules to look for
+    :return: The modules among the given ones imported by this module
+    """
+
+    modules = set(modules)
+    imported = set()
+    package = module_name if path.stem == "__init__" else module_name.rpartition(".")[0]
+
+    for node in ast.walk(ast.parse(path.read_bytes(), str(path))):
+        if isinstance(node, ast.Import):
+            names = [i.name for i in node.names]
+
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+
+            if node.level:
+                base = importlib.util.resolve_name("." * node.level + base, package)
+
+            names = [base, *(f"{base}.{i.name}" for i in node.names)]  # from package import submodule
+
+        else:
+            continue
+
+        imported.update(i for i in names if i in modules)
+
+    imported.discard(module_name)
+
+    return imported
+
+
+def reload_package(package: str, main_module: str) -> Tuple[ModuleType, List[str]]:
+    """
+    Import the main module of a package, if it was already imported, reload every module of the package whose source
+    changed since it was executed and every module importing them, dependencies first, then the main module
+    :param package: The package name, like Cogs.Osm
+    :param main_module: The main module name, like Cogs.Osm.main
+    :return: (the main module, the reloaded modules other than the main one)
+    """
+
+    paths = get_package_modules(package)
+    hashes = {key: hashlib.sha256(value.read_bytes()).hexdigest() for key, value in paths.items()}
+
+    if main_module not in sys.modules:
+        module = importlib.import_module(main_module)
+        reloaded = []
+
+    else:
+        graph = {key: get_imports(key, value, paths) for key, value in paths.items() if key in sys.modules}
+        dirty = {key for key in graph if _source_hashes.get(key) != hashes[key]}
+        dirty.add(main_module)
+
+        while True:  # A module importing a reloaded one keeps references to its old objects
+            importers = {key for key, value in graph.items() if key not in dirty and value & dirty}
+
+            if not importers:
+                break
+
+            dirty |= importers
+
+        order, cyclic = topological_sort({key: graph[key] for key in dirty})
+
+        for i in order + cyclic:
+            importlib.reload(sys.modules[i])
+
+        module = sys.modules[main_module]
+        reloaded = [i for i in order + cyclic if i != main_module]
+
+    for key, value in hashes.items():
+        if key in sys.modules:
+            _source_hashes[key] = value
+
+    return module, reloaded
@@ -0,0 +1,143 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from types import CodeType
+from typing import Counter, Dict, Tuple
+
+from GlobalModules.GetConfig import get_config
+
+MAX_DEPTH = 128  # Frames kept per sample, the outermost ones are dropped
+
+
+@dataclass
+class Profile:
+    duration: float  # Seconds
+    interval: float  # Seconds between two samples
+    samples: int = 0  # Number of sampling rounds
+    # Samples per stack, a stack is the thread name then its frames, outermost first
+    stacks: Counter[Tuple[str, ...]] = field(default_factory=collections.Counter)
+
+    def collapsed(self) -> str:
+        """
+        :return: The stacks in the collapsed format read by flamegraph.pl, speedscope and similar tools
+        """
+
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, count: int) -> str:
+        """
+        :param count: The number of functions listed
+        :return: The functions with the most samples, by self time (samples where the function was running) and by
+        total time (samples where the function was in the stack)
+        """
+
+        own = collections.Counter()
+        total = collections.Counter()
+        threads = collections.Counter()
+
+        for stack, samples in self.stacks.items():
+            threads[stack[0]] += samples
+
+            if len(stack) > 1:
+                own[stack[-1]] += samples
+
+            for i in set(stack[1:]):
+                total[i] += samples
+
+        lines = [
+            f"Sampled {self.samples} times every {self.interval * 1000:g} ms during {self.duration:.1f} s",
+            "",
+            "Samples per thread:"
+        ]
+        lines += [f"{value:>8} {key}" for key, value in threads.most_common()]
+
+        for title, counter in (("self", own), ("total", total)):
+            lines += ["", f"Top {count} functions by {title} samples:", f"{'Self':>8} {'Total':>8}  Function"]
+            lines += [f"{own[key]:>8} {total[key]:>8}  {key}" for key, _ in counter.most_common(count)]
+
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    def __init__(self) -> None:
+        """
+        Statistical profiler of the live process: a thread captures the stack of every other thread at a fixed
+        interval, the profiled code isn't instrumented so its behaviour is not changed
+        """
+
+        self.__root = os.getcwd()
+        self.__labels: Dict[CodeType, str] = {}
+        self.__running = False
+
+    @property
+    def running(self) -> bool:
+        return self.__running
+
+    def __get_label(self, code: CodeType) -> str:
+        label = self.__labels.get(code)
+
+        if label is None:
+            path = code.co_filename
+
+            if path.startswith(self.__root) and "site-packages" not in path:
+                path = os.path.relpath(path, self.__root)
+
+            else:
+                path = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+
+            label = f"{code.co_qualname} ({path}:{code.co_firstlineno})"
+            self.__labels[code] = label
+
+        return label
+
+    def __sample(self, profile: Profile, stop: threading.Event) -> None:
+        own_thread = threading.get_ident()
+        start = time.monotonic()
+        end = start + profile.duration
+
+        while not stop.wait(profile.interval) and time.monotonic() < end:
+            names = {i.ident: i.name for i in threading.enumerate()}
+            profile.samples += 1
+
+            for thread, frame in sys._current_frames().items():
+                if thread == own_thread:
+                    continue
+
+                stack = []
+
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(self.__get_label(frame.f_code))
+                    frame = frame.f_back
+
+                stack.append(names.get(thread, f"Thread-{thread}"))
+                profile.stacks[tuple(reversed(stack))] += 1
+
+        profile.duration = time.monotonic() - start
+
+    async def profile(self, seconds: float) -> Profile:
+        """
+        Sample every thread of the process, the event loop keeps running meanwhile
+        :param seconds: The profiling duration
+        :return: The captured profile
+        """
+
+        if self.__running:
+            raise RuntimeError("A profile is already running")
+
+        self.__running = True
+        profile = Profile(seconds, get_config("core.profiler.interval_ms") / 1000)
+        stop = threading.Event()
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.__sample, profile, stop)
+
+        finally:
+            stop.set()
+            self.__running = False
+            self.__labels.clear()  # Don't keep code objects of modules reloaded since
+
+        return profile
@@ -0,0 +1,60 @@
+import collections
+import time
+from concurrent.futures import Future
+from typing import Counter, Dict, Optional
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+
+
+class SocketEventCounters:
+    def __init__(self) -> None:
+        """
+        Number of gateway events received by type, kept in memory and written as one row per type and interval
+        """
+
+        self.__counts: Counter[str] = collections.Counter()
+        self.__since = time.time()
+
+    def increment(self, event_type: str) -> None:
+        """
+        :param event_type: The gateway event type, like GUILD_MEMBER_UPDATE
+        :return: None
+        """
+
+        self.__counts[event_type] += 1
+
+    def pending(self) -> Dict[str, int]:
+        """
+        :return: The counts which weren't written yet
+        """
+
+        return dict(self.__counts)
+
+    def pending_since(self) -> float:
+        """
+        :return: The timestamp since which the pending counts are counted
+        """
+
+        return self.__since
+
+    def flush(self, database: AsyncDatabase) -> Optional[Future]:
+        """
+        Write one SOCKET_EVENTS row per event type for the elapsed interval, without waiting for it
+        :param database: The database to write to
+        :return: A concurrent future resolved with the number of written rows, None if no event was received
+        """
+
+        now = time.time()
+        counts, self.__counts = self.__counts, collections.Counter()
+        duration, self.__since = now - self.__since, now
+
+        if not counts:
+            return None
+
+        return database.submit_many(
+            "INSERT INTO SOCKET_EVENTS (TIMESTAMP, DURATION, EVENT_TYPE, COUNT) VALUES (?, ?, ?, ?);",
+            [(int(now), round(duration), key, value) for key, value in counts.items()]
+        )
+
+
+socket_events = SocketEventCounters()
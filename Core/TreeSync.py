@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import json
+from typing import Iterable, List, Optional
+
+import discord
+from discord.ext import commands
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.GetConfig import get_config
+from GlobalModules.Logger import Logger
+
+GLOBAL_SCOPE = 0  # COMMAND_TREE_HASH.SCOPE of the global tree, other scopes are guild IDs
+
+
+async def get_tree_hash(bot: commands.AutoShardedBot, guild: Optional[discord.abc.Snowflake]) -> str:
+    """
+    :param bot: The bot instance
+    :param guild: The guild whose tree is hashed, None for the global tree
+    :return: The hash of the payload the tree would be synced with
+    """
+
+    tree = bot.tree
+    tree_commands = tree.get_commands(guild=guild)
+
+    if tree.translator:
+        payload = [await i.get_translated_payload(tree, tree.translator) for i in tree_commands]
+
+    else:
+        payload = [i.to_dict(tree) for i in tree_commands]
+
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def sync_tree(
+        bot: commands.AutoShardedBot,
+        database: AsyncDatabase,
+        guilds: Iterable[Optional[discord.abc.Snowflake]],
+        force: bool = False
+) -> List[Optional[discord.abc.Snowflake]]:
+    """
+    Sync the commands tree of every given scope whose payload changed since its last sync, at most
+    core.tree_sync_concurrency scopes are synced at once
+    :param bot: The bot instance
+    :param database: The database holding the hash of the last synced payload of each scope
+    :param guilds: The scopes to check, None for the global tree
+    :param force: Sync every given scope even if its payload didn't change
+    :return: The synced scopes
+    """
+
+    logger = Logger(database)
+    semaphore = asyncio.Semaphore(get_config("core.tree_sync_concurrency"))
+
+    synced_hashes = dict(await database.fetchall("SELECT SCOPE, HASH FROM COMMAND_TREE_HASH;"))
+
+    async def sync_scope(guild: Optional[discord.abc.Snowflake]) -> bool:
+        scope = GLOBAL_SCOPE if guild is None else guild.id
+        tree_hash = await get_tree_hash(bot, guild)
+
+        if not force and synced_hashes.get(scope) == tree_hash:
+            return False
+
+        async with semaphore:
+            try:
+                await bot.tree.sync(guild=guild)
+
+            except discord.HTTPException as err:
+                logger.add_log("Sync", f"Couldn't sync commands tree of scope {scope}: {type(err)} : {err}")
+                return False
+
+        await database.execute(
+            "INSERT INTO COMMAND_TREE_HASH (SCOPE, HASH) VALUES (?, ?) "
+            "ON CONFLICT(SCOPE) DO UPDATE SET HASH=excluded.HASH;",
+            (scope, tree_hash)
+        )
+
+        return True
+
+    guilds = list(guilds)
+    results = await asyncio.gather(*(sync_scope(i) for i in guilds))
+    synced = [guild for guild, done in zip(guilds, results) if done]
+
+    logger.add_log("Sync", f"{len(synced)} commands tree synced, {len(guilds) - len(synced)} unchanged or failed")
+
+    return synced
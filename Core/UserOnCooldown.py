@@ -1,30 +1,93 @@
+import collections
 import sqlite3
 import time
+from concurrent.futures import Future
+from typing import Deque, Dict, List, Optional, Tuple
 
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 
 
-def user_on_cooldown(user_id: int, database: sqlite3.Connection) -> bool:
-    database.execute(
-        "DELETE FROM LAST_USED_COMMANDS WHERE TIMESTAMP < ?",
-        (time.time() - get_config('core.last_used_commands_timeout'),)
-    )
-    database.commit()
+class CommandRateLimiter:
+    def __init__(self) -> None:
+        """
+        Sliding window of the commands used during the last core.last_used_commands_timeout seconds, kept in memory
+        """
 
-    max_per_user = get_config("core.max_used_commands_max_per_user")
+        self.__global: Deque[Tuple[float, int]] = collections.deque()  # (timestamp, user ID), oldest first
+        self.__users: Dict[int, Deque[float]] = {}
 
-    cursor = database.execute("SELECT TIMESTAMP, USER_ID FROM LAST_USED_COMMANDS WHERE USER_ID=?", (user_id,))
-    fetched = cursor.fetchall()
-    cursor.close()
+    def __expire(self, now: float) -> None:
+        limit = now - get_config("core.last_used_commands_timeout")
 
-    if len(fetched) > max_per_user:
-        return True
+        while self.__global and self.__global[0][0] < limit:
+            _, user_id = self.__global.popleft()
+            user = self.__users[user_id]
+            user.popleft()
 
-    cursor = database.execute("SELECT TIMESTAMP, USER_ID FROM LAST_USED_COMMANDS")
-    fetched = cursor.fetchall()
-    cursor.close()
+            if not user:
+                del self.__users[user_id]
 
-    if len(fetched) > get_config('core.last_used_commands_max'):
-        return True
+    def register(self, user_id: int, timestamp: Optional[float] = None) -> None:
+        """
+        Record a command used by a user
+        :param user_id: The user ID
+        :param timestamp: When the command was used, now by default (must not be older than the last registered one)
+        :return: None
+        """
 
-    return False
+        timestamp = time.time() if timestamp is None else timestamp
+
+        self.__global.append((timestamp, user_id))
+        self.__users.setdefault(user_id, collections.deque()).append(timestamp)
+
+    def on_cooldown(self, user_id: int) -> bool:
+        """
+        :param user_id: The user ID
+        :return: True if this user or the whole bot used too many commands recently
+        """
+
+        self.__expire(time.time())
+
+        if len(self.__users.get(user_id, ())) > get_config("core.max_used_commands_max_per_user"):
+            return True
+
+        return len(self.__global) > get_config("core.last_used_commands_max")
+
+    @staticmethod
+    def __save_job(connection: sqlite3.Connection, rows: List[Tuple[float, int]]) -> None:
+        connection.execute("DELETE FROM LAST_USED_COMMANDS;")
+        connection.executemany("INSERT INTO LAST_USED_COMMANDS (TIMESTAMP, USER_ID) VALUES (?, ?);", rows)
+
+    def save(self, database: AsyncDatabase) -> Future:
+        """
+        Replace the content of LAST_USED_COMMANDS by the current window so it survives a restart
+        :param database: The database to write to
+        :return: A concurrent future resolved once the snapshot is committed
+        """
+
+        self.__expire(time.time())
+        return database.submit_job(self.__save_job, [(int(i), j) for i, j in self.__global])
+
+    async def restore(self, database: AsyncDatabase) -> None:
+        """
+        Load the last snapshot saved in LAST_USED_COMMANDS
+        :param database: The database to read from
+        :return: None
+        """
+
+        self.__global.clear()
+        self.__users.clear()
+
+        for timestamp, user_id in await database.fetchall(
+                "SELECT TIMESTAMP, USER_ID FROM LAST_USED_COMMANDS WHERE TIMESTAMP >= ? ORDER BY TIMESTAMP;",
+                (int(time.time()) - get_config("core.last_used_commands_timeout"),)
+        ):
+            self.register(user_id, timestamp)
+
+
+rate_limiter = CommandRateLimiter()
+
+
+def user_on_cooldown(user_id: int) -> bool:
+    return rate_limiter.on_cooldown(user_id)
@@ -0,0 +1,376 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
+
+import asyncio
+import pathlib
+import queue
+import re
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Tuple
+
+from GlobalModules.SqlProfiler import SqlProfiler
+from GlobalModules.Tracing import span
+
+# Comments, quoted strings and identifiers, parentheses and words of an SQL statement
+_SQL_TOKENS = re.compile(
+    r"--[^\n]*|/\*.*?(?:\*/|$)|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\]|([()])|(\w+)",
+    re.DOTALL
+)
+_VERBS = {"SELECT", "VALUES", "INSERT", "REPLACE", "UPDATE", "DELETE"}
+
+
+def get_statement_verb(sql: str) -> str:
+    """
+    :param sql: An SQL statement
+    :return: The verb of its main statement, after the common table expressions of a WITH clause (for example INSERT
+    for WITH ... INSERT INTO ...), else its first word
+    """
+
+    depth = 0
+    first = None
+
+    for match in _SQL_TOKENS.finditer(sql):
+        parenthesis, word = match.groups()
+
+        if parenthesis is not None:
+            depth += 1 if parenthesis == "(" else -1
+
+        elif word is not None and depth == 0:
+            word = word.upper()
+
+            if first is None:
+                first = word
+
+                if word != "WITH":
+                    return word
+
+            elif word in _VERBS:  # CTE bodies are parenthesized, the first top level verb is the main statement one
+                return word
+
+    return first or ""
+
+
+class Transaction:
+    def __init__(self) -> None:
+        # (is executemany, sql, parameters)
+        self.statements: List[Tuple[bool, str, Any]] = []
+
+    def execute(self, sql: str, parameters: Iterable[Any] = ()) -> None:
+        """
+        Add a statement to this transaction, it will be executed when the transaction is committed
+        :param sql: The SQL statement
+        :param parameters: The statement parameters
+        :return: None
+        """
+
+        self.statements.append((False, sql, tuple(parameters)))
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Iterable[Any]]) -> None:
+        """
+        Add a statement executed for every parameters set to this transaction
+        :param sql: The SQL statement
+        :param seq_of_parameters: An iterable of statement parameters
+        :return: None
+        """
+
+        self.statements.append((True, sql, [tuple(i) for i in seq_of_parameters]))
+
+
+class AsyncDatabase:
+    def __init__(
+            self,
+            path: str,
+            readers: int = 2,
+            on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+            profiler: Optional[SqlProfiler] = None
+    ) -> None:
+        """
+        SQLite access layer which never blocks the event loop: every write is run in order on a dedicated writer
+        thread, reads are run on a small pool of read only connections
+        :param path: The database file path
+        :param readers: The number of read only connections
+        :param on_connect: A callback called with every new connection (writer and readers)
+        :param profiler: If given, every statement run on the connections is recorded by this profiler
+        """
+
+        self.path = path
+        self.on_connect = on_connect
+        self.profiler = profiler
+
+        self.__queue: queue.Queue[Optional[Tuple[Callable[..., Any], Tuple[Any, ...], Future]]] = queue.Queue()
+        self.__connections: List[sqlite3.Connection] = []
+        self.__connections_lock = threading.Lock()
+        self.__local = threading.local()
+        self.__closed = False
+
+        self.__writer_ready = threading.Event()
+        self.__writer_error: Optional[BaseException] = None  # Raised while opening the writer connection
+        self.__writer = threading.Thread(target=self.__writer_loop, name="AsyncDatabase-writer", daemon=True)
+        self.__writer.start()
+        self.__writer_ready.wait()
+
+        if self.__writer_error is not None:
+            raise self.__writer_error
+
+        self.__readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="AsyncDatabase-reader")
+
+    # ===== Connections ===== #
+
+    def __connect(self, read_only: bool) -> sqlite3.Connection:
+        if read_only:
+            uri = f"{pathlib.Path(self.path).absolute().as_uri()}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+        else:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        if self.on_connect is not None:
+            try:
+                self.on_connect(connection)
+
+            except BaseException:
+                connection.close()
+                raise
+
+        with self.__connections_lock:
+            self.__connections.append(connection)
+
+        if self.profiler is not None:
+            return self.profiler.wrap(connection)
+
+        return connection
+
+    def __reader_connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, "connection", None)
+
+        if connection is None:
+            connection = self.__connect(read_only=True)
+            self.__local.connection = connection
+
+        return connection
+
+    def __writer_loop(self) -> None:
+        try:
+            connection = self.__connect(read_only=False)
+
+        except BaseException as err:  # Raised by __init__, which waits for this connection
+            self.__writer_error = err
+            return
+
+        finally:
+            self.__writer_ready.set()
+
+        while True:
+            job = self.__queue.get()
+
+            if job is None:
+                break
+
+            func, args, future = job
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                result = func(connection, *args)
+                connection.commit()
+
+            except BaseException as err:
+                connection.rollback()
+                future.set_exception(err)
+
+            else:
+                future.set_result(result)
+
+    # ===== Jobs (run on database threads) ===== #
+
+    @staticmethod
+    def __execute_job(
+            connection: sqlite3.Connection,
+            sql: str,
+            parameters: Tuple[Any, ...],
+            fetch: Optional[str]
+    ) -> Any:
+
+        cursor = connection.execute(sql, parameters)
+
+        try:
+            if fetch == "one":
+                return cursor.fetchone()
+
+            elif fetch == "all":
+                return cursor.fetchall()
+
+            else:
+                return cursor.rowcount
+
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def __executemany_job(connection: sqlite3.Connection, sql: str, seq_of_parameters: List[Tuple[Any, ...]]) -> int:
+        return connection.executemany(sql, seq_of_parameters).rowcount
+
+    @staticmethod
+    def __transaction_job(connection: sqlite3.Connection, statements: List[Tuple[bool, str, Any]]) -> None:
+        for many, sql, parameters in statements:
+            if many:
+                connection.executemany(sql, parameters)
+
+            else:
+                connection.execute(sql, parameters)
+
+    def __read_job(self, sql: str, parameters: Tuple[Any, ...], fetch: str) -> Any:
+        return self.__execute_job(self.__reader_connection(), sql, parameters, fetch)
+
+    # ===== Scheduling ===== #
+
+    def submit_job(self, func: Callable[..., Any], *args: Any) -> Future:
+        """
+        Schedule func(connection, *args) on the writer thread, changes are committed once it returns
+        :param func: The function to run
+        :param args: Extra arguments given to func
+        :return: A concurrent future resolved with the function result
+        """
+
+        if self.__closed:
+            raise RuntimeError("This database is closed")
+
+        future = Future()
+        self.__queue.put((func, args, future))
+
+        return future
+
+    def submit(self, sql: str, parameters: Iterable[Any] = ()) -> Future:
+        """
+        Schedule a write statement without waiting for it
+        :param sql: The SQL statement
+        :param parameters: The statement parameters
+        :return: A concurrent future resolved with the number of modified rows
+        """
+
+        return self.submit_job(self.__execute_job, sql, tuple(parameters), None)
+
+    def submit_many(self, sql: str, seq_of_parameters: Iterable[Iterable[Any]]) -> Future:
+        """
+        Schedule a write statement executed for every parameters set without waiting for it
+        :param sql: The SQL statement
+        :param seq_of_parameters: An iterable of statement parameters
+        :return: A concurrent future resolved with the number of modified rows
+        """
+
+        return self.submit_job(self.__executemany_job, sql, [tuple(i) for i in seq_of_parameters])
+
+    @staticmethod
+    def __is_read_only(sql: str) -> bool:
+        return get_statement_verb(sql) in ("SELECT", "VALUES")
+
+    async def __fetch(self, sql: str, parameters: Iterable[Any], fetch: str) -> Any:
+        parameters = tuple(parameters)
+
+        if self.__is_read_only(sql):
+            return await asyncio.get_running_loop().run_in_executor(
+                self.__readers,
+                self.__read_job,
+                sql,
+                parameters,
+                fetch
+            )
+
+        return await asyncio.wrap_future(self.submit_job(self.__execute_job, sql, parameters, fetch))
+
+    # ===== Public API ===== #
+
+    async def execute(self, sql: str, parameters: Iterable[Any] = ()) -> int:
+        """
+        Execute a write statement and commit it
+        :param sql: The SQL statement
+        :param parameters: The statement parameters
+        :return: The number of modified rows
+        """
+
+        with span("db.execute", sql):
+            return await asyncio.wrap_future(self.submit(sql, parameters))
+
+    async def executemany(self, sql: str, seq_of_parameters: Iterable[Iterable[Any]]) -> int:
+        """
+        Execute a write statement for every parameters set and commit them at once
+        :param sql: The SQL statement
+        :param seq_of_parameters: An iterable of statement parameters
+        :return: The number of modified rows
+        """
+
+        with span("db.executemany", sql):
+            return await asyncio.wrap_future(self.submit_many(sql, seq_of_parameters))
+
+    async def fetchone(self, sql: str, parameters: Iterable[Any] = ()) -> Optional[Tuple[Any, ...]]:
+        """
+        Run a query and return its first row, SELECT queries are run on a read only connection, other queries
+        (for example INSERT ... RETURNING) are run on the writer thread
+        :param sql: The SQL query
+        :param parameters: The query parameters
+        :return: The first row or None
+        """
+
+        with span("db.fetchone", sql):
+            return await self.__fetch(sql, parameters, "one")
+
+    async def fetchall(self, sql: str, parameters: Iterable[Any] = ()) -> List[Tuple[Any, ...]]:
+        """
+        Run a query and return all its rows, see fetchone
+        :param sql: The SQL query
+        :param parameters: The query parameters
+        :return: Every rows
+        """
+
+        with span("db.fetchall", sql):
+            return await self.__fetch(sql, parameters, "all")
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(connection, *args) on the writer thread then commit, used for schema checks and batch jobs
+        :param func: The function to run, it must not keep a reference to the connection
+        :param args: Extra arguments given to func
+        :return: The function result
+        """
+
+        with span("db.run", getattr(func, "__name__", "")):
+            return await asyncio.wrap_future(self.submit_job(func, *args))
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Transaction]:
+        """
+        Group statements in a single transaction, they are executed and committed together when the block exits
+        without error and discarded otherwise
+        :return: The transaction to add statements to
+        """
+
+        transaction = Transaction()
+        yield transaction
+
+        if transaction.statements:
+            with span("db.transaction", f"{len(transaction.statements)} statements"):
+                await asyncio.wrap_future(self.submit_job(self.__transaction_job, transaction.statements))
+
+    def close(self) -> None:
+        """
+        Wait for every scheduled write then close all connections
+        :return: None
+        """
+
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__queue.put(None)
+        self.__writer.join()
+        self.__readers.shutdown(wait=True)
+
+        with self.__connections_lock:
+            for connection in self.__connections:  # Every thread using them is stopped
+                connection.close()
+
+            self.__connections.clear()
@@ -1,11 +1,117 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
+import copy
 import json
 import os
-from typing import Any
+import threading
+import time
+from typing import Any, Dict
 
 from Core.IsTestVersion import is_test_version
+from GlobalModules.Tracing import span
+
+CONFIG_CHECK_DELAY = 5  # Minimum delay in seconds between two mtime checks of the same file
+
+
+class ConfigSnapshot:
+    def __init__(self, path: str, mtime: int, data: Any, version: int) -> None:
+        """
+        :param path: The path of the JSON file
+        :param mtime: The mtime (in ns) of the file when it was parsed
+        :param data: The parsed JSON data, must be considered read only
+        :param version: A number incremented each time a file is (re)loaded, used to detect changes
+        """
+
+        self.path = path
+        self.mtime = mtime
+        self.data = data
+        self.version = version
+        self.next_check = time.monotonic() + CONFIG_CHECK_DELAY
+
+        self.flat: Dict[str, Any] = {}
+        self.__flatten(data, "")
+
+    def __flatten(self, data: Any, prefix: str) -> None:
+        """
+        Fill self.flat with every dotted key of data (sub dicts are also stored under their own key)
+        :param data: The data to flatten
+        :param prefix: The dotted key leading to data
+        :return: None
+        """
+
+        if prefix:
+            self.flat[prefix] = data
+
+        if isinstance(data, dict):
+            for key, value in data.items():
+                self.__flatten(value, f"{prefix}.{key}" if prefix else key)
+
+
+class ConfigStore:
+    def __init__(self) -> None:
+        self.__snapshots: Dict[str, ConfigSnapshot] = {}
+        self.__lock = threading.Lock()
+        self.__version = 0
+
+    def get_snapshot(self, path: str) -> ConfigSnapshot:
+        """
+        Get the parsed content of a JSON file, only re-read it if its mtime changed
+        :param path: The path of the JSON file
+        :return: The snapshot of this file
+        """
+
+        snapshot = self.__snapshots.get(path)
+
+        if snapshot is not None and time.monotonic() < snapshot.next_check:
+            return snapshot
+
+        with self.__lock, span("config.read", path):  # Only the mtime check and reloads touch the disk
+            mtime = os.stat(path).st_mtime_ns
+            snapshot = self.__snapshots.get(path)
+
+            if snapshot is not None and snapshot.mtime == mtime:
+                snapshot.next_check = time.monotonic() + CONFIG_CHECK_DELAY
+                return snapshot
+
+            with open(path, "r") as f:
+                data = json.load(f)
+
+            self.__version += 1
+            snapshot = ConfigSnapshot(path, mtime, data, self.__version)
+            self.__snapshots[path] = snapshot
+
+            return snapshot
+
+    def get_json(self, path: str) -> Any:
+        """
+        :param path: The path of the JSON file
+        :return: The parsed JSON data, must be considered read only
+        """
+
+        return self.get_snapshot(path).data
+
+
+config_store = ConfigStore()
+
+
+def get_config_path(module: str, file_name: str = "config.json") -> str:
+    """
+    :param module: The module owning the file ("core" for CoreConfig, else the cog name)
+    :param file_name: The file name relative to the module config folder, prefixed with test_ on test version
+    :return: The path of this config file
+    """
+
+    directory, file_name = os.path.split(file_name)
+
+    if is_test_version():
+        file_name = f"test_{file_name}"
+
+    if module == "core":
+        return os.path.join("CoreConfig", directory, file_name)
+
+    else:
+        return os.path.join("Cogs", module, "Config", directory, file_name)
 
 
 def get_config(config_key: str) -> Any:
@@ -14,29 +120,16 @@ def get_config(config_key: str) -> Any:
     :return: The data
     """
 
-    module = config_key.split(".")[0]
-    config_key = config_key.split(".")[1:]
-
-    if module == "core":
-        if not is_test_version():
-            with open(f"CoreConfig{os.sep}config.json", "r") as f:
-                config = json.load(f)
+    module, _, config_key = config_key.partition(".")
+    snapshot = config_store.get_snapshot(get_config_path(module))
 
-        else:
-            with open(f"CoreConfig{os.sep}test_config.json", "r") as f:
-                config = json.load(f)
+    if config_key:
+        config = snapshot.flat[config_key]
 
     else:
-        if not is_test_version():
-            with open(f"Cogs{os.sep}{module}{os.sep}Config{os.sep}config.json", "r") as f:
-                config = json.load(f)
-
-        else:
-            with open(f"Cogs{os.sep}{module}{os.sep}Config{os.sep}test_config.json", "r") as f:
-                config = json.load(f)
+        config = snapshot.data
 
-    while config_key:
-        config = config[config_key[0]]
-        config_key.pop(0)
+    if isinstance(config, (dict, list)):
+        return copy.deepcopy(config)
 
     return config
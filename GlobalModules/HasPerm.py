@@ -2,24 +2,113 @@
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
 import asyncio
-import gc
-import json
-import sqlite3
 import time
+from dataclasses import dataclass
 from functools import wraps
+from typing import Dict, FrozenSet, Tuple
 
 import discord
 from discord import Interaction, InteractionResponse
 from discord.ext.commands.cog import Cog
 from discord.ext.commands.context import Context
-from discord.permissions import Permissions
 
-from Core.IsTestVersion import is_test_version
-from Core.UserOnCooldown import user_on_cooldown
+from Core.UserOnCooldown import rate_limiter, user_on_cooldown
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.GetConfig import config_store, get_config_path
 from GlobalModules.Logger import Logger
+from GlobalModules.Metrics import registry
+from GlobalModules.Tracing import span, trace
+
+
+@dataclass(frozen=True)
+class PermissionPolicy:
+    roles: FrozenSet[int]
+    users: FrozenSet[int]
+    guilds: FrozenSet[int]
+    group_members: FrozenSet[int]
+    permission_codes: Tuple[int, ...]
+
+    def allows(self, user: discord.Member, guild: discord.Guild) -> bool:
+        """
+        :param user: The user invoking the command
+        :param guild: The guild where the command is invoked
+        :return: True if the user is allowed by this policy
+        """
+
+        if user.id in self.users or user.id in self.group_members:
+            return True
+
+        if guild is not None and guild.id in self.guilds:
+            return True
+
+        if self.roles and not self.roles.isdisjoint(i.id for i in getattr(user, "roles", ())):
+            return True
+
+        if self.permission_codes and isinstance(user, discord.Member):
+            value = user.guild_permissions.value
+
+            for code in self.permission_codes:
+                if value & code == code:
+                    return True
+
+        return False
+
+
+# (module, command name) => (config files versions, compiled policy)
+_policies: Dict[Tuple[str, str], Tuple[Tuple[int, ...], PermissionPolicy]] = {}
+# (bots_admin.json version, admin IDs)
+_bot_admins: Tuple[int, FrozenSet[int]] = (0, frozenset())
+
+
+def compile_policy(perms: dict) -> PermissionPolicy:
+    """
+    Compile a permission entry (as found in permissions.json) into a policy
+    :param perms: The permission entry
+    :return: The compiled policy
+    """
+
+    config_roles = config_store.get_json(get_config_path("core", "roles_id.json"))
+
+    group_members = set()
+    for i in perms["group"]:
+        group_members.update(j["id"] for j in config_store.get_json(get_config_path("core", f"Groups/{i}.json")))
+
+    return PermissionPolicy(
+        roles=frozenset(config_roles[i] for i in perms["roles"]),
+        users=frozenset(perms["users"]),
+        guilds=frozenset(perms["guilds"]),
+        group_members=frozenset(group_members),
+        permission_codes=tuple(perms["permission_code"])
+    )
+
+
+def get_command_policy(module: str, command_name: str) -> PermissionPolicy:
+    """
+    Get the compiled policy of a command, it is rebuilt only if one of the config files it depends on changed
+    :param module: "core" for core commands, else the cog name
+    :param command_name: The command function name
+    :return: The compiled policy
+    """
+
+    perm_snapshot = config_store.get_snapshot(get_config_path(module, "permissions.json"))
+    perms = perm_snapshot.data[command_name]
+
+    versions = [perm_snapshot.version, config_store.get_snapshot(get_config_path("core", "roles_id.json")).version]
+    for i in perms["group"]:
+        versions.append(config_store.get_snapshot(get_config_path("core", f"Groups/{i}.json")).version)
 
+    cached = _policies.get((module, command_name))
 
-def has_perm(db: sqlite3.Connection = None):
+    if cached is not None and cached[0] == tuple(versions):
+        return cached[1]
+
+    policy = compile_policy(perms)
+    _policies[(module, command_name)] = (tuple(versions), policy)
+
+    return policy
+
+
+def has_perm(db: AsyncDatabase = None):
     """
     :param db: The database object
     :return: Wrapped function
@@ -56,152 +145,125 @@ def has_perm(db: sqlite3.Connection = None):
             if ctx_interaction is None:
                 raise ValueError("The wrapper has_perm could not retrieve the context or interaction")
 
-            logger = Logger(database)
-
-            if cog_name is None:
-                if is_test_version():
-                    with open("CoreConfig/test_permissions.json", "r") as f:
-                        perms = json.loads(f.read())[func.__name__]
+            module = "core" if cog_name is None else cog_name[1]
+
+            # The trace starts before the permission check so its cost is part of the command trace
+            with trace(f"{module}.{func.__name__}", str(user)):
+                logger = Logger(database)
+
+                with span("perm.check", func.__name__):
+                    policy = get_command_policy(module, func.__name__)
+
+                    if is_bot_admin(user.id):
+                        have_perm = True
+                        send_output = True
+
+                    else:
+                        have_perm = policy.allows(user, guild)
+                        send_output = send_error_output(user_id=user.id)
+                        rate_limiter.register(user.id)
+
+                args_ = list(args) + list(kwargs)
+                args_.remove(ctx_interaction)
+                for i in args_:
+                    if isinstance(i, Cog):
+                        args_.remove(i)
+
+                for i, j in enumerate(args_):
+                    if type(j) == tuple:
+                        args_[i] = "".join(j)
+
+                if have_perm:
+                    start = time.perf_counter()
+                    status = "error"
+
+                    try:
+                        ret = await func(*args, **kwargs)
+                        status = "ok"
+
+                    finally:
+                        registry.histogram(
+                            "bot_command_duration_seconds",
+                            "Duration of the commands",
+                            module=module,
+                            command=func.__name__
+                        ).observe(time.perf_counter() - start)
+
+                        registry.counter(
+                            "bot_commands_total",
+                            "Commands invoked",
+                            module=module,
+                            command=func.__name__,
+                            status=status
+                        ).inc()
+
+                    logger.add_log(
+                        "Command",
+                        f"{user} (ID: {user.id}) invoked {func.__name__} command with args {args_}"
+                    )
 
                 else:
-                    with open("CoreConfig/permissions.json", "r") as f:
-                        perms = json.loads(f.read())[func.__name__]
-
-            else:
-                if is_test_version():
-                    with open(f"Cogs/{cog_name[1]}/Config/test_permissions.json", "r") as f:
-                        perms = json.loads(f.read())[func.__name__]
+                    ret = None
+                    registry.counter(
+                        "bot_commands_total",
+                        "Commands invoked",
+                        module=module,
+                        command=func.__name__,
+                        status="denied"
+                    ).inc()
+
+                    logger.add_log(
+                        "Command",
+                        f"{user} (ID: {user.id}) tried to invoke {func.__name__} command with args {args_} but "
+                        f"have not the permission"
+                    )
+
+                    if send_output:
+                        if isinstance(ctx_interaction, Context):
+                            await ctx_interaction.send(
+                                "You haven't the permission to perform this command.",
+                                reference=ctx_interaction.message.to_reference(fail_if_not_exists=False)
+                            )
+
+                        elif isinstance(ctx_interaction, Interaction):
+                            resp: InteractionResponse = ctx_interaction.response
+                            await resp.send_message(
+                                content="You haven't the permission to perform this command.",
+                                ephemeral=True
+                            )
 
-                else:
-                    with open(f"Cogs/{cog_name[1]}/Config/permissions.json", "r") as f:
-                        perms = json.loads(f.read())[func.__name__]
-
-            if is_bot_admin(user.id):
-                have_perm = True
-                send_output = True
-
-            else:
-                have_perm = user_have_perm(user, guild, perms)
-                send_output = send_error_output(user_id=user.id, database=database)
-
-                database.execute(
-                    "INSERT INTO LAST_USED_COMMANDS (TIMESTAMP, USER_ID) VALUES (?, ?)",
-                    (int(time.time()), user.id)
-                )
-
-                database.commit()
-
-            args_ = list(args) + list(kwargs)
-            args_.remove(ctx_interaction)
-            for i in args_:
-                if isinstance(i, Cog):
-                    args_.remove(i)
-
-            for i, j in enumerate(args_):
-                if type(j) == tuple:
-                    args_[i] = "".join(j)
-
-            if have_perm:
-                ret = await func(*args, **kwargs)
-                logger.add_log(
-                    "Command",
-                    f"{user} (ID: {user.id}) invoked {func.__name__} command with args {args_}"
-                )
-
-            else:
-                ret = None
-                logger.add_log(
-                    "Command",
-                    f"{user} (ID: {user.id}) tried to invoke {func.__name__} command with args {args_} but "
-                    f"have not the permission"
-                )
-
-                if send_output:
-                    if isinstance(ctx_interaction, Context):
-                        await ctx_interaction.send(
-                            "You haven't the permission to perform this command.",
-                            reference=ctx_interaction.message.to_reference(fail_if_not_exists=False)
-                        )
-
-                    elif isinstance(ctx_interaction, Interaction):
-                        resp: InteractionResponse = ctx_interaction.response
-                        await resp.send_message(
-                            content="You haven't the permission to perform this command.",
-                            ephemeral=True
-                        )
-
-            if i := gc.collect():
-                print(f"Garbage collector: {i}")
             return ret
 
         return wrapper
 
-    if i := gc.collect():
-        print(f"Garbage collector HasPerm: {i}")
-
     return inner
 
 
 def user_have_perm(user: discord.Member, guild: discord.Guild, perms: dict) -> bool:
-    if is_test_version():
-        with open("CoreConfig/test_roles_id.json") as f:
-            config_roles = json.loads(f.read())
-    else:
-        with open("CoreConfig/roles_id.json") as f:
-            config_roles = json.loads(f.read())
-
-    allowed_roles = []
-    for i in perms["roles"]:
-        allowed_roles.append(config_roles[i])
-
-    for i in user.roles:
-        if i.id in allowed_roles:
-            return True
-
-    if user.id in perms["users"]:
-        return True
-
-    for i in perms["permission_code"]:
-        if user.guild_permissions.is_superset(Permissions(i)):
-            return True
-
-    if guild.id in perms["guilds"]:
-        return True
-
-    for i in perms["group"]:
-        if is_test_version():
-            with open(f"CoreConfig/Groups/test_{i}.json") as f:
-                group = json.loads(f.read())
+    return compile_policy(perms).allows(user, guild)
 
-        else:
-            with open(f"CoreConfig/Groups/{i}.json") as f:
-                group = json.loads(f.read())
 
-        for j in group:
-            if user.id == j["id"]:
-                return True
+def is_bot_admin(user_id: int) -> bool:
+    return user_id in get_bot_admins()
 
-    return False
 
+def get_bot_admins() -> FrozenSet[int]:
+    """
+    :return: The IDs of every bot admin, only rebuilt when bots_admin.json changes
+    """
 
-def is_bot_admin(user_id: int) -> bool:
-    if is_test_version():
-        with open("CoreConfig/Groups/test_bots_admin.json") as f:
-            group = json.loads(f.read())
+    global _bot_admins
 
-    else:
-        with open("CoreConfig/Groups/bots_admin.json") as f:
-            group = json.loads(f.read())
+    snapshot = config_store.get_snapshot(get_config_path("core", "Groups/bots_admin.json"))
 
-    for j in group:
-        if user_id == j["id"]:
-            return True
+    if _bot_admins[0] != snapshot.version:
+        _bot_admins = (snapshot.version, frozenset(i["id"] for i in snapshot.data))
 
-    return False
+    return _bot_admins[1]
 
 
-def send_error_output(user_id: int, database: sqlite3.Connection) -> bool:
-    if user_on_cooldown(user_id=user_id, database=database):
+def send_error_output(user_id: int) -> bool:
+    if user_on_cooldown(user_id=user_id):
         return False
 
     else:
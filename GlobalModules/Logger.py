@@ -1,21 +1,110 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
+import asyncio
+import collections
 import sqlite3
+import threading
 import time
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from GlobalModules.AsyncDatabase import AsyncDatabase
+from GlobalModules.GetConfig import get_config
+
+
+class LogBuffer:
+    def __init__(self, database: AsyncDatabase) -> None:
+        """
+        Bounded ring buffer of log rows waiting to be written, shared by every Logger of the same database
+        :param database: The database the rows are written to
+        """
+
+        self.database = database
+        self.dropped = 0  # Rows overwritten because the buffer was full, reported on next flush
+
+        self.__rows: Deque[Tuple[int, str, str]] = collections.deque(maxlen=get_config("core.logs_buffer.max_size"))
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __write_job(connection: sqlite3.Connection, rows: List[Tuple[int, str, str]]) -> int:
+        connection.executemany("INSERT INTO LOGS (TIMESTAMP, CATEGORY, LOG) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def append(self, row: Tuple[int, str, str]) -> None:
+        """
+        Add a row to the buffer, flush it if it contains at least core.logs_buffer.flush_rows rows
+        :param row: (timestamp, category, log entry)
+        :return: None
+        """
+
+        with self.__lock:
+            if len(self.__rows) == self.__rows.maxlen:
+                self.dropped += 1
+
+            self.__rows.append(row)
+            full = len(self.__rows) >= get_config("core.logs_buffer.flush_rows")
+
+        if full:
+            self.flush()
+
+    def flush(self) -> Optional[Future]:
+        """
+        Write every buffered row with a single executemany in one transaction, without waiting for it
+        :return: A concurrent future resolved with the number of written rows, None if there was nothing to write
+        """
+
+        with self.__lock:
+            if not self.__rows and not self.dropped:
+                return None
+
+            rows = list(self.__rows)
+            self.__rows.clear()
+
+            if self.dropped:
+                rows.append((int(time.time()), "Logger", f"{self.dropped} log entries dropped (buffer full)"))
+                self.dropped = 0
+
+        return self.database.submit_job(self.__write_job, rows)
 
 
 class Logger:
-    def __init__(self, database: sqlite3.Connection):
+    __buffers: Dict[AsyncDatabase, LogBuffer] = {}
+    __buffers_lock = threading.Lock()
+
+    def __init__(self, database: AsyncDatabase):
         self.database = database
 
+        with Logger.__buffers_lock:
+            if database not in Logger.__buffers:
+                Logger.__buffers[database] = LogBuffer(database)
+
+            self.buffer = Logger.__buffers[database]
+
     def add_log(self, category: str, log_entry: str):
         timestamp = int(time.time())
-        self.database.execute(
-            "INSERT INTO LOGS (TIMESTAMP, CATEGORY, LOG) VALUES (?, ?, ?)",
-            (timestamp, category, log_entry)
-        )
-        self.database.commit()
+        self.buffer.append((timestamp, category, log_entry))
 
         print(f"[{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')} | {category}] {log_entry}")
+
+    def flush(self) -> Optional[Future]:
+        """
+        Schedule the write of every buffered log of this database
+        :return: A concurrent future resolved once they are written, None if there was nothing to write
+        """
+
+        return self.buffer.flush()
+
+    @classmethod
+    async def flush_all(cls) -> None:
+        """
+        Write the buffered logs of every database and wait for them to be committed
+        :return: None
+        """
+
+        with cls.__buffers_lock:
+            buffers = list(cls.__buffers.values())
+
+        futures = [asyncio.wrap_future(i) for i in (j.flush() for j in buffers) if i is not None]
+        await asyncio.gather(*futures)
@@ -0,0 +1,237 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
+
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional, Tuple, Union
+
+# Upper bounds in seconds, the last bucket (+Inf) is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        Fixed buckets histogram, observing a value costs a binary search and never allocates
+        :param buckets: The sorted upper bounds of the buckets
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Not cumulative, the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile with a linear interpolation inside its bucket, like Prometheus histogram_quantile
+        :param q: The quantile, between 0 and 1
+        :return: The estimated value, None if nothing was observed
+        """
+
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        cumulated = 0
+
+        for i, count in enumerate(self.counts):
+            if cumulated + count >= rank and count:
+                if i == len(self.buckets):  # +Inf bucket, its upper bound is unknown
+                    return self.buckets[-1]
+
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulated) / count
+
+            cumulated += count
+
+        return self.buckets[-1]
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        """
+        Process wide metrics, identified by a name and labels, exported in the Prometheus text format
+        """
+
+        self.__metrics: Dict[str, Dict[Labels, Metric]] = {}
+        self.__types: Dict[str, Tuple[type, str]] = {}  # name: (metric class, help text)
+        self.__lock = threading.RLock()  # A collection can run the GC callback on a thread holding it
+
+    def __get(self, cls: type, name: str, description: str, labels: Dict[str, Any], *args: Any) -> Any:
+        key = tuple(sorted((i, str(j)) for i, j in labels.items()))
+        metric = self.__metrics.get(name, {}).get(key)
+
+        if metric is not None:
+            return metric
+
+        with self.__lock:
+            if self.__types.setdefault(name, (cls, description))[0] is not cls:
+                raise ValueError(f"Metric {name} is already registered as a {self.__types[name][0].__name__}")
+
+            return self.__metrics.setdefault(name, {}).setdefault(key, cls(*args))
+
+    def counter(self, name: str, description: str = "", **labels: Any) -> Counter:
+        """
+        :param name: The metric name
+        :param description: The help text of the metric
+        :param labels: The labels of this series
+        :return: The counter of this series, created if needed
+        """
+
+        return self.__get(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str = "", **labels: Any) -> Gauge:
+        """
+        See counter
+        """
+
+        return self.__get(Gauge, name, description, labels)
+
+    def histogram(
+            self,
+            name: str,
+            description: str = "",
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+            **labels: Any
+    ) -> Histogram:
+        """
+        See counter, buckets are only used when the series is created
+        """
+
+        return self.__get(Histogram, name, description, labels, buckets)
+
+    def series(self, name: str) -> Iterator[Tuple[Dict[str, str], Metric]]:
+        """
+        :param name: The metric name
+        :return: (labels, metric) of every series of this metric
+        """
+
+        for labels, metric in list(self.__metrics.get(name, {}).items()):
+            yield dict(labels), metric
+
+    def to_prometheus(self) -> str:
+        """
+        :return: Every metric in the Prometheus text exposition format
+        """
+
+        lines: List[str] = []
+
+        with self.__lock:  # Series can be created meanwhile from the loop, the database threads or the GC callback
+            types = sorted(self.__types.items())
+            metrics = {name: sorted(series.items()) for name, series in self.__metrics.items()}
+
+        for name, (cls, description) in types:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {cls.__name__.lower()}")
+
+            for labels, metric in metrics.get(name, []):
+                if isinstance(metric, Histogram):
+                    cumulated = 0
+
+                    for bound, count in zip(metric.buckets + (float("inf"),), metric.counts):
+                        cumulated += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulated}")
+
+                    lines.append(f"{name}_sum{_format_labels(labels)} {metric.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {metric.value!r}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write every metric to a file in the Prometheus text format (node_exporter textfile collector), the file is
+        replaced atomically so it is never read half written
+        :param path: The file path
+        :return: None
+        """
+
+        text = self.to_prometheus()
+
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            file.write(text)
+
+        os.replace(f"{path}.tmp", path)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')) for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def timed_listener(
+        func: Callable[..., Coroutine[Any, Any, Any]],
+        cog_name: str,
+        event: str
+) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """
+    :param func: A listener
+    :param cog_name: The cog of the listener
+    :param event: The event it listens to
+    :return: The listener, recording its duration in bot_listener_duration_seconds
+    """
+
+    histogram = registry.histogram(
+        "bot_listener_duration_seconds",
+        "Duration of the cogs event listeners",
+        cog=cog_name,
+        event=event
+    )
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+
+        try:
+            return await func(*args, **kwargs)
+
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    return wrapper
+
+
+registry = MetricsRegistry()
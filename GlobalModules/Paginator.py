@@ -1,140 +1,394 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
-import gc
+import abc
+import asyncio
+import functools
+import hashlib
+import inspect
 import json
-import sqlite3
 import time
-from typing import Union, List
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import discord
 from discord import Embed, ui, ButtonStyle
 from discord.ext import commands
 
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.Logger import Logger
+from GlobalModules.Metrics import registry
 
+VIEW_CACHE_SIZE = 1024  # Maximum number of distinct navigation components payloads kept in memory
+EXPIRY_RETRY_TIME = 86400  # Seconds during which the removal of an expired paginator view is retried
+
+
+def encode_page(page: dict) -> Tuple[str, bytes]:
+    """
+    :param page: The embed dict of a page (without name nor footer)
+    :return: The content hash of the page and its compressed data, as stored in PAGINATOR_PAGES
+    """
+
+    data = json.dumps(page, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest(), zlib.compress(data)
+
+
+def decode_page(data: bytes) -> dict:
+    """
+    :param data: The compressed data of a page
+    :return: The embed dict of the page
+    """
+
+    return json.loads(zlib.decompress(data))
+
+
+def render_page(page: dict, index: int, page_count: int, author: Union[discord.User, discord.Member]) -> Embed:
+    """
+    :param page: The embed dict of the page
+    :param index: The page index
+    :param page_count: The number of pages of the paginator
+    :param author: The user the paginator belongs to
+    :return: The embed of the page with its footer
+    """
+
+    page = dict(
+        page,
+        footer={'text': f'{author.name} - Page {index + 1}/{page_count}', 'icon_url': author.display_avatar.url}
+    )
+
+    if "color" not in page.keys():
+        page.update({"color": get_config("core.base_embed_color")})
+
+    return Embed.from_dict(page)
+
+
+# A page provider is either a coroutine function (database, page index, *args) -> Embed or an async generator
+# function (database, *args) yielding every page in order
+PageProvider = Union[Callable[..., Awaitable[Embed]], Callable[..., AsyncIterator[Embed]]]
+
+# provider name => provider
+_providers: Dict[str, PageProvider] = {}
+
+
+def page_provider(name: str):
+    """
+    Register a page provider usable with Paginator.set_provider, it must be registered at import so paginators can be
+    restored after a restart
+    :param name: The provider name stored in the database, prefix it with your cog name
+    :return: Wrapped function
+    """
+
+    def inner(func: PageProvider) -> PageProvider:
+        if not inspect.iscoroutinefunction(func) and not inspect.isasyncgenfunction(func):
+            raise TypeError(f"Page provider {name} must be a coroutine or an async generator function")
+
+        _providers[name] = func
+        return func
+
+    return inner
+
+
+class PaginatorSession(abc.ABC):
+    def __init__(
+            self,
+            database: AsyncDatabase,
+            user_id: int,
+            page_names: List[Optional[str]],
+            current_page: int,
+            pages: Optional[List[dict]] = None
+    ) -> None:
+        """
+        State of a paginator message kept in memory while it is used
+        :param database: The database holding the pages
+        :param user_id: The ID of the user allowed to use it
+        :param page_names: The name of every page (None for unnamed pages)
+        :param current_page: The page currently displayed
+        :param pages: The embed dict of every page if already known, else pages are loaded when displayed
+        """
 
-class Paginator:
-    def __init__(self, database: sqlite3.Connection):
         self.database = database
-        self.pages = []
-        self.logger = Logger(self.database)
+        self.user_id = user_id
+        self.page_names: Tuple[Optional[str], ...] = tuple(page_names)
+        self.current_page = current_page
 
-    def __update_page_properties(self, author: discord.Member):
-        pages = []
-
-        for i, j in enumerate(self.pages):
-            pages.append(j)
-            pages[-1].update(
-                {
-                    'footer': {
-                        'text': f'{author.name} - Page {i + 1}/{len(self.pages)}',
-                        'icon_url': f'{author.avatar.url}'
-                    }
-                }
-            )
+        self.pages: List[Optional[dict]] = [None] * len(page_names) if pages is None else list(pages)
+        self.__embeds: List[Optional[Embed]] = [None] * len(page_names)
 
-            if "color" not in pages[-1].keys():
-                pages[-1].update({"color": get_config("core.base_embed_color")})
+    def __len__(self) -> int:
+        return len(self.page_names)
 
-    def add_page(self, page: Embed, page_name: Union[str, None] = None):
-        page_dict = dict(page.to_dict())
+    @abc.abstractmethod
+    async def load_page(self, page: int) -> dict:
+        """
+        :param page: The index of a page which isn't in self.pages yet
+        :return: The embed dict of this page
+        """
 
-        if page_name is not None:
-            page_dict.update({'PaginatorPageName': page_name.capitalize()})
+    async def get_embed(self, page: int, author: Union[discord.User, discord.Member]) -> Embed:
+        """
+        :param page: The page index
+        :param author: The user the paginator belongs to
+        :return: The embed of this page, built on first access
+        """
 
-        else:
-            page_dict.update({'PaginatorPageName': None})
+        if self.__embeds[page] is None:
+            if self.pages[page] is None:
+                self.pages[page] = await self.load_page(page)
 
-        self.pages.append(page_dict)
+            self.__embeds[page] = render_page(self.pages[page], page, len(self), author)
 
-    @staticmethod
-    def __make_view(current_page: int, pages: List[dict]) -> ui.View:
-        max_page = len(pages)
+        return self.__embeds[page]
 
-        c_id = get_config('core.paginator_view_base_id')
 
-        kwargs1 = {'style': ButtonStyle.grey, 'custom_id': f"{c_id}_B1", 'emoji': chr(9198)}
-        kwargs2 = {'style': ButtonStyle.green, 'custom_id': f"{c_id}_B2", 'emoji': chr(9194)}
-        kwargs3 = {'style': ButtonStyle.red, 'custom_id': f"{c_id}_B3", 'emoji': chr(9209), 'label': "Stop"}
-        kwargs4 = {'style': ButtonStyle.green, 'custom_id': f"{c_id}_B4", 'emoji': chr(9193)}
-        kwargs5 = {'style': ButtonStyle.grey, 'custom_id': f"{c_id}_B5", 'emoji': chr(9197)}
+class StoredPaginatorSession(PaginatorSession):
+    def __init__(
+            self,
+            database: AsyncDatabase,
+            user_id: int,
+            page_refs: List[Tuple[str, Optional[str]]],
+            current_page: int,
+            pages: Optional[List[dict]] = None
+    ) -> None:
+        """
+        Session of a paginator whose pages are stored in PAGINATOR_PAGES
+        :param page_refs: The (content hash, name) of every page
+        """
+
+        super().__init__(database, user_id, [i[1] for i in page_refs], current_page, pages)
+        self.page_hashes: Tuple[str, ...] = tuple(i[0] for i in page_refs)
+
+    async def load_page(self, page: int) -> dict:
+        data = await self.database.fetchone(
+            "SELECT DATA FROM PAGINATOR_PAGES WHERE HASH = ?;",
+            (self.page_hashes[page],)
+        )
+
+        return decode_page(data[0])
 
-        # Buttons 1-2
 
-        if current_page == 0:
-            kwargs1.update({'disabled': True})
-            kwargs2.update({'disabled': True, 'label': "1"})
+class ProviderPaginatorSession(PaginatorSession):
+    def __init__(
+            self,
+            database: AsyncDatabase,
+            user_id: int,
+            provider: PageProvider,
+            args: List[Any],
+            page_names: List[Optional[str]],
+            current_page: int
+    ) -> None:
+        """
+        Session of a paginator whose pages are rendered on demand by a page provider
+        :param provider: The page provider
+        :param args: The extra arguments given to the provider
+        """
+
+        super().__init__(database, user_id, page_names, current_page)
+        self.provider = provider
+        self.args = args
+
+        self.__generator: Optional[AsyncIterator[Embed]] = None
+        self.__generated = 0
+        self.__lock = asyncio.Lock()  # An async generator can't be advanced by two clicks at once
+
+    async def load_page(self, page: int) -> dict:
+        if not inspect.isasyncgenfunction(self.provider):
+            return (await self.provider(self.database, page, *self.args)).to_dict()
+
+        async with self.__lock:
+            if self.__generator is None:
+                self.__generator = self.provider(self.database, *self.args)
 
-        else:
-            kwargs1.update({'disabled': False})
-            kwargs2.update({'disabled': False, 'label': str(current_page)})
+            try:
+                while self.__generated <= page:  # Every page before this one is cached as it was generated before
+                    self.pages[self.__generated] = (await anext(self.__generator)).to_dict()
+                    self.__generated += 1
 
-        if current_page <= 4:
-            kwargs1.update({'label': "1"})
+            except StopAsyncIteration:
+                return Embed(
+                    title="Page unavailable",
+                    description=f"This page no longer exists, the content only has {self.__generated} pages",
+                    colour=0xFF0000
+                ).to_dict()
 
-        else:
-            kwargs1.update({'label': str(current_page - 3)})
+        return self.pages[page]
 
-        # Buttons 4-5
 
-        if current_page + 1 == max_page:
-            kwargs4.update({'disabled': True, 'label': str(max_page)})
-            kwargs5.update({'disabled': True, 'label': str(max_page)})
+class PaginatorView(ui.View):
+    def __init__(self, components: List[Dict[str, Any]]) -> None:
+        """
+        View sending precomputed components, clicks are handled by Paginator.process_interaction. discord.py still
+        keeps the views given to send_message (and sets a timeout on ephemeral ones), so a new instance must be used
+        for every message, only its components payload is shared
+        :param components: The components payload, must be considered read only
+        """
 
-        else:
-            kwargs4.update({'disabled': False, 'label': str(current_page + 2)})
-            kwargs5.update({'disabled': False})
+        super().__init__(timeout=None)
+        self.__components = components
+
+    def to_components(self) -> List[Dict[str, Any]]:
+        return self.__components
+
+    def is_dispatchable(self) -> bool:
+        return False
+
+
+def make_paginator_view(current_page: int, page_names: Tuple[Optional[str], ...], c_id: str) -> PaginatorView:
+    """
+    :param current_page: The page index
+    :param page_names: The name of every page (None for unnamed pages)
+    :param c_id: The custom ID prefix (core.paginator_view_base_id)
+    :return: A new navigation view of a paginator, built from the memoized components
+    """
+
+    return PaginatorView(make_paginator_components(current_page, page_names, c_id))
+
+
+@functools.lru_cache(maxsize=VIEW_CACHE_SIZE)
+def make_paginator_components(
+        current_page: int,
+        page_names: Tuple[Optional[str], ...],
+        c_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Build the components payload of a paginator navigation view, memoized as it only depends on its arguments
+    :param current_page: The page index
+    :param page_names: The name of every page (None for unnamed pages)
+    :param c_id: The custom ID prefix (core.paginator_view_base_id)
+    :return: The components payload, shared by every caller so it must not be modified
+    """
+
+    max_page = len(page_names)
+
+    kwargs1 = {'style': ButtonStyle.grey, 'custom_id': f"{c_id}_B1", 'emoji': chr(9198)}
+    kwargs2 = {'style': ButtonStyle.green, 'custom_id': f"{c_id}_B2", 'emoji': chr(9194)}
+    kwargs3 = {'style': ButtonStyle.red, 'custom_id': f"{c_id}_B3", 'emoji': chr(9209), 'label': "Stop"}
+    kwargs4 = {'style': ButtonStyle.green, 'custom_id': f"{c_id}_B4", 'emoji': chr(9193)}
+    kwargs5 = {'style': ButtonStyle.grey, 'custom_id': f"{c_id}_B5", 'emoji': chr(9197)}
+
+    # Buttons 1-2
+
+    if current_page == 0:
+        kwargs1.update({'disabled': True})
+        kwargs2.update({'disabled': True, 'label': "1"})
 
-        if max_page - current_page < 5:
-            kwargs5.update({'label': str(max_page)})
+    else:
+        kwargs1.update({'disabled': False})
+        kwargs2.update({'disabled': False, 'label': str(current_page)})
+
+    if current_page <= 4:
+        kwargs1.update({'label': "1"})
+
+    else:
+        kwargs1.update({'label': str(current_page - 3)})
+
+    # Buttons 4-5
+
+    if current_page + 1 == max_page:
+        kwargs4.update({'disabled': True, 'label': str(max_page)})
+        kwargs5.update({'disabled': True, 'label': str(max_page)})
+
+    else:
+        kwargs4.update({'disabled': False, 'label': str(current_page + 2)})
+        kwargs5.update({'disabled': False})
+
+    if max_page - current_page < 5:
+        kwargs5.update({'label': str(max_page)})
+
+    else:
+        kwargs5.update({'label': str(current_page + 5)})
+
+    view = ui.View()
+
+    for kwargs in [kwargs1, kwargs2, kwargs3, kwargs4, kwargs5]:
+        view.add_item(ui.Button(**kwargs))
+
+    if max_page < 25:
+        range_values = (0, max_page)
+
+    else:
+        if current_page <= 14:
+            range_values = (0, 25)
+
+        elif current_page >= max_page - 15:
+            range_values = (max_page - 25, max_page)
 
         else:
-            kwargs5.update({'label': str(current_page + 5)})
+            range_values = (current_page - 6, current_page + 7)
 
-        view = ui.View()
+    options = []
+    for i in range(*range_values):
+        if page_names[i] is None:
+            label = f"Page {i + 1}"
 
-        for kwargs in [kwargs1, kwargs2, kwargs3, kwargs4, kwargs5]:
-            view.add_item(ui.Button(**kwargs))
+        else:
+            label = page_names[i]
 
-        if max_page < 25:
-            range_values = (0, max_page)
+        kwargs = {'label': label, 'value': str(i), 'description': f"Show {label.lower()}"}
+        if i == current_page:
+            kwargs.update({'default': True})
 
         else:
-            if current_page <= 14:
-                range_values = (0, 25)
+            kwargs.update({'default': False})
 
-            elif current_page >= max_page - 15:
-                range_values = (max_page - 25, max_page)
+        options.append(discord.SelectOption(**kwargs))
 
-            else:
-                range_values = (current_page - 6, current_page + 7)
+    view.add_item(discord.ui.Select(
+        custom_id=f"{c_id}_S1",
+        options=options,
+        placeholder=f"Page {current_page + 1}"
+    ))
 
-        options = []
-        for i in range(*range_values):
-            if pages[i]["PaginatorPageName"] is None:
-                label = f"Page {i + 1}"
+    return view.to_components()
 
-            else:
-                label = pages[i]["PaginatorPageName"]
 
-            kwargs = {'label': label, 'value': str(i), 'description': f"Show {label.lower()}"}
-            if i == current_page:
-                kwargs.update({'default': True})
+# message ID => session, least recently used first
+_sessions: "OrderedDict[int, PaginatorSession]" = OrderedDict()
+# message ID => current page not written to the database yet
+_pending_pages: Dict[int, int] = {}
 
-            else:
-                kwargs.update({'default': False})
 
-            options.append(discord.SelectOption(**kwargs))
+class Paginator:
+    def __init__(self, database: AsyncDatabase):
+        self.database = database
+        self.pages = []
+        self.logger = Logger(self.database)
 
-        view.add_item(discord.ui.Select(
-            custom_id=f"{c_id}_S1",
-            options=options,
-            placeholder=f"Page {current_page + 1}"
-        ))
+        self.provider: Optional[Tuple[str, int, List[Any], Optional[List[str]]]] = None
 
-        return view
+    def add_page(self, page: Embed, page_name: Union[str, None] = None):
+        page_dict = dict(page.to_dict())
+
+        if page_name is not None:
+            page_dict.update({'PaginatorPageName': page_name.capitalize()})
+
+        else:
+            page_dict.update({'PaginatorPageName': None})
+
+        self.pages.append(page_dict)
+
+    def set_provider(self, name: str, page_count: int, *args: Any, page_names: Optional[List[str]] = None):
+        """
+        Render pages on demand with a page provider instead of pages added with add_page, only the provider name and
+        its arguments are stored in the database
+        :param name: The name the provider was registered with (see page_provider)
+        :param page_count: The number of pages
+        :param args: Extra arguments given to the provider, must be JSON serializable
+        :param page_names: The name of every page, unnamed pages by default
+        """
+
+        if name not in _providers:
+            raise ValueError(f"Unknown page provider {name}")
+
+        if page_count < 1:
+            raise ValueError("A paginator must have at least one page")
+
+        if page_names is not None:
+            page_names = [i.capitalize() for i in page_names]
+
+        self.provider = (name, page_count, list(args), page_names)
 
     async def send_paginator(self,
                              interaction_ctx: Union[discord.Interaction, commands.Context],
@@ -154,117 +408,211 @@ class Paginator:
                 f"Type of interaction_ctx is neither a context or an interaction ({type(interaction_ctx) = })"
             )
 
-        self.__update_page_properties(author)
+        stored_pages = []
+
+        if self.provider is None:
+            page_refs = []
+            pages = []
+
+            for i in self.pages:
+                page = {key: value for key, value in i.items() if key != "PaginatorPageName"}
+                page_hash, data = encode_page(page)
+
+                page_refs.append((page_hash, i["PaginatorPageName"]))
+                pages.append(page)
+                stored_pages.append((page_hash, data))
+
+            session = StoredPaginatorSession(self.database, author.id, page_refs, 0, pages)
+            row = (json.dumps(page_refs), None)
 
-        if len(self.pages) == 1:
-            await send_callback(embed=discord.Embed.from_dict(self.pages[0]), ephemeral=ephemeral, **kwargs)
+        else:
+            name, page_count, args, page_names = self.provider
+            page_names = [None] * page_count if page_names is None else page_names
+
+            session = ProviderPaginatorSession(self.database, author.id, _providers[name], args, page_names, 0)
+            row = (None, json.dumps({'name': name, 'args': args, 'page_names': page_names}))
+
+        if len(session) == 1:
+            await send_callback(embed=await session.get_embed(0, author), ephemeral=ephemeral, **kwargs)
 
         else:
             msg = await send_callback(
-                embed=discord.Embed.from_dict(self.pages[0]),
+                embed=await session.get_embed(0, author),
                 ephemeral=ephemeral,
-                view=self.__make_view(0, self.pages),
+                view=make_paginator_view(0, session.page_names, get_config('core.paginator_view_base_id')),
                 **kwargs
             )
 
             if isinstance(interaction_ctx, discord.Interaction):
                 msg = await interaction_ctx.original_response()
 
-            self.database.execute(
-                "INSERT INTO PAGINATOR (MESSAGE_ID, CHANNEL_ID, GUILD_ID, USER_ID, DELETE_TS, PAGES, CURRENT_PAGE) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                (
-                    msg.id,
-                    msg.channel.id,
-                    msg.guild.id,
-                    author.id,
-                    int(time.time() + get_config("core.paginator_delete_after")),
-                    json.dumps(self.pages),
-                    0
+            async with self.database.transaction() as transaction:
+                transaction.executemany(
+                    "INSERT OR IGNORE INTO PAGINATOR_PAGES (HASH, DATA) VALUES (?, ?);",
+                    stored_pages
+                )
+                transaction.execute(
+                    "INSERT INTO PAGINATOR (MESSAGE_ID, CHANNEL_ID, GUILD_ID, USER_ID, DELETE_TS, PAGE_REFS, "
+                    "PROVIDER, CURRENT_PAGE) VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+                    (
+                        msg.id,
+                        msg.channel.id,
+                        msg.guild.id,
+                        author.id,
+                        int(time.time() + get_config("core.paginator_delete_after")),
+                        *row,
+                        0
+                    )
                 )
-            )
+
+            self.__remember(msg.id, session)
 
             self.logger.add_log(
                 "PAGINATOR",
                 f"Paginator sent in {msg.guild.id} => message id: {msg.id}"
             )
 
-        print(f"Garbage collector send_paginator: {gc.collect()}")
-
     async def process_interaction(self, inter: discord.Interaction):
         if "custom_id" not in inter.data.keys():
             return
 
         custom_id = inter.data['custom_id']
 
-        if not get_config('core.paginator_view_base_id') in inter.data["custom_id"]:
+        c_id = get_config('core.paginator_view_base_id')
+
+        if c_id not in custom_id:
             return
 
-        values = self.database.execute(
-            "SELECT USER_ID, PAGES, CURRENT_PAGE FROM PAGINATOR WHERE MESSAGE_ID = ?",
-            (inter.message.id,)
-        ).fetchone()
+        start = time.perf_counter()
 
-        if values is None:
-            return
+        try:
+            session = await self.__get_session(inter.message.id)
 
-        user_id, pages_str, current_page = values
-        pages = json.loads(pages_str)
+            if session is None or session.user_id != inter.user.id:
+                return
 
-        if user_id != inter.user.id:
-            return
+            current_page = session.current_page
 
-        c_id = get_config('core.paginator_view_base_id')
-        if custom_id == f"{c_id}_B1":
-            await self.__change_page(pages, current_page - 4, inter)
+            if custom_id == f"{c_id}_B1":
+                await self.__change_page(session, current_page - 4, inter, c_id)
 
-        elif custom_id == f"{c_id}_B2":
-            await self.__change_page(pages, current_page - 1, inter)
+            elif custom_id == f"{c_id}_B2":
+                await self.__change_page(session, current_page - 1, inter, c_id)
 
-        elif custom_id == f"{c_id}_B3":
-            await self.remove_paginator(inter)
+            elif custom_id == f"{c_id}_B3":
+                await self.remove_paginator(inter)
 
-        elif custom_id == f"{c_id}_B4":
-            await self.__change_page(pages, current_page + 1, inter)
+            elif custom_id == f"{c_id}_B4":
+                await self.__change_page(session, current_page + 1, inter, c_id)
 
-        elif custom_id == f"{c_id}_B5":
-            await self.__change_page(pages, current_page + 4, inter)
+            elif custom_id == f"{c_id}_B5":
+                await self.__change_page(session, current_page + 4, inter, c_id)
 
-        elif custom_id == f"{c_id}_S1":
-            if inter.data['values'][0] == str(current_page):
-                await inter.response.defer()
+            elif custom_id == f"{c_id}_S1":
+                if inter.data['values'][0] == str(current_page):
+                    await inter.response.defer()
 
-            else:
-                try:
-                    new_page = int(inter.data['values'][0])
+                else:
+                    try:
+                        new_page = int(inter.data['values'][0])
 
-                except ValueError:
-                    return
+                    except ValueError:
+                        return
 
-                await self.__change_page(pages, new_page, inter)
-                self.database.execute(
-                    "SELECT USER_ID, PAGES, CURRENT_PAGE FROM PAGINATOR WHERE MESSAGE_ID = ?",
-                    (inter.message.id,)
-                )
+                    await self.__change_page(session, new_page, inter, c_id)
 
-        print(f"Garbage collector paginator.process_interaction: {gc.collect()}")
+        finally:  # Also count the clicks which were ignored or failed
+            registry.histogram(
+                "bot_paginator_click_duration_seconds",
+                "Duration of the paginator clicks, session loading included",
+                button=custom_id.removeprefix(f"{c_id}_")
+            ).observe(time.perf_counter() - start)
 
-    async def __change_page(self, pages: List[dict], new_page: int, interaction: discord.Interaction):
+    @staticmethod
+    async def __change_page(session: PaginatorSession, new_page: int, interaction: discord.Interaction, c_id: str):
         if new_page < 0:
             new_page = 0
 
-        elif new_page >= len(pages):
-            new_page = len(pages) - 1
+        elif new_page >= len(session):
+            new_page = len(session) - 1
+
+        await interaction.response.edit_message(
+            embed=await session.get_embed(new_page, interaction.user),
+            view=make_paginator_view(new_page, session.page_names, c_id)
+        )
 
-        view = self.__make_view(new_page, pages)
-        await interaction.response.edit_message(embed=discord.Embed.from_dict(pages[new_page]), view=view)
+        session.current_page = new_page
+        _pending_pages[interaction.message.id] = new_page
 
-        self.database.execute(
-            "UPDATE PAGINATOR SET CURRENT_PAGE = ? WHERE MESSAGE_ID = ?",
-            (new_page, interaction.message.id)
+    @staticmethod
+    def __remember(message_id: int, session: PaginatorSession) -> None:
+        _sessions[message_id] = session
+        _sessions.move_to_end(message_id)
+
+        while len(_sessions) > get_config("core.paginator_cache_size"):
+            _sessions.popitem(last=False)
+
+    async def __get_session(self, message_id: int) -> Optional[PaginatorSession]:
+        """
+        Get a paginator session from the cache, or from the database after a restart or an eviction
+        :param message_id: The paginator message ID
+        :return: The session, None if this message isn't a paginator
+        """
+
+        session = _sessions.get(message_id)
+
+        if session is not None:
+            _sessions.move_to_end(message_id)
+            return session
+
+        values = await self.database.fetchone(
+            "SELECT USER_ID, PAGE_REFS, PROVIDER, CURRENT_PAGE FROM PAGINATOR WHERE MESSAGE_ID = ?",
+            (message_id,)
         )
 
-        self.database.commit()
+        if values is None:
+            return None
+
+        user_id, page_refs, provider, current_page = values
+        current_page = _pending_pages.get(message_id, current_page)
+
+        if provider is None:
+            session = StoredPaginatorSession(self.database, user_id, json.loads(page_refs), current_page)
+
+        else:
+            provider = json.loads(provider)
+
+            if provider['name'] not in _providers:  # The cog which registered it isn't loaded
+                return None
+
+            session = ProviderPaginatorSession(
+                self.database,
+                user_id,
+                _providers[provider['name']],
+                provider['args'],
+                provider['page_names'],
+                current_page
+            )
+
+        self.__remember(message_id, session)
+
+        return session
+
+    @staticmethod
+    def flush_pages(database: AsyncDatabase) -> Optional[Future]:
+        """
+        Write the current page of every paginator changed since the last flush
+        :param database: The database to write to
+        :return: A concurrent future resolved once they are written, None if there was nothing to write
+        """
+
+        if not _pending_pages:
+            return None
+
+        rows = [(page, message_id) for message_id, page in _pending_pages.items()]
+        _pending_pages.clear()
+
+        return database.submit_many("UPDATE PAGINATOR SET CURRENT_PAGE = ? WHERE MESSAGE_ID = ?", rows)
 
     async def remove_paginator(
             self,
@@ -289,7 +637,68 @@ class Paginator:
             except (discord.HTTPException, discord.Forbidden, TypeError, ValueError):
                 pass
 
-        self.database.execute("DELETE FROM PAGINATOR WHERE MESSAGE_ID = ?;", (msg_id,))
-        self.database.commit()
+        _sessions.pop(msg_id, None)
+        _pending_pages.pop(msg_id, None)
+
+        await self.database.execute("DELETE FROM PAGINATOR WHERE MESSAGE_ID = ?;", (msg_id,))
+
+    async def remove_expired(self, bot: commands.AutoShardedBot) -> None:
+        """
+        Remove the view of every expired paginator, messages are edited concurrently (at most
+        core.paginator_expiry_concurrency at once) and the rows of finished ones are deleted in a single batch, rows
+        which failed because of a server error or a rate limit are kept and retried on next calls, for at most
+        EXPIRY_RETRY_TIME seconds after their expiry
+        :param bot: The bot used to edit messages
+        :return: None
+        """
+
+        now = int(time.time())
+        rows = await self.database.fetchall(
+            "SELECT MESSAGE_ID, CHANNEL_ID, DELETE_TS FROM PAGINATOR WHERE DELETE_TS < ?;",
+            (now,)
+        )
+
+        if not rows:
+            return
+
+        semaphore = asyncio.Semaphore(get_config("core.paginator_expiry_concurrency"))
+
+        async def remove_view(msg_id: int, channel_id: int, delete_ts: int) -> bool:
+            async with semaphore:
+                try:
+                    await bot.get_partial_messageable(channel_id).get_partial_message(msg_id).edit(view=None)
+
+                except discord.HTTPException as err:
+                    # discord.py already retried these itself, other errors (message gone, archived thread, missing
+                    # access...) won't change by retrying
+                    if isinstance(err, discord.DiscordServerError) or err.status == 429:
+                        return delete_ts < now - EXPIRY_RETRY_TIME
+
+            return True
 
-        print(f"Garbage collector paginator.remove_paginator: {gc.collect()}")
+        results = await asyncio.gather(*(remove_view(*i) for i in rows))
+        removed = [msg_id for (msg_id, _, _), done in zip(rows, results) if done]
+
+        for msg_id in removed:
+            _sessions.pop(msg_id, None)
+            _pending_pages.pop(msg_id, None)
+
+        await self.database.executemany("DELETE FROM PAGINATOR WHERE MESSAGE_ID = ?;", ((i,) for i in removed))
+
+        self.logger.add_log(
+            "PAGINATOR",
+            f"{len(removed)} expired paginators removed, {len(rows) - len(removed)} will be retried"
+        )
+
+        await self.collect_pages()
+
+    async def collect_pages(self) -> int:
+        """
+        Delete the stored pages which aren't used by any paginator anymore
+        :return: The number of deleted pages
+        """
+
+        return await self.database.execute(
+            "DELETE FROM PAGINATOR_PAGES WHERE HASH NOT IN ("
+            "SELECT json_extract(j.value, '$[0]') FROM PAGINATOR, json_each(PAGINATOR.PAGE_REFS) AS j);"
+        )
@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    :param sql: An SQL statement
+    :return: The statement with its literals replaced by ? and its whitespaces collapsed, so the same statement built
+    with different values is counted once
+    """
+
+    sql = _LITERALS.sub("?", sql)
+    sql = _IN_LISTS.sub("(?, ...)", sql)
+
+    return _SPACES.sub(" ", sql).strip()
+
+
+class StatementStats:
+    __slots__ = ("count", "total_time", "max_time", "rows", "plan", "full_scan")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0  # Seconds, execution and fetch
+        self.max_time = 0.0
+        self.rows = 0  # Rows returned
+        self.plan: Optional[List[str]] = None  # EXPLAIN QUERY PLAN, captured the first time the statement was slow
+        self.full_scan = False  # The plan scans a whole table
+
+
+class SqlProfiler:
+    def __init__(self, slow_threshold: float) -> None:
+        """
+        Per statement statistics of every connection wrapped by this profiler
+        :param slow_threshold: The duration in seconds from which the query plan of a statement is captured
+        """
+
+        self.slow_threshold = slow_threshold
+
+        self.__stats: Dict[str, StatementStats] = {}
+        self.__lock = threading.Lock()
+
+    def wrap(self, connection: sqlite3.Connection) -> "ProfiledConnection":
+        """
+        :param connection: A connection
+        :return: The connection, recording its statements in this profiler
+        """
+
+        return ProfiledConnection(connection, self)
+
+    def get_stats(self, sql: str) -> StatementStats:
+        """
+        :param sql: A normalized statement
+        :return: Its statistics, created if needed
+        """
+
+        stats = self.__stats.get(sql)
+
+        if stats is None:
+            with self.__lock:
+                stats = self.__stats.setdefault(sql, StatementStats())
+
+        return stats
+
+    def record(self, stats: StatementStats, duration: float, rows: int, call_time: float, calls: int = 0) -> None:
+        """
+        :param stats: The statistics of the statement
+        :param duration: The time to add to the statement total
+        :param rows: The rows to add to the statement total
+        :param call_time: The time spent by this call so far
+        :param calls: The calls to add to the statement total, fetches only add time and rows
+        :return: None
+        """
+
+        with self.__lock:
+            stats.count += calls
+            stats.total_time += duration
+            stats.rows += rows
+            stats.max_time = max(stats.max_time, call_time)
+
+    def top(self, count: int, key: str = "total_time") -> List[Tuple[str, StatementStats]]:
+        """
+        :param count: The number of statements
+        :param key: The StatementStats attribute to sort by
+        :return: The statements with the highest value, highest first
+        """
+
+        with self.__lock:
+            items = list(self.__stats.items())
+
+        return sorted(items, key=lambda i: getattr(i[1], key), reverse=True)[:count]
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__stats.clear()
+
+
+class ProfiledCursor:
+    def __init__(
+            self,
+            cursor: sqlite3.Cursor,
+            connection: "ProfiledConnection",
+            stats: StatementStats,
+            sql: str,
+            parameters: Any,
+            elapsed: float
+    ) -> None:
+        """
+        Cursor adding its fetch time and returned rows to the statistics of its statement
+        """
+
+        self.__cursor = cursor
+        self.__connection = connection
+        self.__stats = stats
+        self.__sql = sql
+        self.__parameters = parameters
+        self.__elapsed = elapsed
+
+    def __record(self, start: float, rows: int) -> None:
+        duration = time.perf_counter() - start
+        self.__elapsed += duration
+        self.__connection.profiler.record(self.__stats, duration, rows, self.__elapsed)
+        self.__connection.check_plan(self.__stats, self.__sql, self.__parameters, self.__elapsed)
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        start = time.perf_counter()
+        row = self.__cursor.fetchone()
+        self.__record(start, int(row is not None))
+
+        return row
+
+    def fetchmany(self, size: int = 1) -> List[Tuple[Any, ...]]:
+        start = time.perf_counter()
+        rows = self.__cursor.fetchmany(size)
+        self.__record(start, len(rows))
+
+        return rows
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        start = time.perf_counter()
+        rows = self.__cursor.fetchall()
+        self.__record(start, len(rows))
+
+        return rows
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        while (row := self.fetchone()) is not None:
+            yield row
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.__cursor, item)
+
+
+class ProfiledConnection:
+    def __init__(self, connection: sqlite3.Connection, profiler: SqlProfiler) -> None:
+        """
+        Connection wrapper timing every execute and executemany, other attributes are the wrapped connection ones
+        """
+
+        self.connection = connection
+        self.profiler = profiler
+
+    def check_plan(self, stats: StatementStats, sql: str, parameters: Any, elapsed: float) -> None:
+        """
+        Capture the query plan of a statement the first time it is slower than the profiler threshold
+        :param stats: The statistics of the statement
+        :param sql: The statement
+        :param parameters: Its parameters
+        :param elapsed: The time spent by this call so far
+        :return: None
+        """
+
+        if stats.plan is not None or elapsed < self.profiler.slow_threshold:
+            return
+
+        try:
+            plan = [i[3] for i in self.connection.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()]
+
+        except sqlite3.Error as err:  # Statements like BEGIN or PRAGMA have no plan
+            plan = [f"No plan: {err}"]
+
+        stats.plan = plan
+        stats.full_scan = any(i.startswith("SCAN ") and " USING " not in i for i in plan)
+
+    def execute(self, sql: str, parameters: Any = ()) -> ProfiledCursor:
+        stats = self.profiler.get_stats(normalize_sql(sql))
+
+        start = time.perf_counter()
+        cursor = self.connection.execute(sql, parameters)
+        duration = time.perf_counter() - start
+
+        self.profiler.record(stats, duration, 0, duration, calls=1)
+        self.check_plan(stats, sql, parameters, duration)
+
+        return ProfiledCursor(cursor, self, stats, sql, parameters, duration)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        seq_of_parameters = list(seq_of_parameters)
+        stats = self.profiler.get_stats(normalize_sql(sql))
+
+        start = time.perf_counter()
+        cursor = self.connection.executemany(sql, seq_of_parameters)
+        duration = time.perf_counter() - start
+
+        self.profiler.record(stats, duration, 0, duration, calls=1)
+
+        if seq_of_parameters:
+            self.check_plan(stats, sql, seq_of_parameters[0], duration)
+
+        return cursor
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.connection, item)
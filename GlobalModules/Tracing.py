@@ -0,0 +1,215 @@
+# SPDX-License-Identifier: MIT
+# Copyright (C) 2025 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+SLOWEST_TRACES = 50  # Traces kept by slowest_traces
+MAX_SPANS = 200  # Spans kept per trace, the next ones are only counted
+
+
+class Span:
+    __slots__ = ("name", "detail", "start", "duration")
+
+    def __init__(self, name: str, detail: str, start: float, duration: float) -> None:
+        """
+        :param name: The span category, like db.fetchone
+        :param detail: What was done, like the SQL query
+        :param start: Seconds between the trace start and the span start
+        :param duration: The span duration in seconds
+        """
+
+        self.name = name
+        self.detail = detail
+        self.start = start
+        self.duration = duration
+
+
+class Trace:
+    def __init__(self, name: str, user: str = "") -> None:
+        """
+        Timing of everything done while handling one command or interaction
+        :param name: The command or interaction name
+        :param user: Who triggered it
+        """
+
+        self.name = name
+        self.user = user
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Span] = []
+        self.dropped = 0  # Spans not kept because the trace already had MAX_SPANS spans
+        self.finished = False  # Tasks created during the trace keep it in their context after it ended
+
+    def add_span(self, name: str, detail: str, start: float, duration: float) -> None:
+        """
+        :param name: The span category
+        :param detail: What was done
+        :param start: The perf_counter value when the span started
+        :param duration: The span duration in seconds
+        :return: None
+        """
+
+        if self.finished:  # Done by a task which outlived the trace, like a loop started by a loaded cog
+            return
+
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(Span(name, detail, start - self.start, duration))
+
+        else:
+            self.dropped += 1
+
+
+class TraceBuffer:
+    def __init__(self, size: int) -> None:
+        """
+        Keep the slowest finished traces
+        :param size: The number of traces kept
+        """
+
+        self.size = size
+
+        self.__heap: List[Tuple[float, int, Trace]] = []  # The fastest kept trace first
+        self.__counter = itertools.count()  # Tie breaker, traces aren't comparable
+        self.__lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        item = (trace.duration, next(self.__counter), trace)
+
+        with self.__lock:
+            if len(self.__heap) < self.size:
+                heapq.heappush(self.__heap, item)
+
+            elif item[0] > self.__heap[0][0]:
+                heapq.heapreplace(self.__heap, item)
+
+    def get(self) -> List[Trace]:
+        """
+        :return: The kept traces, slowest first
+        """
+
+        with self.__lock:
+            return [i[2] for i in sorted(self.__heap, reverse=True)]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__heap.clear()
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+slowest_traces = TraceBuffer(SLOWEST_TRACES)
+
+
+@contextmanager
+def trace(name: str, user: str = "") -> Iterator[Optional[Trace]]:
+    """
+    Start a trace for the current task and the tasks it creates, if a trace is already running it is recorded as one
+    of its spans instead
+    :param name: The command or interaction name
+    :param user: Who triggered it
+    :return: The new trace, None if a trace was already running
+    """
+
+    running = current_trace.get()
+
+    if running is not None and not running.finished:
+        with span("trace", name):
+            yield None
+
+        return
+
+    new_trace = Trace(name, user)
+    token = current_trace.set(new_trace)
+
+    try:
+        yield new_trace
+
+    finally:
+        new_trace.duration = time.perf_counter() - new_trace.start
+        new_trace.finished = True
+        current_trace.reset(token)
+        slowest_traces.add(new_trace)
+
+
+@contextmanager
+def span(name: str, detail: str = "") -> Iterator[None]:
+    """
+    Record the duration of a block in the current trace, does nothing outside a trace
+    :param name: The span category, like db.fetchone
+    :param detail: What is done, like the SQL query
+    :return: None
+    """
+
+    running = current_trace.get()
+
+    if running is None or running.finished:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+
+    finally:
+        running.add_span(name, detail, start, time.perf_counter() - start)
+
+
+def get_aiohttp_trace_config() -> aiohttp.TraceConfig:
+    """
+    :return: A trace config recording every request of an aiohttp session as an http span
+    """
+
+    async def on_request_start(_: aiohttp.ClientSession, context: SimpleNamespace, __: Any) -> None:
+        context.trace = current_trace.get()
+        context.start = time.perf_counter()
+
+    async def on_request_end(_: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        if context.trace is not None:
+            context.trace.add_span(
+                "http",
+                f"{params.method} {params.url.host}{params.url.path} -> {params.response.status}",
+                context.start,
+                time.perf_counter() - context.start
+            )
+
+    async def on_request_exception(_: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        if context.trace is not None:
+            context.trace.add_span(
+                "http",
+                f"{params.method} {params.url.host}{params.url.path} -> {type(params.exception).__name__}",
+                context.start,
+                time.perf_counter() - context.start
+            )
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+
+    return trace_config
+
+
+def trace_discord_http(http: Any) -> None:
+    """
+    Record every discord REST call made through this HTTP client as a discord span, named after its route template
+    :param http: The bot HTTP client (bot.http)
+    :return: None
+    """
+
+    request: Callable[..., Awaitable[Any]] = http.request
+
+    async def traced_request(route: Any, *args: Any, **kwargs: Any) -> Any:
+        with span("discord", f"{route.method} {route.path}"):
+            return await request(route, *args, **kwargs)
+
+    http.request = traced_request
@@ -106,17 +106,22 @@ def generate_cog(cog_name: str):
         f.write(
             f"# SPDX-License-Identifier: MIT\n"
             f"# Copyright (C) {date.today().year} picasso2005 <clementduran0@gmail.com> - All Rights Reserved\n\n"
-            f"import sqlite3\n\n"
             f"from discord import app_commands\n"
             f"from discord.ext import commands\n\n"
-            f"from GlobalModules.HasPerm import has_perm\n\n\n"
+            f"from GlobalModules.AsyncDatabase import AsyncDatabase\n"
+            f"from GlobalModules.HasPerm import has_perm\n\n"
+            f"# Schema migration steps, applied in order before setup. Each step is a tuple of SQL statements or a\n"
+            f"# function called with the connection, never modify or reorder a released step, append new ones\n"
+            f"MIGRATIONS = []\n\n"
+            f"# Names of the cogs which must be loaded before this one, it isn't loaded if one of them fails\n"
+            f"DEPENDENCIES = []\n\n\n"
             f"# === DO NOT CHANGE CLASS NAME OR __init__ PARAMETERS === #\n"
             f"class {cog_name}(commands.GroupCog):\n"
-            f"    def __init__(self, bot: commands.AutoShardedBot, database: sqlite3.Connection):\n"
+            f"    def __init__(self, bot: commands.AutoShardedBot, database: AsyncDatabase):\n"
             f"        self.bot: bot = bot\n"
             f"        self.database = database\n\n\n"
             f"# === DO NOT REMOVE THE FOLLOWING OR CHANGE PARAMETERS === #\n\n"
-            f"async def setup(bot: commands.AutoShardedBot, database: sqlite3.Connection):\n"
+            f"async def setup(bot: commands.AutoShardedBot, database: AsyncDatabase):\n"
             f"    await bot.add_cog({cog_name}(bot, database))\n"
         )
 
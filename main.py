@@ -1,8 +1,8 @@
 # SPDX-License-Identifier: MIT
 # Copyright (C) 2024 picasso2005 <clementduran0@gmail.com> - All Rights Reserved
 
+import asyncio
 import os
-import sqlite3
 import time
 
 import discord
@@ -10,37 +10,64 @@ from discord.ext import commands
 from discord.ext import tasks
 
 from Core.CogManager import CogManager
+from Core.CommandTree import IndexedCommandTree
 from Core.CommandPrefix import CommandPrefix
 from Core.Commands.CogsCommands import CogsCommands
-from Core.Commands.Help import Help
+from Core.Commands.CommandStats import command_stats_command
+from Core.Commands.Help import Help, invalidate_help_cache
+from Core.Commands.LoopLag import loop_lag_command
+from Core.Commands.Profile import profile_command
+from Core.Commands.SocketStats import socket_stats_command
+from Core.Commands.SqlStats import sql_stats_command
 from Core.Commands.Stop import Stop
 from Core.Commands.Sync import sync_command
-from Core.DatabaseChecker import check_database
+from Core.Commands.Traces import traces_command
+from Core.DatabaseChecker import apply_pragmas, check_database, get_pragmas, maintain_database
 from Core.ErrorHandler import ErrorHandler
+from Core.GcPolicy import gc_policy
+from Core.SocketEvents import socket_events
+from Core.UserOnCooldown import rate_limiter
 from Core.GetToken import get_token
 from Core.IsTestVersion import is_test_version
+from Core.LoopWatchdog import LoopWatchdog
+from Core.SamplingProfiler import SamplingProfiler
+from Core.TreeSync import sync_tree
+from GlobalModules.AsyncDatabase import AsyncDatabase
 from GlobalModules.GetConfig import get_config
 from GlobalModules.HasPerm import has_perm
 from GlobalModules.Logger import Logger
+from GlobalModules.Metrics import registry
 from GlobalModules.Paginator import Paginator
+from GlobalModules.SqlProfiler import SqlProfiler
 from GlobalModules.TempManager import TempManager
+from GlobalModules.Tracing import trace, trace_discord_http
 
 commandPrefix = CommandPrefix()
 
 # noinspection PyTypeChecker
 bot = commands.AutoShardedBot(
     intents=discord.Intents.all(),
-    command_prefix=commandPrefix.prefix_callback
+    command_prefix=commandPrefix.prefix_callback,
+    tree_cls=IndexedCommandTree
 )
 
 if not os.path.isdir(get_config("core.data.folder")):
     os.mkdir(get_config("core.data.folder"))
 
-database = sqlite3.connect(f"{get_config('core.data.folder')}/{get_config('core.data.database')}")
+database = AsyncDatabase(
+    f"{get_config('core.data.folder')}/{get_config('core.data.database')}",
+    on_connect=apply_pragmas,
+    profiler=SqlProfiler(get_config("core.data.sql_profiler.slow_ms") / 1000)
+    if get_config("core.data.sql_profiler.enabled") else None
+)
 logger = Logger(database)
 errorHandler = ErrorHandler(database, bot)
+trace_discord_http(bot.http)
+loopWatchdog = LoopWatchdog(database)
+samplingProfiler = SamplingProfiler()
 
 TEST_VERSION = is_test_version(print_message=True)
+tree_synced = False
 
 if os.name == 'nt' and not TEST_VERSION:
     print(f"\033[93mWARNING: Data folder can be found in C:{get_config('core.data.folder')}\033[0m")
@@ -50,48 +77,82 @@ if os.name == 'nt' and not TEST_VERSION:
 async def on_ready():
     logger.add_log("Core", f"Bot connected: {bot.user} (ID: {bot.user.id})")
 
-    logger.add_log("Core", f"Syncing global command tree")
-    await bot.tree.sync()
+    global tree_synced
+
+    if tree_synced:  # on_ready is dispatched again after every reconnection
+        return
 
-    logger.add_log("Core", f"Syncing per-guild command tree")
-    for i in bot.guilds:
-        await bot.tree.sync(guild=i)
+    tree_synced = True
+
+    logger.add_log("Core", f"Syncing changed command trees")
+    await sync_tree(bot, database, [None, *bot.guilds])
 
     logger.add_log("Core", f"Every command tree synced")
 
+    gc_policy.freeze()  # The caches are filled, they won't be walked by the collections anymore
+
 
 @bot.event
 async def setup_hook() -> None:
-    check_database(database)
+    gc_policy.install()
+    loopWatchdog.start()
+
+    await database.run(check_database)
+    logger.add_log("Database", f"Effective pragmas: {await database.run(get_pragmas)}")
+    await rate_limiter.restore(database)
 
     disabled_by_config = get_config("core.disabled_cogs")
 
-    for key, value in cogManager.list_cog().items():
-        if not value and key not in disabled_by_config:
-            await cogManager.load_cog(key)
+    start = time.perf_counter()
+    loaded = await cogManager.load_cogs(
+        [key for key, value in cogManager.list_cog().items() if not value and key not in disabled_by_config]
+    )
+
+    logger.add_log(
+        "CogManager",
+        f"{sum(loaded.values())}/{len(loaded)} cogs loaded in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
 
     remove_old_paginator.start()
     clear_temp_files.start()
     purge_logs.start()
+    flush_logs.start()
+    optimize_database.start()
+    flush_paginators.start()
+    flush_socket_events.start()
+
+    if get_config("core.gc.idle_collect"):
+        idle_gc.start()
+
+    if get_config("core.metrics.export_file"):
+        export_metrics.start()
+
+    if get_config("core.last_used_commands_snapshot_delay"):
+        save_rate_limiter.start()
 
 
 @bot.event
-async def on_interaction(inter: discord.Interaction):
-    await Paginator(database).process_interaction(inter)
+async def on_guild_join(_: discord.Guild):
+    invalidate_help_cache()  # The help of each guild includes its guild commands
 
 
 @bot.event
-async def on_socket_event_type(event_type: str):
-    if event_type == "PRESENCE_UPDATE":
-        return
+async def on_guild_remove(_: discord.Guild):
+    invalidate_help_cache()
 
-    elif event_type == "TYPING_START":
-        return
 
-    elif "MESSAGE" in event_type:
+@bot.event
+async def on_interaction(inter: discord.Interaction):
+    if inter.type != discord.InteractionType.component:  # App commands are traced by has_perm
         return
 
-    logger.add_log("SOCKET_EVENT", event_type.capitalize())
+    with trace(f"component {inter.data.get('custom_id')}", str(inter.user)):
+        await Paginator(database).process_interaction(inter)
+
+
+@bot.event
+async def on_socket_event_type(event_type: str):
+    socket_events.increment(event_type)
 
 
 bot.tree.on_error = errorHandler.app_command_error
@@ -105,7 +166,7 @@ async def on_command_error(ctx, exception):
 
 @bot.event
 async def on_message(message):
-    if message.author.id in commandPrefix.get_allowed_users() and bot.user.mentioned_in(message):
+    if bot.user.mentioned_in(message) and message.author.id in commandPrefix.get_allowed_users():
         await message.channel.send(f"My prefix is `{commandPrefix.get_prefix()}`")
 
     await bot.process_commands(message)
@@ -116,10 +177,33 @@ async def remove_old_paginator():
     if not bot.is_ready():
         return
 
-    query = "SELECT MESSAGE_ID, CHANNEL_ID FROM PAGINATOR WHERE DELETE_TS < ?"
-    for values in database.execute(query, (int(time.time()),)).fetchall():
-        msg = bot.get_channel(values[1]).get_partial_message(values[0])
-        await Paginator(database).remove_paginator(msg)
+    await Paginator(database).remove_expired(bot)
+
+
+@tasks.loop(seconds=get_config("core.paginator_flush_delay"))
+async def flush_paginators():
+    Paginator.flush_pages(database)
+
+
+@tasks.loop(seconds=get_config("core.socket_events_flush_delay"))
+async def flush_socket_events():
+    socket_events.flush(database)
+
+
+@tasks.loop(seconds=get_config("core.metrics.export_delay"))
+async def export_metrics():
+    registry.gauge("bot_guilds", "Guilds the bot is in").set(len(bot.guilds))
+    registry.gauge("bot_latency_seconds", "Gateway heartbeat latency").set(bot.latency)
+
+    await asyncio.to_thread(
+        registry.write_prometheus,
+        f"{get_config('core.data.folder')}/{get_config('core.metrics.export_file')}"
+    )
+
+
+@tasks.loop(seconds=get_config("core.gc.idle_check_delay"))
+async def idle_gc():
+    gc_policy.collect_if_idle(loopWatchdog)
 
 
 @tasks.loop(minutes=30)
@@ -127,17 +211,39 @@ async def clear_temp_files():
     TempManager.purge_temp()
 
 
+@tasks.loop(seconds=get_config("core.logs_buffer.flush_delay_ms") / 1000)
+async def flush_logs():
+    logger.flush()
+
+
+@tasks.loop(minutes=get_config("core.data.maintenance_delay"))
+async def optimize_database():
+    busy, wal_frames, checkpointed = await database.run(maintain_database)
+    logger.add_log(
+        "Database",
+        f"WAL checkpoint: {checkpointed}/{wal_frames} frames checkpointed{' (busy)' if busy else ''}, optimized"
+    )
+
+
+@tasks.loop(minutes=get_config("core.last_used_commands_snapshot_delay"))
+async def save_rate_limiter():
+    rate_limiter.save(database)
+
+
 @tasks.loop(hours=6)
 async def purge_logs():
-    database.execute(
+    await database.execute(
         "DELETE FROM LOGS WHERE TIMESTAMP<?;",
         (int(time.time()) - get_config("core.logs_delete_after"),)
     )
-    database.commit()
+    await database.execute(
+        "DELETE FROM SOCKET_EVENTS WHERE TIMESTAMP<?;",
+        (int(time.time()) - get_config("core.logs_delete_after"),)
+    )
 
 
 cogManager = CogManager(bot, database)
-cogsCommands = CogsCommands(bot, database)
+cogsCommands = CogsCommands(bot, database, cogManager)
 
 
 @bot.command(name="cogs_list", brief="Show all cogs in this instance")
@@ -162,10 +268,14 @@ async def cogs_unload(ctx: discord.ext.commands.Context, *args):
     await cogsCommands.unload(ctx, *args)
 
 
-@bot.command(name="sync", brief="Sync comands tree (if guild_only = True, sync only the local tree)")
+@bot.command(
+    name="sync",
+    brief="Sync comands tree (if guild_only = True, sync only the local tree, if force = True, sync it even if "
+          "unchanged)"
+)
 @has_perm(database)
-async def sync(ctx: discord.ext.commands.Context, guild_only: bool = False):
-    await sync_command(bot, logger, ctx, guild_only)
+async def sync(ctx: discord.ext.commands.Context, guild_only: bool = False, force: bool = False):
+    await sync_command(bot, database, logger, ctx, guild_only, force)
 
 
 @bot.command(name="get_tb", brief="Get a full traceback with its ID")
@@ -174,6 +284,45 @@ async def get_tb(ctx: discord.ext.commands.Context, error_id: int):
     await errorHandler.get_tb_command(ctx, error_id)
 
 
+@bot.command(name="socket_stats", brief="Show the gateway events received during the last minutes (60 by default)")
+@has_perm(database)
+async def socket_stats(ctx: discord.ext.commands.Context, minutes: int = 60):
+    await socket_stats_command(database, ctx, minutes)
+
+
+@bot.command(name="command_stats", brief="Show the p50/p95/p99 latency of every command since startup")
+@has_perm(database)
+async def command_stats(ctx: discord.ext.commands.Context):
+    await command_stats_command(database, ctx)
+
+
+@bot.command(name="loop_lag", brief="Show the event loop lag and the worst blocking incidents")
+@has_perm(database)
+async def loop_lag(ctx: discord.ext.commands.Context):
+    await loop_lag_command(database, loopWatchdog, ctx)
+
+
+@bot.command(name="traces", brief="Browse the slowest traced commands and interactions (if clear = True, forget them)")
+@has_perm(database)
+async def traces(ctx: discord.ext.commands.Context, clear: bool = False):
+    await traces_command(database, ctx, clear)
+
+
+@bot.command(name="profile", brief="Sample the whole process for some seconds and upload the profile")
+@has_perm(database)
+async def profile(ctx: discord.ext.commands.Context, seconds: float = 30):
+    await profile_command(samplingProfiler, ctx, seconds)
+
+
+@bot.command(
+    name="sql_stats",
+    brief="Show the costliest SQL statements (sort = total, count, max or rows, if reset = True, forget them)"
+)
+@has_perm(database)
+async def sql_stats(ctx: discord.ext.commands.Context, sort: str = "total", reset: bool = False):
+    await sql_stats_command(database, ctx, sort, reset)
+
+
 @bot.command(name="stop", brief="Stop this bot instance")
 @has_perm(database)
 async def stop(ctx: discord.ext.commands.Context):
@@ -196,8 +345,19 @@ async def help_app_command(inte: discord.Interaction):
     await help_.app_command(inte)
 
 
-if TEST_VERSION:
-    bot.run(token=get_token())
+try:
+    if TEST_VERSION:
+        bot.run(token=get_token())
+
+    else:
+        bot.run(token=get_token(), log_handler=None)
+
+finally:
+    logger.flush()
+    Paginator.flush_pages(database)
+    socket_events.flush(database)
+
+    if get_config("core.last_used_commands_snapshot_delay"):
+        rate_limiter.save(database)
 
-else:
-    bot.run(token=get_token(), log_handler=None)
+    database.close()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # The config files are relative to the root
+
+argv, sys.argv = sys.argv, [sys.argv[0], "-t"]  # Core.IsTestVersion parses the command line when imported
+import Core.IsTestVersion  # noqa: E402
+sys.argv = argv
+
+import discord  # noqa: E402
+from discord.ext import commands, tasks  # noqa: E402
+
+import Core.CogManager  # noqa: E402
+from Core.CogManager import CogManager, get_cog_tasks  # noqa: E402
+from Core.CommandTree import IndexedCommandTree  # noqa: E402
+from Core.DatabaseChecker import check_database  # noqa: E402
+from GlobalModules.AsyncDatabase import AsyncDatabase  # noqa: E402
+
+
+class PrivateLoopCog(commands.Cog, name="PrivateLoopCog"):
+    def __init__(self) -> None:
+        self.__private_task.start()
+
+    @tasks.loop(seconds=60)
+    async def __private_task(self) -> None:
+        pass
+
+
+class TestCogManager(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = AsyncDatabase(os.path.join(self.directory.name, "database.db"))
+        await self.database.run(check_database)
+
+        self.bot = commands.AutoShardedBot(
+            intents=discord.Intents.none(),
+            command_prefix="!",
+            tree_cls=IndexedCommandTree
+        )
+        self.cog_manager = CogManager(self.bot, self.database)
+
+        module = types.ModuleType("Cogs.PrivateLoopCog.main")
+
+        async def setup(bot: commands.AutoShardedBot, _: AsyncDatabase) -> None:
+            await bot.add_cog(PrivateLoopCog())
+
+        module.setup = setup
+
+        self.reload_package = Core.CogManager.reload_package
+        Core.CogManager.reload_package = lambda package, main_module: (module, [])
+
+    async def asyncTearDown(self) -> None:
+        Core.CogManager.reload_package = self.reload_package
+        self.database.close()
+        self.directory.cleanup()
+
+    async def test_unload_stops_private_loop(self) -> None:
+        self.assertEqual(await self.cog_manager.load_cogs(["PrivateLoopCog"]), {"PrivateLoopCog": True})
+
+        cog_tasks = get_cog_tasks(self.bot.get_cog("PrivateLoopCog"))
+        self.assertEqual(len(cog_tasks), 1)
+        self.assertTrue(cog_tasks[0].is_running())
+
+        self.assertTrue(await self.cog_manager.unload_cog("PrivateLoopCog"))
+        await asyncio.sleep(0)
+
+        self.assertFalse(cog_tasks[0].is_running())
+
+
+if __name__ == "__main__":
+    unittest.main()